@@ -1,9 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import heapq
 from pathlib import Path
 import os
 
-from audio_composer.composer.scanline_composer import generate_no_overlap_tracks
+from audio_composer.composer.min_tracks_composer import group_by_start, max_overlap_depth
+from audio_composer.composer.registry import DEFAULT_COMPOSER, get_composer
+from audio_composer.ingest.metadata_cache import MetadataCache, file_signature
+from audio_composer.ingest.parallel_loader import PoolKind, read_metadata_parallel
+from audio_composer.ingest.sidecar import (
+    IndexFormatError,
+    compare_index,
+    index_path,
+    read_index,
+)
+from audio_composer.ingest.wav_reader import find_wav_files, wav_sort_key
+from audio_composer.models.wav_metadata import WavMetadata
 from audio_composer.models.audioclip import AudioClip, AudioGap
 from audio_composer.models.audiotrack import AudioTrack, CharacterGroup
+from audio_composer.models.timing import seconds_to_ticks
+from utils.instrumentation import count, span
+from utils.logger import logger
 
 
 def safe_path(path: Path) -> str:
@@ -15,24 +32,152 @@ def safe_path(path: Path) -> str:
         return path.as_posix()
 
 
-def get_audio_clips(folder: str, fps: float = 24.0) -> list[AudioClip]:
+def scan_wav_files(folder: str) -> list[str]:
     """
-    从指定文件夹中获取所有音频剪辑。
+    递归查找文件夹中的所有 wav 文件（后缀不区分大小写）。
+
+    参数:
+        folder (str): 文件夹路径。
+
+    返回:
+        list[str]: 经过 safe_path 处理的文件路径，按 wav_sort_key 排序。
+    """
+    return [safe_path(audio_file) for audio_file in find_wav_files(folder)]
+
+
+def get_audio_clips(
+    folder: str,
+    fps: float = 24.0,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    max_in_flight: int | None = None,
+    cache: MetadataCache | None = None,
+    use_index: bool = True,
+) -> list[AudioClip]:
+    """
+    从指定文件夹中获取所有音频剪辑。文件夹中有未过期的索引文件（见 audio_composer.ingest.sidecar）
+    且 use_index 为 True 时直接读取索引，不打开任何 wav 文件。
 
     参数:
         folder (str): 包含音频文件的文件夹路径。
+        fps (float): 帧率。
+        workers (int): 并行读取 wav 元数据的工作者数量，1 表示顺序读取。
+        pool (PoolKind): 并行读取使用线程池（"thread"）还是进程池（"process"）。
+        max_in_flight (int | None): 同时在途的最大读取任务数，默认为 workers 的 4 倍。
+        cache (MetadataCache | None): 元数据缓存，命中的文件只需要 stat，不再解析。
+        use_index (bool): 是否使用文件夹中的索引文件。
 
     返回:
-        list[AudioClip]: AudioClip 对象的列表。
+        list[AudioClip]: AudioClip 对象的列表，按 wav_sort_key 排序，与读取方式无关。
     """
-    audio_clips = []
-    folder_path = Path(folder)
-    for audio_file in folder_path.glob("**/*.wav"):
-        clip = AudioClip(audio_file=safe_path(audio_file), rate=fps)
-        audio_clips.append(clip)
+    if use_index:
+        audio_clips = clips_from_index(folder, fps)
+        if audio_clips is not None:
+            return audio_clips
+
+    with span("scan"):
+        audio_files = scan_wav_files(folder)
+    count("files", len(audio_files))
+
+    with span("parse"):
+        if cache is None:
+            metadata_list = read_metadata_parallel(
+                audio_files, workers, pool, max_in_flight
+            )
+        else:
+            metadata_list = read_metadata_cached(
+                audio_files, cache, workers, pool, max_in_flight
+            )
+
+        audio_clips = []
+        for audio_file, metadata in zip(audio_files, metadata_list):
+            clip = AudioClip(audio_file=audio_file, rate=fps, metadata=metadata)
+            audio_clips.append(clip)
     return audio_clips
 
 
+def clips_from_index(folder: str, fps: float = 24.0) -> list[AudioClip] | None:
+    """
+    从文件夹的索引文件生成音频剪辑，不打开任何 wav 文件。
+    使用前遍历目录并 stat 每个文件检查索引是否过期（见 compare_index）；
+    索引过期或格式不正确时记录警告并返回 None，由调用方退回到逐个读取文件。
+
+    参数:
+        folder (str): 包含音频文件和索引的文件夹路径。
+        fps (float): 帧率。
+
+    返回:
+        list[AudioClip] | None: 文件夹中没有可用的索引时返回 None。
+    """
+    with span("index"):
+        try:
+            entries = read_index(folder)
+        except IndexFormatError as error:
+            logger.warning(f"ignoring {index_path(folder)}: {error}")
+            return None
+        if entries is None:
+            return None
+        report = compare_index(folder, entries)
+        if not report.ok:
+            logger.warning(
+                f"ignoring out-of-date {index_path(folder)} "
+                f"({len(report.missing)} missing, {len(report.unindexed)} unindexed, "
+                f"{len(report.stale)} stale files); run `index build` to refresh it"
+            )
+            return None
+        logger.info(f"reading {len(entries)} clips from {index_path(folder)}")
+        root = Path(folder)
+        # 外部工具写出的索引不一定有序，按与遍历目录相同的顺序排列
+        entries.sort(key=lambda entry: wav_sort_key(entry.path))
+        audio_clips = [
+            AudioClip(
+                audio_file=safe_path(root / entry.path), rate=fps, metadata=entry.metadata
+            )
+            for entry in entries
+        ]
+    count("files", len(audio_clips))
+    return audio_clips
+
+
+def read_metadata_cached(
+    audio_files: list[str],
+    cache: MetadataCache,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    max_in_flight: int | None = None,
+) -> list[WavMetadata | None]:
+    """
+    先查询缓存，只解析未命中的文件，并将解析结果写回缓存。
+
+    参数:
+        audio_files (list[str]): wav 文件路径。
+        cache (MetadataCache): 元数据缓存。
+        workers (int): 解析未命中文件时的工作者数量。
+        pool (PoolKind): 线程池或进程池。
+        max_in_flight (int | None): 同时在途的最大读取任务数。
+
+    返回:
+        list[WavMetadata | None]: 与输入顺序一致的元数据。
+    """
+    keys = [file_signature(audio_file) for audio_file in audio_files]
+    metadata_list = cache.lookup_many(keys)
+
+    misses = [index for index, metadata in enumerate(metadata_list) if metadata is None]
+    count("cache_hits", len(audio_files) - len(misses))
+    count("cache_misses", len(misses))
+    parsed = read_metadata_parallel(
+        [audio_files[index] for index in misses], workers, pool, max_in_flight
+    )
+    new_entries = []
+    for index, metadata in zip(misses, parsed):
+        metadata_list[index] = metadata
+        if metadata is not None:
+            new_entries.append((keys[index], metadata))
+    if new_entries:
+        cache.store_many(new_entries)
+    return metadata_list
+
+
 def group_clips_by_character(
     clips: list[AudioClip],
 ) -> list[tuple[str, list[AudioClip]]]:
@@ -56,62 +201,235 @@ def group_clips_by_character(
 
 def organize_tracks_by_character(
     clip_groups: list[tuple[str, list[AudioClip]]],
+    composer: str = DEFAULT_COMPOSER,
+    workers: int = 1,
 ) -> list[CharacterGroup]:
     """
     根据角色组织音频剪辑分组为角色组，并将其规整到相应轨道上。
 
     参数:
         clip_groups (list[tuple[str, list[AudioClip]]]): 按角色分组的音频剪辑列表。
+        composer (str): 编排策略名称，见 audio_composer.composer.registry。
+        workers (int): 并行编排的进程数，大于 1 时各角色组在进程池中并行编排，
+            结果顺序与输入的角色顺序一致，与顺序编排完全相同。
 
     返回:
         list[CharacterGroup]: 角色组的列表。
     """
+    compose = get_composer(composer).compose
+    if workers > 1 and len(clip_groups) > 1:
+        return organize_tracks_in_parallel(clip_groups, composer, workers)
+
     character_groups: list[CharacterGroup] = []
     for character, clips in clip_groups:
-        tracks = generate_no_overlap_tracks(character, clips)
+        tracks = compose(character, clips)
         group = CharacterGroup(character=character, tracks=tracks)
         character_groups.append(group)
     return character_groups
 
 
-def merge_tracks(tracks: list[AudioTrack], threshold: float = 1.0) -> list[AudioTrack]:
+def compose_track_layout(
+    composer: str, character: str, clips: list[AudioClip]
+) -> list[tuple[int, list[int]]]:
     """
-    合并轨道，将空隙较小的轨道合并到一个轨道。
+    在工作进程中编排一个角色组，只返回轨道编号和剪辑在输入列表中的位置，
+    避免把剪辑再传回主进程。
 
     参数:
-        tracks (list[AudioTrack]): 音轨列表。
-        threshold (float): 判断是否可以合并的空隙阈值（单位：时间长度）。
+        composer (str): 编排策略名称。
+        character (str): 角色名称。
+        clips (list[AudioClip]): 该角色的剪辑。
 
     返回:
-        list[AudioTrack]: 合并后的音轨列表。
+        list[tuple[int, list[int]]]: (轨道编号, 剪辑位置列表) 的列表。
     """
-    # 按轨道结束时间排序
-    tracks.sort(
-        key=lambda track: track.clips[-1].end_offset if track.clips else float("inf")
-    )
+    positions = {id(clip): position for position, clip in enumerate(clips)}
+    tracks = get_composer(composer).compose(character, clips)
+    return [
+        (track.index, [positions[id(clip)] for clip in track.clips]) for track in tracks
+    ]
 
-    merged_tracks = []
-    current_track = tracks[0]
 
-    for i in range(1, len(tracks)):
-        last_clip_end_time = current_track.clips[-1].end_offset
-        first_clip_start_time = tracks[i].clips[0].start_offset
+def organize_tracks_in_parallel(
+    clip_groups: list[tuple[str, list[AudioClip]]],
+    composer: str,
+    workers: int,
+) -> list[CharacterGroup]:
+    """
+    在进程池中并行编排各角色组，再用主进程中的剪辑对象按原角色顺序重建轨道。
+    编排策略在工作进程中按名称查找，运行时注册的策略需要在工作进程中同样可用。
 
-        # 如果轨道之间的空隙小于阈值，则尝试合并
-        if first_clip_start_time - last_clip_end_time <= threshold:
-            # 将轨道i的所有片段加到当前轨道
-            current_track.clips.extend(tracks[i].clips)
+    参数:
+        clip_groups (list[tuple[str, list[AudioClip]]]): 按角色分组的音频剪辑列表。
+        composer (str): 编排策略名称。
+        workers (int): 进程数。
+
+    返回:
+        list[CharacterGroup]: 角色组的列表。
+    """
+    characters = [character for character, _ in clip_groups]
+    clip_lists = [clips for _, clips in clip_groups]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        layouts = executor.map(
+            compose_track_layout, [composer] * len(clip_groups), characters, clip_lists
+        )
+
+        character_groups: list[CharacterGroup] = []
+        for character, clips, layout in zip(characters, clip_lists, layouts):
+            tracks = [
+                AudioTrack(
+                    character=character,
+                    index=index,
+                    clips=[clips[position] for position in positions],
+                )
+                for index, positions in layout
+            ]
+            character_groups.append(CharacterGroup(character=character, tracks=tracks))
+    return character_groups
+
+
+def _pack_character_clips(clips: list[AudioClip], threshold: int) -> list[list[AudioClip]]:
+    lanes: list[list[AudioClip]] = []
+    # (剪辑结束时间 + threshold, 目标轨道序号) 最小堆
+    busy: list[tuple[int, int]] = []
+    # 空闲的目标轨道序号最小堆
+    free: list[int] = []
+
+    # 稳定排序：开始时间相同的剪辑保持输入顺序
+    for clip in sorted(clips, key=lambda clip: clip.start_ticks):
+        while busy and busy[0][0] <= clip.start_ticks:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            number = heapq.heappop(free)
         else:
-            # 否则，保留当前轨道，创建新的轨道
-            merged_tracks.append(current_track)
-            current_track = tracks[i]
+            number = len(lanes)
+            lanes.append([])
+        lanes[number].append(clip)
+        heapq.heappush(busy, (clip.end_ticks + threshold, number))
+    return lanes
 
-    # 最后添加剩下的轨道
-    merged_tracks.append(current_track)
 
+def merge_tracks(tracks: list[AudioTrack], threshold: float = 0.0) -> list[AudioTrack]:
+    """
+    压缩轨道：把同一角色所有轨道上的剪辑逐条重新分配，合并后的轨道上剪辑互不重叠。
+
+    按开始时间扫描剪辑，每条剪辑放到编号最小的空闲目标轨道上（结束时间和空闲编号各用
+    一个最小堆），总复杂度 O(n log n)。threshold 为 0 时轨道数恰好等于该角色的最大重叠深度，
+    即任何不重叠分配的下界，剪辑也尽量集中在编号小的轨道上。
+    已注册的编排策略的输出已经达到这个下界，因此导出流程不调用本函数；
+    它用于合并其他来源的轨道（例如手工拼接或多次编排的结果）。
+    要减少角色很多时的轨道总数，使用共享轨道（PoolLimits）。
+    输入的轨道不会被修改。
+
+    参数:
+        tracks (list[AudioTrack]): 音轨列表。
+        threshold (float): 合并后同一轨道上相邻剪辑之间至少保留的间隔（秒）。
+
+    返回:
+        list[AudioTrack]: 合并后的音轨列表，角色顺序与输入一致，轨道编号从 1 开始重新编号。
+    """
+    by_character: dict[str, list[AudioClip]] = {}
+    for track in tracks:
+        by_character.setdefault(track.character, []).extend(track.clips)
+
+    merged_tracks: list[AudioTrack] = []
+    for character, clips in by_character.items():
+        lanes = _pack_character_clips(clips, seconds_to_ticks(threshold))
+        for number, lane in enumerate(lanes, start=1):
+            merged_tracks.append(AudioTrack(character, number, lane))
     return merged_tracks
 
 
+class PoolNameConflictError(ValueError):
+    """共享轨道的名称与输入中的某个角色相同。"""
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """
+    共享轨道（次要角色合用的轨道）的限制。
+
+    属性:
+        minor_clips: 台词数不超过该值的角色视为次要角色，可以放到共享轨道上。
+        max_tracks: 共享轨道数上限；加入某个次要角色会超过上限时，该角色保留独立轨道。
+        name: 共享轨道的名称前缀（轨道名为 {name}_{编号}），不能与输入中的角色同名。
+    """
+
+    minor_clips: int = 20
+    max_tracks: int = 8
+    name: str = "pool"
+
+
+def split_pooled_groups(
+    clip_groups: list[tuple[str, list[AudioClip]]], limits: PoolLimits
+) -> tuple[list[tuple[str, list[AudioClip]]], list[AudioClip]]:
+    """
+    选出放到共享轨道上的次要角色：按台词数从少到多依次加入，
+    加入后共享剪辑的最大重叠深度（即共享轨道数）不超过 max_tracks 时才加入。
+
+    参数:
+        clip_groups (list[tuple[str, list[AudioClip]]]): 按角色分组的音频剪辑列表。
+        limits (PoolLimits): 共享轨道的限制。
+
+    返回:
+        tuple: (保留独立轨道的角色分组（顺序不变）, 放到共享轨道上的剪辑)。
+
+    异常:
+        PoolNameConflictError: limits.name 与输入中的某个角色同名，
+            共享轨道与该角色的轨道无法按名称区分。
+    """
+    if any(character == limits.name for character, _ in clip_groups):
+        raise PoolNameConflictError(
+            f"Shared track name {limits.name!r} is also a character in the input"
+        )
+    candidates = sorted(
+        (group for group in clip_groups if len(group[1]) <= limits.minor_clips),
+        key=lambda group: len(group[1]),
+    )
+
+    def depth(clips: list[AudioClip]) -> int:
+        return max_overlap_depth(group_by_start(list(clips)))
+
+    pooled_characters: set[str] = set()
+    pooled_clips: list[AudioClip] = []
+    everything = [clip for _, clips in candidates for clip in clips]
+    if depth(everything) <= limits.max_tracks:
+        # 常见情况：所有次要角色一起放进去也不超过上限
+        pooled_characters = {character for character, _ in candidates}
+        pooled_clips = everything
+    else:
+        for character, clips in candidates:
+            if depth(pooled_clips + clips) <= limits.max_tracks:
+                pooled_characters.add(character)
+                pooled_clips += clips
+
+    dedicated = [group for group in clip_groups if group[0] not in pooled_characters]
+    return dedicated, pooled_clips
+
+
+def compose_pooled_tracks(
+    clips: list[AudioClip], composer: str, limits: PoolLimits
+) -> list[AudioTrack]:
+    """
+    把次要角色的剪辑编排到共享轨道上。已注册的编排策略都能达到最大重叠深度，
+    因此轨道数不超过 limits.max_tracks。剪辑的角色在导出时写入 OTIO 剪辑的元数据。
+
+    参数:
+        clips (list[AudioClip]): split_pooled_groups 选出的剪辑。
+        composer (str): 编排策略名称。
+        limits (PoolLimits): 共享轨道的限制。
+
+    返回:
+        list[AudioTrack]: 共享轨道。
+    """
+    if not clips:
+        return []
+    tracks = get_composer(composer).compose(limits.name, list(clips))
+    for track in tracks:
+        track.shared = True
+    return tracks
+
+
 def generate_gap(duration: float, fps: float = 24.0) -> AudioGap:
     """
     生成一个音频间隙。
@@ -132,7 +450,11 @@ def generate_gaps_between_clips(
 ) -> list[AudioClip]:
     """
     根据AudioClip.offset_seconds，计算轨道上所有音频片段之间应当填充的间隙长度，
-    并在在音频剪辑之间插入间隙。
+    并在在音频剪辑之间插入间隙。间隙长度由 AudioTrack.gap_durations 批量计算，
+    长度为 0 的间隙不插入，剪辑本身总是保留。
+
+    导出时由 AudioTrack.clips_with_gaps 直接生成间隙，轨道上不再保存间隙，
+    这个函数用于需要完整剪辑列表的场合。
 
     参数:
         clips (list[AudioClip]): 原始音频剪辑列表。
@@ -141,15 +463,11 @@ def generate_gaps_between_clips(
         list[AudioClip]: 插入间隙后的音频剪辑列表。
     """
     clips_with_gaps: list[AudioClip] = []
-    previous_offset = 0
-    for clip in clips:
-        gap_duration = clip.start_offset - previous_offset
-        if gap_duration == 0:
-            continue
-        gap = generate_gap(gap_duration, fps)
-
-        clips_with_gaps += [gap, clip]
-        previous_offset = clip.end_offset
+    gap_durations = AudioTrack("", 0, clips).gap_durations().tolist()
+    for clip, gap_duration in zip(clips, gap_durations):
+        if gap_duration > 0:
+            clips_with_gaps.append(generate_gap(gap_duration, fps))
+        clips_with_gaps.append(clip)
     return clips_with_gaps
 
 
@@ -169,26 +487,41 @@ def flatten_chara_grps(chara_grps: list[CharacterGroup]) -> list[AudioTrack]:
     return audio_tracks
 
 
-def audio_to_tracks(clips: list[AudioClip], fps: float = 24.0) -> list[AudioTrack]:
+def audio_to_tracks(
+    clips: list[AudioClip],
+    fps: float = 24.0,
+    composer: str = DEFAULT_COMPOSER,
+    workers: int = 1,
+    pool_limits: PoolLimits | None = None,
+) -> list[AudioTrack]:
     """
     将音频剪辑列表转换为音轨列表。
 
     参数:
         clips (list[AudioClip]): 输入的音频剪辑列表。
+        fps (float): 帧率（剪辑的帧率在 get_audio_clips 中确定，保留此参数以兼容旧的调用）。
+        composer (str): 编排策略名称。
+        workers (int): 并行编排角色组的进程数。
+        pool_limits (PoolLimits | None): 提供时，台词很少的次要角色合用共享轨道（排在最后），
+            轨道总数不再随角色数增长。
 
     返回:
-        list[AudioTrack]: 转换后的音轨列表。
+        list[AudioTrack]: 转换后的音轨列表，只包含剪辑，不包含间隙。
     """
-    # 按角色分组音频剪辑
-    clip_groups = group_clips_by_character(clips)
-
-    # 组织角色组
-    character_groups = organize_tracks_by_character(clip_groups)
-
-    # 为每个角色组生成不重叠的音轨
-    audio_tracks = flatten_chara_grps(character_groups)
-    # 插入间隙
-    for track in audio_tracks:
-        track.clips = generate_gaps_between_clips(track.clips, fps)
-
+    with span("compose"):
+        # 按角色分组音频剪辑
+        clip_groups = group_clips_by_character(clips)
+        pooled_clips: list[AudioClip] = []
+        if pool_limits is not None:
+            clip_groups, pooled_clips = split_pooled_groups(clip_groups, pool_limits)
+
+        # 组织角色组
+        character_groups = organize_tracks_by_character(clip_groups, composer, workers)
+
+        # 为每个角色组生成不重叠的音轨，间隙在导出时由 AudioTrack.clips_with_gaps 生成
+        audio_tracks = flatten_chara_grps(character_groups)
+        # 共享轨道排在所有角色的轨道之后
+        audio_tracks += compose_pooled_tracks(pooled_clips, composer, pool_limits)
+    count("clips", len(clips))
+    count("tracks", len(audio_tracks))
     return audio_tracks
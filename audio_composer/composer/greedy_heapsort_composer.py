@@ -3,7 +3,6 @@ from dataclasses import dataclass
 
 from audio_composer.models.audioclip import AudioClip
 from audio_composer.models.audiotrack import AudioTrack, CharacterGroup
-from utils.logger import logger
 
 
 @dataclass(order=True)
@@ -12,7 +11,7 @@ class EndPoint:
     用于指代生成轨道过程中的最远点
     """
 
-    end_time: float
+    end_time: int
     track_idx: int
 
 
@@ -30,7 +29,7 @@ def generate_no_overlap_tracks_greedyheap(
     """
 
     # 按时间码排序
-    clips.sort(key=lambda clip: clip.start_offset)
+    clips.sort(key=lambda clip: clip.start_ticks)
 
     #
     heap_of_endpoints: list[EndPoint] = []
@@ -100,48 +99,22 @@ def generate_no_overlap_tracks_greedyheap(
     轨道 1: 11111###33444
     轨道 2: ###2225555#
     """
-    no_tracks = True
+    # 逐条剪辑的调试日志会主导大批量编排的耗时，这里不记录日志，
+    # 需要分析时使用 utils.instrumentation（--trace）
     for clip in clips:
-        if tracks and heap_of_endpoints[0].end_time <= clip.start_offset:
-            logger.debug(f"{clip.start_offset}, not overlap")
-            # 没有重叠
-            last_endpoint = heapq.heappop(heap_of_endpoints)
-            logger.debug(f"now pop {last_endpoint}")
-            last_track_id = last_endpoint.track_idx
+        if tracks and heap_of_endpoints[0].end_time <= clip.start_ticks:
+            # 没有重叠，接在最早结束的轨道之后
+            last_track_id = heapq.heappop(heap_of_endpoints).track_idx
             tracks[last_track_id].clips.append(clip)
-            logger.debug(
-                f"add {clip.start_offset}, {clip.end_offset} to track{last_track_id + 1}"
-            )
-            heapq.heappush(heap_of_endpoints, EndPoint(clip.end_offset, last_track_id))
-            logger.debug(f"the heap now :{heap_of_endpoints}")
-            logger.debug(
-                f"!!!!the clip count of first track is {len(tracks[0].clips)}!!!!"
-            )
+            heapq.heappush(heap_of_endpoints, EndPoint(clip.end_ticks, last_track_id))
         else:
-            # 重叠了
-            logger.debug(f"{clip.start_offset}, {clip.end_offset} overlap")
+            # 重叠了，创建新轨道
             new_track = AudioTrack(character=character, index=get_new_track_name())
             new_track.clips.append(clip)
-            if no_tracks:
-                logger.info("--------------------------------------------------")
-                logger.info("the new track has been created, here's the first clip")
-                logger.info(new_track.clips)
-                logger.info(f"the clip count of track is {len(new_track.clips)}")
-                no_tracks = False
             tracks.append(new_track)
-            current_heap_info = EndPoint(clip.end_offset, get_new_track_id())
-            logger.debug(f"{current_heap_info} added to the heap")
-            heapq.heappush(heap_of_endpoints, current_heap_info)
-            logger.debug("now the heap:")
-            logger.debug(heap_of_endpoints)
-            logger.debug(
-                f"!!!!the clip count of first track is {len(tracks[0].clips)}!!!!"
+            heapq.heappush(
+                heap_of_endpoints, EndPoint(clip.end_ticks, get_new_track_id())
             )
-
-    logger.info("--------------------------------------------------")
-    logger.info(f"compose end, the clip count of first track is {len(tracks[0].clips)}")
-    logger.info(f"the track count is {len(tracks)}")
-    logger.info("--------------------------------------------------")
     return tracks
 
 
@@ -0,0 +1,204 @@
+import heapq
+import itertools
+from dataclasses import dataclass
+
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audiotrack import AudioTrack
+from utils.instrumentation import count
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class TrackCountReport:
+    """
+    一个角色的轨道数报告。
+
+    属性:
+        character: 角色名称。
+        clips: 剪辑数。
+        lower_bound: 轨道数下界，即同一时刻最多同时在说的台词数（最大重叠深度）。
+        achieved: 实际使用的轨道数。
+        burst_groups: 同时开始的剪辑多于一条的分组数。
+        contiguous_groups: 其中分配到连续轨道的分组数。
+    """
+
+    character: str
+    clips: int
+    lower_bound: int
+    achieved: int
+    burst_groups: int
+    contiguous_groups: int
+
+    @property
+    def optimal(self) -> bool:
+        return self.achieved == self.lower_bound
+
+
+def group_by_start(clips: list[AudioClip]) -> list[list[AudioClip]]:
+    """按开始时间排序并分组，组内保持输入顺序。"""
+    clips.sort(key=lambda clip: clip.start_ticks)
+    return [
+        list(group)
+        for _, group in itertools.groupby(clips, key=lambda clip: clip.start_ticks)
+    ]
+
+
+def max_overlap_depth(groups: list[list[AudioClip]]) -> int:
+    """
+    同一时刻最多同时在说的台词数（剪辑为半开区间 [start, end)），
+    任何不重叠的轨道分配都至少需要这么多条轨道。O(n log n)。
+
+    参数:
+        groups: group_by_start 的结果。
+
+    返回:
+        int: 最大重叠深度。
+    """
+    ends: list[int] = []
+    depth = 0
+    for group in groups:
+        start = group[0].start_ticks
+        while ends and ends[0] <= start:
+            heapq.heappop(ends)
+        depth = max(depth, len(ends) + len(group))
+        for clip in group:
+            heapq.heappush(ends, clip.end_ticks)
+    return depth
+
+
+class _FreeSlots:
+    """
+    固定数量轨道的空闲状态线段树，支持 O(log k) 地查找最左侧的连续 g 条空闲轨道。
+    每个节点保存区间内从左端、从右端开始的连续空闲数和最长连续空闲数。
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.leaves = 1
+        while self.leaves < size:
+            self.leaves *= 2
+        self.prefix = [0] * (2 * self.leaves)
+        self.suffix = [0] * (2 * self.leaves)
+        self.best = [0] * (2 * self.leaves)
+        # 超出 size 的叶子保持占用，连续空闲段不会越过最后一条轨道
+        for slot in range(size):
+            leaf = self.leaves + slot
+            self.prefix[leaf] = self.suffix[leaf] = self.best[leaf] = 1
+        for node in range(self.leaves - 1, 0, -1):
+            self._pull(node, self.leaves >> (node.bit_length() - 1))
+
+    def _pull(self, node: int, width: int) -> None:
+        left, right = 2 * node, 2 * node + 1
+        half = width // 2
+        prefix, suffix, best = self.prefix, self.suffix, self.best
+        prefix[node] = prefix[left] + prefix[right] if prefix[left] == half else prefix[left]
+        suffix[node] = suffix[right] + suffix[left] if suffix[right] == half else suffix[right]
+        best[node] = max(best[left], best[right], suffix[left] + prefix[right])
+
+    def set(self, slot: int, free: bool) -> None:
+        node = self.leaves + slot
+        value = 1 if free else 0
+        self.prefix[node] = self.suffix[node] = self.best[node] = value
+        width = 1
+        while node > 1:
+            node //= 2
+            width *= 2
+            self._pull(node, width)
+
+    def leftmost_run(self, length: int) -> int:
+        """最左侧连续 length 条空闲轨道的第一条，不存在时返回 -1。"""
+        if self.best[1] < length:
+            return -1
+        node, low, width = 1, 0, self.leaves
+        while width > 1:
+            left, right = 2 * node, 2 * node + 1
+            half = width // 2
+            if self.best[left] >= length:
+                node, width = left, half
+            elif self.suffix[left] + self.prefix[right] >= length:
+                return low + half - self.suffix[left]
+            else:
+                node, low, width = right, low + half, half
+        return low
+
+
+def compose_min_tracks(
+    character: str, clips: list[AudioClip]
+) -> tuple[list[AudioTrack], TrackCountReport]:
+    """
+    按开始时间扫描，把剪辑分配到恰好 最大重叠深度 条轨道上（区间图着色），
+    轨道数达到下界。
+
+    任意时刻已占用的轨道数加上同时开始的剪辑数都不超过最大重叠深度，
+    所以每个分组总能在这些轨道中放下，选哪几条空闲轨道不影响最优性。
+    在此基础上，同时开始的剪辑优先放到最左侧的连续空闲轨道上（线段树查找），
+    没有足够长的连续空闲段时再依次使用最左侧的空闲轨道。总复杂度 O(n log n)。
+
+    参数:
+        character (str): 角色名称。
+        clips (list[AudioClip]): 该角色的剪辑，会被原地按开始时间排序。
+
+    返回:
+        tuple[list[AudioTrack], TrackCountReport]: 按编号排列的音轨和轨道数报告。
+    """
+    groups = group_by_start(clips)
+    lower_bound = max_overlap_depth(groups)
+    slots = _FreeSlots(lower_bound)
+    # (结束时间, 轨道位置) 最小堆
+    busy: list[tuple[int, int]] = []
+    assignment: list[list[AudioClip]] = [[] for _ in range(lower_bound)]
+    burst_groups = contiguous_groups = 0
+
+    for group in groups:
+        start = group[0].start_ticks
+        while busy and busy[0][0] <= start:
+            slots.set(heapq.heappop(busy)[1], True)
+
+        first = slots.leftmost_run(len(group))
+        if len(group) > 1:
+            burst_groups += 1
+            contiguous_groups += first >= 0
+        for offset, clip in enumerate(group):
+            slot = first + offset if first >= 0 else slots.leftmost_run(1)
+            slots.set(slot, False)
+            assignment[slot].append(clip)
+            heapq.heappush(busy, (clip.end_ticks, slot))
+
+    tracks = [
+        AudioTrack(character=character, index=slot + 1, clips=track_clips)
+        for slot, track_clips in enumerate(assignment)
+        if track_clips
+    ]
+    report = TrackCountReport(
+        character=character,
+        clips=len(clips),
+        lower_bound=lower_bound,
+        achieved=len(tracks),
+        burst_groups=burst_groups,
+        contiguous_groups=contiguous_groups,
+    )
+    return tracks, report
+
+
+def generate_min_tracks(character: str, clips: list[AudioClip]) -> list[AudioTrack]:
+    """
+    注册到编排器表的入口：返回 compose_min_tracks 的音轨，
+    轨道数下界和实际轨道数记录到日志（DEBUG）和 --trace 的计数器中。
+
+    参数:
+        character (str): 角色名称。
+        clips (list[AudioClip]): 该角色的剪辑。
+
+    返回:
+        list[AudioTrack]: 不重叠的音轨列表。
+    """
+    tracks, report = compose_min_tracks(character, clips)
+    count("min_tracks.lower_bound", report.lower_bound)
+    count("min_tracks.achieved", report.achieved)
+    count("min_tracks.burst_groups", report.burst_groups)
+    count("min_tracks.contiguous_groups", report.contiguous_groups)
+    logger.debug(
+        f"{character}: {report.achieved} tracks (lower bound {report.lower_bound}), "
+        f"{report.contiguous_groups}/{report.burst_groups} bursts contiguous"
+    )
+    return tracks
@@ -0,0 +1,117 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from audio_composer.composer.greedy_heapsort_composer import (
+    generate_no_overlap_tracks_greedyheap,
+)
+from audio_composer.composer.min_tracks_composer import generate_min_tracks
+from audio_composer.composer.scanline_composer import (
+    generate_no_overlap_tracks,
+    generate_scanline_tracks,
+)
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audiotrack import AudioTrack
+
+# 编排器：输入角色名和该角色的剪辑，输出不重叠的音轨
+Composer = Callable[[str, list[AudioClip]], list[AudioTrack]]
+
+
+@dataclass(frozen=True)
+class ComposerSpec:
+    """
+    已注册的编排策略。
+
+    属性:
+        name: 策略名称，用于命令行 --composer 和 audio_to_tracks(composer=...)。
+        compose: 编排函数。
+        complexity: 时间复杂度（n 为剪辑数，k 为轨道数）。
+        guarantees: 策略保证的性质。
+        description: 简要说明。
+    """
+
+    name: str
+    compose: Composer
+    complexity: str
+    guarantees: tuple[str, ...] = ()
+    description: str = ""
+
+
+DEFAULT_COMPOSER = "scanline_optimized"
+
+COMPOSERS: dict[str, ComposerSpec] = {}
+
+
+def register_composer(spec: ComposerSpec) -> ComposerSpec:
+    """
+    注册编排策略，同名策略会被覆盖。
+
+    参数:
+        spec (ComposerSpec): 编排策略。
+
+    返回:
+        ComposerSpec: 注册的策略。
+    """
+    COMPOSERS[spec.name] = spec
+    return spec
+
+
+def get_composer(name: str) -> ComposerSpec:
+    """
+    按名称获取编排策略。
+
+    参数:
+        name (str): 策略名称。
+
+    返回:
+        ComposerSpec: 编排策略。
+    """
+    try:
+        return COMPOSERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown composer: {name}. Expected one of {composer_names()}."
+        ) from None
+
+
+def composer_names() -> list[str]:
+    """已注册的策略名称。"""
+    return list(COMPOSERS)
+
+
+register_composer(
+    ComposerSpec(
+        name="scanline_optimized",
+        compose=generate_no_overlap_tracks,
+        complexity="O((n + k) log n)",
+        guarantees=("no_overlap", "min_tracks"),
+        description="扫描线 + 堆，开始时间相同的片段依次放到编号最小的空闲轨道（默认）。",
+    )
+)
+register_composer(
+    ComposerSpec(
+        name="scanline",
+        compose=generate_scanline_tracks,
+        complexity="O(n * k log k)",
+        guarantees=("no_overlap", "min_tracks"),
+        description="基础扫描线实现，每个开始时间分组都重新扫描所有轨道。",
+    )
+)
+register_composer(
+    ComposerSpec(
+        name="greedy_heap",
+        compose=generate_no_overlap_tracks_greedyheap,
+        complexity="O(n log k)",
+        guarantees=("no_overlap", "min_tracks"),
+        description="逐个片段贪心放入最早结束的轨道，不保证同时开始的片段轨道连续。",
+    )
+)
+register_composer(
+    ComposerSpec(
+        name="min_tracks",
+        compose=generate_min_tracks,
+        complexity="O(n log n)",
+        guarantees=("no_overlap", "min_tracks"),
+        description="区间图着色，轨道数恰好等于最大重叠深度；同时开始的片段优先放到最左侧的连续空闲轨道，"
+        "下界与实际轨道数记录在 --trace 计数器中。",
+    )
+)
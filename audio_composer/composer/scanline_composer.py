@@ -1,4 +1,5 @@
 from collections import defaultdict
+import heapq
 
 from audio_composer.models.audioclip import AudioClip
 from audio_composer.models.audiotrack import AudioTrack
@@ -19,17 +20,17 @@ def scanline_composer(
     if not segments:
         return {}
 
-    # 按开始时间分组
-    start_time_groups: defaultdict[float, list[AudioClip]] = defaultdict(list)
+    # 按开始时间（整数 tick，相同时刻精确相等）分组
+    start_time_groups: defaultdict[int, list[AudioClip]] = defaultdict(list)
     for clip in segments:
-        start_time_groups[clip.start_offset].append(clip)
+        start_time_groups[clip.start_ticks].append(clip)
 
     # 按开始时间排序分组
     sorted_groups = sorted(start_time_groups.items(), key=lambda x: x[0])
 
     # 初始化轨道
     tracks: dict[int, list[AudioClip]] = {}  # 轨道编号到片段列表的映射
-    track_end_times: dict[int, float] = {}  # 轨道编号到最后一个片段结束时间的映射
+    track_end_times: dict[int, int] = {}  # 轨道编号到最后一个片段结束时间的映射
     next_track_id: int = 1  # 下一个可用轨道ID
 
     # 使用优先队列管理可用轨道（按轨道ID排序）
@@ -69,7 +70,7 @@ def scanline_composer(
             if track_id not in tracks:
                 tracks[track_id] = []
             tracks[track_id].append(clip)
-            track_end_times[track_id] = clip.end_offset
+            track_end_times[track_id] = clip.end_ticks
 
     return tracks
 
@@ -78,8 +79,11 @@ def scanline_composer_optimized(
     segments: list[AudioClip],
 ) -> dict[int, list[AudioClip]]:
     """
-    优化的扫描线算法，进一步减少轨道数量。
-    使用更智能的轨道分配策略，包括连续性优化和轨道压缩。
+    优化的扫描线算法，复杂度 O((n + k) log n)。
+    用结束时间最小堆管理占用中的轨道，用轨道编号最小堆管理空闲轨道：
+    每个开始时间分组只弹出已结束的轨道，优先复用编号最小的空闲轨道，
+    不足时创建新轨道。复用的空闲轨道编号不一定相邻，同一时刻开始的片段
+    不保证落在连续轨道上（需要时使用 min_tracks 策略）。
 
     参数:
         segments: 需要分配的片段列表。
@@ -89,85 +93,79 @@ def scanline_composer_optimized(
     if not segments:
         return {}
 
-    # 按开始时间分组
-    start_time_groups: defaultdict[float, list[AudioClip]] = defaultdict(list)
+    # 按开始时间（整数 tick，相同时刻精确相等）分组
+    start_time_groups: defaultdict[int, list[AudioClip]] = defaultdict(list)
     for clip in segments:
-        start_time_groups[clip.start_offset].append(clip)
+        start_time_groups[clip.start_ticks].append(clip)
 
     # 按开始时间排序分组
     sorted_groups = sorted(start_time_groups.items(), key=lambda x: x[0])
 
     # 初始化轨道
     tracks: dict[int, list[AudioClip]] = {}  # 轨道编号到片段列表的映射
-    track_end_times: dict[int, float] = {}  # 轨道编号到最后一个片段结束时间的映射
+    busy_tracks: list[tuple[int, int]] = []  # (结束时间, 轨道编号) 最小堆
+    free_tracks: list[int] = []  # 已释放的轨道编号最小堆
     next_track_id: int = 1  # 下一个可用轨道ID
 
-    # 使用优先队列管理可用轨道（按轨道ID排序）
-    available_tracks = []  # 已释放的轨道ID列表
-
     # 为每个分组分配轨道
     for start_time, group in sorted_groups:
-        group_size = len(group)
-
-        # 1. 清理已释放的轨道（结束时间 <= 当前开始时间）
-        released_tracks = []
-        for track_id, end_time in track_end_times.items():
-            if end_time <= start_time:
-                released_tracks.append(track_id)
+        # 1. 释放已结束的轨道（结束时间 <= 当前开始时间）
+        while busy_tracks and busy_tracks[0][0] <= start_time:
+            heapq.heappush(free_tracks, heapq.heappop(busy_tracks)[1])
+
+        # 2. 优先使用编号最小的已释放轨道，不够时创建新的连续轨道
+        for clip in group:
+            if free_tracks:
+                track_id = heapq.heappop(free_tracks)
+            else:
+                track_id = next_track_id
+                next_track_id += 1
+                tracks[track_id] = []
 
-        # 将释放的轨道添加到可用轨道列表
-        for track_id in released_tracks:
-            if track_id not in available_tracks:
-                available_tracks.append(track_id)
-                available_tracks.sort()  # 保持有序
+            # 3. 将片段分配到轨道
+            tracks[track_id].append(clip)
+            heapq.heappush(busy_tracks, (clip.end_ticks, track_id))
 
-        # 2. 智能轨道分配策略
-        needed_tracks = []
+    return tracks
 
-        # 策略1: 优先使用已释放的轨道
-        while available_tracks and len(needed_tracks) < group_size:
-            track_id = available_tracks.pop(0)  # 取最小的轨道ID
-            needed_tracks.append(track_id)
 
-        # 策略2: 如果还需要轨道，尝试寻找连续的空闲轨道
-        if len(needed_tracks) < group_size:
-            remaining_needed = group_size - len(needed_tracks)
-
-            # 寻找连续的空闲轨道
-            continuous_tracks = []
-            current_continuous = []
-
-            for track_id in range(1, next_track_id):
-                if (
-                    track_id not in track_end_times
-                    or track_end_times[track_id] <= start_time
-                ):
-                    current_continuous.append(track_id)
-                    if len(current_continuous) == remaining_needed:
-                        continuous_tracks = current_continuous
-                        break
-                else:
-                    current_continuous = []
-
-            # 如果找到足够的连续轨道，使用它们
-            if len(continuous_tracks) == remaining_needed:
-                needed_tracks.extend(continuous_tracks)
-            else:
-                # 否则创建新轨道
-                while len(needed_tracks) < group_size:
-                    needed_tracks.append(next_track_id)
-                    next_track_id += 1
+def assignment_to_tracks(
+    character: str, track_assignment: dict[int, list[AudioClip]]
+) -> list[AudioTrack]:
+    """
+    将轨道分配结果转换为按轨道编号排序的 AudioTrack 列表。
 
-        # 3. 将组内片段分配到轨道
-        for clip, track_id in zip(group, needed_tracks):
-            if track_id not in tracks:
-                tracks[track_id] = []
-            tracks[track_id].append(clip)
-            track_end_times[track_id] = clip.end_offset
+    参数:
+        character: 角色名称。
+        track_assignment: 轨道编号到片段列表的映射。
+    返回:
+        list[AudioTrack]: 音轨列表。
+    """
+    tracks: list[AudioTrack] = []
+    for track_num, track_clips in sorted(track_assignment.items()):
+        # 创建 AudioTrack，轨道索引从 1 开始，与原函数的命名约定一致
+        track = AudioTrack(character=character, index=track_num, clips=track_clips)
+        tracks.append(track)
 
     return tracks
 
 
+def generate_scanline_tracks(
+    character: str, clips: list[AudioClip]
+) -> list[AudioTrack]:
+    """
+    使用基础的 scanline_composer 生成不重叠的音轨。
+
+    参数:
+        character: 角色名称。
+        clips: 音频剪辑列表。
+    返回:
+        list[AudioTrack]: 生成的不重叠音轨列表。
+    """
+    clips.sort(key=lambda clip: clip.start_ticks)
+    return assignment_to_tracks(character, scanline_composer(clips))
+
+
 def generate_no_overlap_tracks(
     character: str, clips: list[AudioClip]
 ) -> list[AudioTrack]:
@@ -181,16 +179,10 @@ def generate_no_overlap_tracks(
         list[AudioTrack]: 生成的不重叠音轨列表。
     """
     # 按开始时间排序，与原函数保持一致
-    clips.sort(key=lambda clip: clip.start_offset)
+    clips.sort(key=lambda clip: clip.start_ticks)
 
     # 使用优化的 scanline_composer 分配轨道
     track_assignment = scanline_composer_optimized(clips)
 
     # 将分配结果转换回 AudioTrack 对象
-    tracks: list[AudioTrack] = []
-    for track_num, track_clips in sorted(track_assignment.items()):
-        # 创建 AudioTrack，轨道索引从 1 开始，与原函数的命名约定一致
-        track = AudioTrack(character=character, index=track_num, clips=track_clips)
-        tracks.append(track)
-
-    return tracks
+    return assignment_to_tracks(character, track_assignment)
@@ -0,0 +1,229 @@
+import os
+from collections.abc import Iterable
+from typing import TextIO
+
+import opentimelineio as otio
+from opentimelineio._otio import Gap
+from opentimelineio.core import Track
+from opentimelineio.schema import Timeline
+from opentimelineio.opentime import TimeRange, to_frames, RationalTime
+
+from audio_composer.models.audiotrack import AudioTrack
+from davinci_resolve.metadata_manager.fx_template import EffectPreset
+from utils.instrumentation import count, span
+from utils.logger import logger
+
+
+def create_timeline(global_start_hour: int, fps: float) -> Timeline:
+    """
+    创建一个新的 OTIO 时间轴并设置元数据和全局起始时间。
+
+    :param global_start_hour: 时间轴的全局起始时间（小时）。
+    :param fps: 时间轴的帧率。
+    :return: 一个 OTIO 时间轴实例。
+    """
+    # 创建时间轴实例并设置名称
+    timeline = Timeline()
+
+    # 设置全局起始时间
+    seconds = global_start_hour * 60**2
+    hour_one_frames = to_frames(RationalTime(value=seconds), rate=fps)
+    timeline.global_start_time = RationalTime(hour_one_frames, fps)
+
+    # 添加元数据
+    timeline.metadata["Resolve_OTIO"] = {"Resolve OTIO Meta Version": "1.0"}
+    return timeline
+
+
+def create_audio_track(
+    track: AudioTrack, afx_preset: EffectPreset | None = None
+) -> Track:
+    """
+    创建指定数量的空 OTIO 轨道。
+
+    :param trk_count: 要创建的轨道数量。
+    :param afx_preset: 剪辑的音频效果预设，默认使用达芬奇默认音频效果。
+    :return: 一个包含 OTIO 轨道实例的列表。
+    """
+    # 创建指定数量的轨道
+    tr = Track(track.track_name, kind="Audio")
+    tr.metadata["Resolve_OTIO"] = {
+        "Audio Type": "Mono",
+        "Locked": False,
+        "SoloOn": False,
+    }
+    # 间隙只在这里生成，轨道上只保存剪辑
+    for clip in track.clips_with_gaps():
+        tr.append(clip.build_otio(afx_preset, track.shared))
+    return tr
+
+
+def set_track_source_range(track: Track, start_time: RationalTime):
+    """
+    将轨道的来源范围设置为与全局起始时间匹配。
+
+    :param track: 要更新的 OTIO 轨道。
+    :param start_time: 要设置的起始时间。
+    """
+    track.source_range = TimeRange(start_time, track.duration())
+
+
+def generate_first_empty_track(duration: float = 576) -> Track:
+    tr = Track(name="Video 1")
+    tr.metadata["Resolve_OTIO"] = {"Locked": False}
+
+    gap = Gap()
+    time_range = TimeRange(duration=RationalTime(rate=24, value=duration))
+    gap.source_range = time_range
+
+    tr.append(gap)
+
+    return tr
+
+
+# 流式写出时用来定位轨道插入位置的占位轨道名
+STREAM_SENTINEL_NAME = "__audio_otio_composer_stream_sentinel__"
+
+
+def indent_json_block(text: str, indent: int) -> str:
+    """
+    将单独序列化的 JSON 块缩进到嵌套位置。JSON 字符串中的换行都会被转义，
+    因此文本中的换行一定是结构性的。
+    """
+    return text.replace("\n", "\n" + " " * indent)
+
+
+def write_otio_stream(
+    audio_tracks: Iterable[AudioTrack | str],
+    global_start_hour: int = 0,
+    fps: float = 24.0,
+    output: str = "",
+    afx_preset: EffectPreset | None = None,
+    layout: list[tuple[int, int]] | None = None,
+):
+    """
+    逐轨道流式写出 OTIO 文件，输出与 make_otio 完全相同，
+    但内存中同时只保留一个轨道的 OTIO 对象和 JSON 文本。
+    先写到 {output}.otio.partial，全部写完后再替换；出错时删除临时文件，不留下不完整的输出。
+
+    :param audio_tracks: 音轨，可以是生成器；字符串表示之前写出的、已缩进的轨道 JSON 文本，
+        会原样写入（增量导出时复用未变化的轨道）。
+    :param global_start_hour: 时间轴的全局起始时间（小时）。
+    :param fps: 时间轴的帧率。
+    :param output: 输出文件名（不含 .otio 后缀）。
+    :param afx_preset: 剪辑的音频效果预设。
+    :param layout: 提供时，按轨道顺序追加 (文件位置, 文本长度)，可用 read_track_block 读回。
+    """
+    logger.info("start to stream otio file ...")
+    # 用一个占位轨道序列化时间轴骨架，切分出轨道列表前后的文本
+    timeline = create_timeline(global_start_hour, fps)
+    timeline.tracks.append(Track(name="Video 1"))
+    sentinel = Track(name=STREAM_SENTINEL_NAME)
+    timeline.tracks.append(sentinel)
+    skeleton = otio.adapters.write_to_string(timeline, "otio_json")
+
+    name_line = f'"name": "{STREAM_SENTINEL_NAME}"'
+    line_start = skeleton.rindex("\n", 0, skeleton.index(name_line)) + 1
+    indent = skeleton.index(name_line) - line_start - 4
+    sentinel_block = indent_json_block(
+        otio.adapters.write_to_string(sentinel, "otio_json"), indent
+    )
+    block_start = skeleton.index(sentinel_block)
+    prefix = skeleton[:block_start]
+    suffix = skeleton[block_start + len(sentinel_block) :]
+    separator = ",\n" + " " * indent
+
+    hour_one_frames = to_frames(RationalTime(global_start_hour * 60**2), rate=fps)
+    # 先写临时文件，全部写完后再替换；轨道生成器中途出错时不会留下不完整的 .otio
+    partial_path = f"{output}.otio.partial"
+    try:
+        with open(partial_path, "w", encoding="utf-8", buffering=1 << 20) as file:
+            file.write(prefix)
+            written = 0
+            for audio_track in audio_tracks:
+                if isinstance(audio_track, str):
+                    block = audio_track
+                else:
+                    with span("otio_build"):
+                        track = create_audio_track(audio_track, afx_preset)
+                        set_track_source_range(
+                            track, RationalTime(-hour_one_frames, fps)
+                        )
+                        block = indent_json_block(
+                            otio.adapters.write_to_string(track, "otio_json"), indent
+                        )
+                    count("clips_exported", len(audio_track.clips))
+                with span("write"):
+                    if written:
+                        file.write(separator)
+                    if layout is not None:
+                        layout.append((file.tell(), len(block)))
+                    file.write(block)
+                written += 1
+
+            if not written:
+                # 没有音轨时去掉视频轨道后的分隔符
+                file.seek(0)
+                file.truncate()
+                file.write(prefix.rstrip()[:-1])
+            file.write(suffix)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, f"{output}.otio")
+    logger.info("Finished!!")
+
+
+def read_track_block(file: TextIO, position: int, length: int) -> str:
+    """
+    读回 write_otio_stream 记录在 layout 中的轨道 JSON 文本。
+
+    :param file: 以文本模式（utf-8）打开的 OTIO 文件。
+    :param position: 轨道文本的起始位置。
+    :param length: 轨道文本的长度（字符数）。
+    :return: 已缩进的轨道 JSON 文本，可以直接交给 write_otio_stream。
+    """
+    file.seek(position)
+    return file.read(length)
+
+
+def make_otio(
+    audio_tracks: list[AudioTrack],
+    global_start_hour: int = 0,
+    fps: float = 24.0,
+    output: str = "",
+    stream: bool = False,
+    afx_preset: EffectPreset | None = None,
+):
+    """
+    生成一个包含随机轨道和剪辑的 OTIO 时间轴。
+
+    :param trk_count: 要创建的轨道数量。
+    :param clp_count: 每个轨道的剪辑数量。
+    :param global_start_hour: 时间轴的全局起始时间（小时）。
+    :param fps: 时间轴的帧率。
+    :param stream: 为 True 时逐轨道流式写出，内存占用只与最大的轨道有关。
+    :param afx_preset: 剪辑的音频效果预设，默认使用达芬奇默认音频效果。
+    """
+    if stream:
+        write_otio_stream(audio_tracks, global_start_hour, fps, output, afx_preset)
+        return
+
+    logger.info("start to export otio file ...")
+    timeline = create_timeline(global_start_hour, fps)
+    # 添加一个占位用的视频轨道
+    timeline.tracks.append(Track(name="Video 1"))
+    with span("otio_build"):
+        tracks = [create_audio_track(tr, afx_preset) for tr in audio_tracks]
+
+        hour_one_frames = to_frames(RationalTime(global_start_hour * 60**2), rate=fps)
+        for track in tracks:
+            set_track_source_range(track, RationalTime(-hour_one_frames, fps))
+            timeline.tracks.append(track)
+    count("clips_exported", sum(len(tr.clips) for tr in audio_tracks))
+
+    # 输出 OTIO 文件
+    with span("write"):
+        otio.adapters.write_to_file(timeline, f"{output}.otio")
+    logger.info("Finished!!")
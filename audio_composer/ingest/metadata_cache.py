@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from audio_composer.models.wav_metadata import WavMetadata
+from utils.paths import default_cache_dir
+
+CACHE_FILE_NAME = "wav_metadata.sqlite3"
+DEFAULT_MAX_ENTRIES = 500_000
+# 缓存内容的版本，保存在 PRAGMA user_version 中。块头的解析方式（wav_reader、riff_probe）
+# 或表结构变化时加一，旧版本写入的条目在打开缓存时全部丢弃
+CACHE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wav_metadata (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    channel_count INTEGER NOT NULL,
+    frame_count INTEGER NOT NULL,
+    time_reference INTEGER,
+    artist TEXT,
+    last_used INTEGER NOT NULL
+)
+"""
+
+
+def file_signature(audio_file: str) -> tuple[str, int, int]:
+    """
+    获取文件的缓存键。
+
+    参数:
+        audio_file (str): 文件路径。
+
+    返回:
+        tuple[str, int, int]: 绝对路径、文件大小和修改时间（纳秒）。
+    """
+    stat = os.stat(audio_file)
+    return os.path.abspath(audio_file), stat.st_size, stat.st_mtime_ns
+
+
+class MetadataCache:
+    """
+    持久化的 wav 元数据缓存，以绝对路径、文件大小和修改时间为键。
+    文件大小或修改时间变化时缓存自动失效，条目数超过上限时淘汰最久未使用的条目。
+    由其他版本（CACHE_VERSION 不同）写入的缓存在打开时清空。
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        if db_path is None:
+            db_path = default_cache_dir() / CACHE_FILE_NAME
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        # 批处理时多个进程可能共用同一个缓存文件
+        self.connection = sqlite3.connect(self.db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        # 条目数的上界估计：写入时累加，超过上限时才查询实际条目数并淘汰
+        self._count_estimate = len(self)
+
+    def _migrate(self) -> None:
+        """版本不一致时丢弃所有条目并重建表。"""
+        with self.connection:
+            # 立即加写锁，多个进程同时打开旧缓存时只有一个进程重建
+            self.connection.execute("BEGIN IMMEDIATE")
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != CACHE_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS wav_metadata")
+                self.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+            self.connection.execute(SCHEMA)
+
+    def lookup_many(
+        self, keys: Iterable[tuple[str, int, int]]
+    ) -> list[WavMetadata | None]:
+        """
+        批量查询缓存。
+
+        参数:
+            keys: file_signature 返回的缓存键。
+
+        返回:
+            list[WavMetadata | None]: 与输入顺序一致，未命中或已失效时为 None。
+        """
+        now = time.time_ns()
+        results: list[WavMetadata | None] = []
+        hits: list[tuple[int, str]] = []
+        cursor = self.connection.cursor()
+        for path, size, mtime_ns in keys:
+            row = cursor.execute(
+                "SELECT size, mtime_ns, sample_rate, channel_count, frame_count, "
+                "time_reference, artist FROM wav_metadata WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if row is None or row[0] != size or row[1] != mtime_ns:
+                results.append(None)
+                continue
+            results.append(WavMetadata(*row[2:]))
+            hits.append((now, path))
+
+        cursor.executemany("UPDATE wav_metadata SET last_used = ? WHERE path = ?", hits)
+        self.connection.commit()
+        return results
+
+    def store_many(
+        self, entries: Iterable[tuple[tuple[str, int, int], WavMetadata]]
+    ) -> None:
+        """
+        批量写入缓存，同一路径的旧条目会被替换；估计的条目数超过上限时才淘汰。
+
+        参数:
+            entries: (缓存键, 元数据) 序列。
+        """
+        now = time.time_ns()
+        rows = [
+            (
+                path,
+                size,
+                mtime_ns,
+                metadata.sample_rate,
+                metadata.channel_count,
+                metadata.frame_count,
+                metadata.time_reference,
+                metadata.artist,
+                now,
+            )
+            for (path, size, mtime_ns), metadata in entries
+        ]
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO wav_metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        # 替换已有条目时估计值偏大，只会多查询一次实际条目数
+        self._count_estimate += len(rows)
+        if self._count_estimate > self.max_entries:
+            self.evict()
+        self.connection.commit()
+
+    def evict(self) -> None:
+        """淘汰最久未使用的条目，使条目数不超过 max_entries。"""
+        count = len(self)
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.connection.execute(
+                "DELETE FROM wav_metadata WHERE path IN ("
+                "SELECT path FROM wav_metadata ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+            count -= overflow
+        self._count_estimate = count
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM wav_metadata").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "MetadataCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,90 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal, TypeVar
+
+from audio_composer.ingest.wav_reader import read_wav_metadata
+from audio_composer.models.wav_metadata import WavMetadata
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+PoolKind = Literal["thread", "process"]
+
+
+def create_executor(kind: PoolKind, workers: int) -> Executor:
+    """
+    根据类型创建线程池或进程池。
+
+    参数:
+        kind (PoolKind): "thread" 适合网络存储等 I/O 密集场景，"process" 可以利用多核解析。
+        workers (int): 工作者数量。
+
+    返回:
+        Executor: 对应的执行器。
+    """
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"Unknown pool kind: {kind}. Expected 'thread' or 'process'.")
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    executor: Executor,
+    max_in_flight: int,
+) -> Iterator[R]:
+    """
+    与 Executor.map 类似，但同时提交的任务数量不超过 max_in_flight，
+    并且按输入顺序逐个产出结果，输入可以是惰性的迭代器。
+
+    参数:
+        func: 在执行器中运行的函数。
+        items: 输入序列。
+        executor: 执行器。
+        max_in_flight: 同时处于排队或执行中的最大任务数。
+
+    返回:
+        Iterator[R]: 与输入顺序一致的结果。
+    """
+    pending: deque[Future[R]] = deque()
+    try:
+        for item in items:
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # 消费者提前退出或出错时，取消尚未开始的任务
+        for future in pending:
+            future.cancel()
+
+
+def read_metadata_parallel(
+    audio_files: Iterable[str],
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    max_in_flight: int | None = None,
+) -> Iterator[WavMetadata | None]:
+    """
+    并行读取 wav 元数据，结果顺序与输入一致。
+
+    参数:
+        audio_files: wav 文件路径。
+        workers (int): 工作者数量，小于等于 1 时在当前线程中顺序读取。
+        pool (PoolKind): 线程池或进程池。
+        max_in_flight (int | None): 同时在途的最大任务数，默认为 workers 的 4 倍。
+
+    返回:
+        Iterator[WavMetadata | None]: 每个文件的元数据。
+    """
+    if workers <= 1:
+        yield from map(read_wav_metadata, audio_files)
+        return
+
+    in_flight = max_in_flight or workers * 4
+    with create_executor(pool, workers) as executor:
+        yield from bounded_map(read_wav_metadata, audio_files, executor, in_flight)
@@ -0,0 +1,189 @@
+import mmap
+import struct
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from audio_composer.models.wav_metadata import WavMetadata
+
+# RIFF 容器的 4 字节标识
+RIFF_IDS = (b"RIFF", b"RF64", b"BW64")
+# 块大小可能超过 32 位、需要查 ds64 的容器
+LARGE_RIFF_IDS = (b"RF64", b"BW64")
+WAVE_ID = b"WAVE"
+
+# RF64 中，真实大小保存在 ds64 块里的 32 位占位值
+SIZE_PLACEHOLDER = 0xFFFFFFFF
+
+# bext 块中 time_reference（64 位）前面各字段的总长度：
+# description(256) + originator(32) + originator_reference(32) + date(10) + time(8)
+BEXT_TIME_REFERENCE_OFFSET = 338
+
+FMT_STRUCT = struct.Struct("<HHIIHH")
+# ds64：riff 大小、data 大小、采样数（各 64 位）、大小表条目数
+DS64_STRUCT = struct.Struct("<QQQI")
+# ds64 大小表的条目：块标识、64 位块大小
+DS64_ENTRY = struct.Struct("<4sQ")
+CHUNK_HEADER = struct.Struct("<4sI")
+
+
+class UnsupportedWavError(Exception):
+    """快速探测无法处理的 wav 文件，调用方应退回到完整解析。"""
+
+
+class RiffChunk(NamedTuple):
+    """块标识、块数据在文件中的起始位置和真实大小（RF64 中已替换为 ds64 中的 64 位大小）。"""
+
+    ident: bytes
+    offset: int
+    size: int
+
+
+def iter_chunks(view: memoryview) -> Iterator[RiffChunk]:
+    """
+    按偏移在块头之间跳转，依次产出 RIFF/RF64/BW64 文件的顶层块，不读取块数据。
+
+    RF64 和 BW64 中大小为 0xFFFFFFFF 的块，真实大小从 ds64 块读取：
+    data 块使用 ds64 的 data 大小，其他块（例如超过 4GB 的 JUNK、axml）查 ds64 的大小表。
+
+    参数:
+        view (memoryview): 整个文件的内存映射视图。
+
+    返回:
+        Iterator[RiffChunk]: 顶层块。
+
+    异常:
+        UnsupportedWavError: 不是 wave 文件，或 ds64 缺失、损坏。
+    """
+    if len(view) < 12 or view[:4] not in RIFF_IDS or view[8:12] != WAVE_ID:
+        raise UnsupportedWavError("Not a RIFF/RF64 wave file")
+    large = view[:4] in LARGE_RIFF_IDS
+    large_sizes: dict[bytes, int] = {}
+
+    position = 12
+    while position + CHUNK_HEADER.size <= len(view):
+        ident, size = CHUNK_HEADER.unpack_from(view, position)
+        body = position + CHUNK_HEADER.size
+
+        if ident == b"ds64":
+            if size < DS64_STRUCT.size or body + size > len(view):
+                raise UnsupportedWavError("Truncated ds64 chunk")
+            _, data_size, _, table_length = DS64_STRUCT.unpack_from(view, body)
+            large_sizes[b"data"] = data_size
+            table = body + DS64_STRUCT.size
+            if table + table_length * DS64_ENTRY.size > body + size:
+                raise UnsupportedWavError("Truncated ds64 size table")
+            for entry in range(table_length):
+                chunk_id, chunk_size = DS64_ENTRY.unpack_from(
+                    view, table + entry * DS64_ENTRY.size
+                )
+                large_sizes[chunk_id] = chunk_size
+        elif large and size == SIZE_PLACEHOLDER:
+            if ident not in large_sizes:
+                raise UnsupportedWavError(f"No ds64 size for {ident!r} chunk")
+            size = large_sizes[ident]
+
+        yield RiffChunk(ident, body, size)
+        position = body + size + (size & 1)
+
+
+def parse_info_artist(info_data: bytes, encoding: str = "utf8") -> str:
+    """
+    从 LIST-INFO 块（不含 "INFO" 标识）的子块中读取 IART 字段。
+
+    参数:
+        info_data (bytes): INFO 子块数据。
+        encoding (str): 文本编码。
+
+    返回:
+        str: 艺术家（角色名），不存在时返回空字符串。
+    """
+    position = 0
+    while position + CHUNK_HEADER.size <= len(info_data):
+        ident, size = CHUNK_HEADER.unpack_from(info_data, position)
+        position += CHUNK_HEADER.size
+        if ident == b"IART":
+            raw = info_data[position : position + size]
+            return bytes(raw).decode(encoding).rstrip("\0")
+        position += size + (size & 1)
+    return ""
+
+
+def probe_wav_header(audio_file: str) -> WavMetadata:
+    """
+    把文件映射到内存，只按偏移读取 RIFF/RF64/BW64 块头，直接定位 fmt、bext、
+    LIST-INFO、ds64 和 data 块。块数据通过 memoryview 切片按需读取，
+    跳过的 JUNK、iXML、axml 和音频数据不会被读入（几 GB 的多轨录音也只访问块头所在的页）。
+
+    参数:
+        audio_file (str): wav 文件路径。
+
+    返回:
+        WavMetadata: 元数据。
+
+    异常:
+        UnsupportedWavError: 文件结构不在快速路径支持范围内。
+    """
+    with open(audio_file, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as error:
+            # 空文件无法映射
+            raise UnsupportedWavError(f"{error}: {audio_file}") from error
+    with mapped, memoryview(mapped) as view:
+        try:
+            return _probe_view(view)
+        except UnsupportedWavError as error:
+            raise UnsupportedWavError(f"{error}: {audio_file}") from error
+
+
+def _probe_view(view: memoryview) -> WavMetadata:
+    fmt: tuple | None = None
+    data_size: int | None = None
+    time_reference: int | None = None
+    artist: str | None = None
+
+    for ident, body, size in iter_chunks(view):
+        if ident == b"fmt ":
+            if body + FMT_STRUCT.size > len(view):
+                raise UnsupportedWavError("Truncated fmt chunk")
+            fmt = FMT_STRUCT.unpack_from(view, body)
+        elif ident == b"bext":
+            end = body + BEXT_TIME_REFERENCE_OFFSET + 8
+            if size < BEXT_TIME_REFERENCE_OFFSET + 8 or end > len(view):
+                raise UnsupportedWavError("Short bext chunk")
+            time_reference = struct.unpack_from(
+                "<Q", view, body + BEXT_TIME_REFERENCE_OFFSET
+            )[0]
+        elif ident == b"LIST" and size >= 4 and view[body : body + 4] == b"INFO":
+            if body + size > len(view):
+                raise UnsupportedWavError("Truncated LIST chunk")
+            # 复制出来再解析，异常回溯不会持有映射的切片（否则无法关闭映射）
+            info_data = bytes(view[body + 4 : body + size])
+            try:
+                artist = parse_info_artist(info_data)
+            except UnicodeDecodeError as error:
+                raise UnsupportedWavError(str(error)) from error
+        elif ident == b"data":
+            data_size = size
+
+        if (
+            fmt is not None
+            and data_size is not None
+            and time_reference is not None
+            and artist is not None
+        ):
+            break
+
+    if fmt is None or data_size is None:
+        raise UnsupportedWavError("Missing fmt or data chunk")
+    _, channel_count, sample_rate, _, block_align, _ = fmt
+    if block_align == 0 or sample_rate == 0:
+        raise UnsupportedWavError("Invalid fmt chunk")
+
+    return WavMetadata(
+        sample_rate=sample_rate,
+        channel_count=channel_count,
+        frame_count=data_size // block_align,
+        time_reference=time_reference,
+        artist=artist,
+    )
@@ -0,0 +1,286 @@
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from audio_composer.ingest.parallel_loader import (
+    PoolKind,
+    bounded_map,
+    create_executor,
+    read_metadata_parallel,
+)
+from audio_composer.ingest.wav_reader import find_wav_files, read_wav_metadata
+from audio_composer.models.wav_metadata import WavMetadata
+
+# 会话文件夹根目录下的索引文件名
+INDEX_FILE_NAME = "audio_index.jsonl"
+INDEX_FORMAT = "audio_otio_composer.index"
+INDEX_VERSION = 1
+# 每行一个 JSON 数组，字段顺序如下；size、mtime_ns 可以为 null（例如由 TTS 生成器直接写出），
+# 元数据字段全部为 null 表示该文件不是有效的 wav
+INDEX_FIELDS = (
+    "path",
+    "size",
+    "mtime_ns",
+    "sample_rate",
+    "channel_count",
+    "frame_count",
+    "time_reference",
+    "artist",
+)
+
+
+class IndexFormatError(ValueError):
+    """索引文件的格式或版本不正确。"""
+
+
+class IndexEntry(NamedTuple):
+    """索引中的一个文件，path 为相对于会话文件夹、以 / 分隔的路径。"""
+
+    path: str
+    size: int | None
+    mtime_ns: int | None
+    metadata: WavMetadata | None
+
+
+@dataclass
+class IndexReport:
+    """validate_index 的结果，各列表中是相对路径。"""
+
+    # 索引中有、文件夹中没有的文件
+    missing: list[str] = field(default_factory=list)
+    # 文件夹中有、索引中没有的文件
+    unindexed: list[str] = field(default_factory=list)
+    # 大小或修改时间与索引不一致的文件
+    stale: list[str] = field(default_factory=list)
+    # 重新读取的块头与索引中的元数据不一致的文件（只在 check_headers 时检查）
+    mismatched: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.unindexed or self.stale or self.mismatched)
+
+
+def index_path(folder: str) -> Path:
+    """会话文件夹对应的索引文件路径。"""
+    return Path(folder) / INDEX_FILE_NAME
+
+
+def entry_to_row(entry: IndexEntry) -> list[Any]:
+    metadata = entry.metadata
+    if metadata is None:
+        values = [None] * 5
+    else:
+        values = [
+            metadata.sample_rate,
+            metadata.channel_count,
+            metadata.frame_count,
+            metadata.time_reference,
+            metadata.artist,
+        ]
+    return [entry.path, entry.size, entry.mtime_ns, *values]
+
+
+def entry_from_row(row: list[Any]) -> IndexEntry:
+    if len(row) != len(INDEX_FIELDS):
+        raise IndexFormatError(f"Expected {len(INDEX_FIELDS)} fields, got {row}")
+    path, size, mtime_ns, sample_rate, *values = row
+    metadata = None if sample_rate is None else WavMetadata(sample_rate, *values)
+    return IndexEntry(path, size, mtime_ns, metadata)
+
+
+def write_index(folder: str, entries: Iterable[IndexEntry]) -> Path:
+    """
+    写出索引文件：第一行是格式说明，之后每行一个文件。先写临时文件再替换，
+    读取方不会读到写了一半的索引。
+
+    参数:
+        folder (str): 会话文件夹。
+        entries: 索引条目。
+
+    返回:
+        Path: 索引文件路径。
+    """
+    path = index_path(folder)
+    temporary = path.with_name(path.name + ".partial")
+    header = {"format": INDEX_FORMAT, "version": INDEX_VERSION, "fields": INDEX_FIELDS}
+    with open(temporary, "w", encoding="utf-8", newline="\n") as file:
+        file.write(json.dumps(header) + "\n")
+        for entry in entries:
+            file.write(json.dumps(entry_to_row(entry), ensure_ascii=False) + "\n")
+    os.replace(temporary, path)
+    return path
+
+
+def read_index(folder: str) -> list[IndexEntry] | None:
+    """
+    一次顺序读取整个索引，不访问任何 wav 文件。
+
+    参数:
+        folder (str): 会话文件夹。
+
+    返回:
+        list[IndexEntry] | None: 索引条目，文件夹中没有索引时返回 None。
+
+    异常:
+        IndexFormatError: 索引的格式或版本不正确。
+    """
+    try:
+        file = open(index_path(folder), encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    with file:
+        try:
+            header = json.loads(file.readline())
+        except json.JSONDecodeError as error:
+            raise IndexFormatError(f"Invalid index header: {error}") from error
+        if not isinstance(header, dict) or header.get("format") != INDEX_FORMAT:
+            raise IndexFormatError(f"Not an audio index: {index_path(folder)}")
+        if header.get("version") != INDEX_VERSION:
+            raise IndexFormatError(f"Unsupported index version: {header.get('version')}")
+        entries = []
+        # 第一行是格式说明，条目从第二行开始
+        for number, line in enumerate(file, start=2):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise IndexFormatError(f"Invalid index line {number}: {error}") from error
+            if not isinstance(row, list):
+                raise IndexFormatError(f"Invalid index line {number}: expected a list")
+            try:
+                entries.append(entry_from_row(row))
+            except IndexFormatError as error:
+                raise IndexFormatError(f"Invalid index line {number}: {error}") from None
+        return entries
+
+
+def scan_index_entries(
+    folder: str, workers: int = 1, pool: PoolKind = "thread"
+) -> list[IndexEntry]:
+    """
+    遍历文件夹中的 wav 文件，读取块头生成索引条目，顺序与 find_wav_files 相同。
+
+    参数:
+        folder (str): 会话文件夹。
+        workers (int): 并行读取元数据的工作者数量。
+        pool (PoolKind): 线程池或进程池。
+
+    返回:
+        list[IndexEntry]: 索引条目。
+    """
+    root = Path(folder)
+    relative_paths = [
+        audio_file.relative_to(root).as_posix() for audio_file in find_wav_files(root)
+    ]
+    audio_files = [str(root / relative) for relative in relative_paths]
+    metadata_list = read_metadata_parallel(audio_files, workers, pool)
+    entries = []
+    for relative, audio_file, metadata in zip(relative_paths, audio_files, metadata_list):
+        stat = os.stat(audio_file)
+        entries.append(IndexEntry(relative, stat.st_size, stat.st_mtime_ns, metadata))
+    return entries
+
+
+def build_index(folder: str, workers: int = 1, pool: PoolKind = "thread") -> Path:
+    """
+    为文件夹生成（或重新生成）索引。
+
+    参数:
+        folder (str): 会话文件夹。
+        workers (int): 并行读取元数据的工作者数量。
+        pool (PoolKind): 线程池或进程池。
+
+    返回:
+        Path: 索引文件路径。
+    """
+    return write_index(folder, scan_index_entries(folder, workers, pool))
+
+
+def read_metadata_or_none(audio_file: str) -> WavMetadata | None:
+    """读取元数据，文件损坏（例如正在写入、被截断）时返回 None 而不是抛出异常。"""
+    try:
+        return read_wav_metadata(audio_file)
+    except Exception:
+        return None
+
+
+def compare_index(folder: str, entries: list[IndexEntry]) -> IndexReport:
+    """
+    比较索引条目与文件夹：遍历目录并 stat 每个文件，不打开任何 wav 文件。
+
+    参数:
+        folder (str): 会话文件夹。
+        entries (list[IndexEntry]): read_index 读出的索引条目。
+
+    返回:
+        IndexReport: 缺失、未索引和过期的文件，不检查块头。
+    """
+    root = Path(folder)
+    on_disk = {
+        audio_file.relative_to(root).as_posix() for audio_file in find_wav_files(root)
+    }
+    indexed = {entry.path for entry in entries}
+
+    report = IndexReport(
+        missing=sorted(indexed - on_disk),
+        unindexed=sorted(on_disk - indexed),
+    )
+    for entry in entries:
+        if entry.path not in on_disk:
+            continue
+        stat = os.stat(root / entry.path)
+        if (entry.size is not None and entry.size != stat.st_size) or (
+            entry.mtime_ns is not None and entry.mtime_ns != stat.st_mtime_ns
+        ):
+            report.stale.append(entry.path)
+    return report
+
+
+def validate_index(
+    folder: str,
+    check_headers: bool = False,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+) -> IndexReport:
+    """
+    检查索引是否与文件夹一致：文件是否齐全、大小和修改时间是否变化，
+    check_headers 为 True 时还会重新读取每个文件的块头与索引比较。
+
+    参数:
+        folder (str): 会话文件夹。
+        check_headers (bool): 是否重新读取块头。
+        workers (int): 并行读取元数据的工作者数量。
+        pool (PoolKind): 线程池或进程池。
+
+    返回:
+        IndexReport: 检查结果。
+
+    异常:
+        FileNotFoundError: 文件夹中没有索引。
+        IndexFormatError: 索引的格式或版本不正确。
+    """
+    entries = read_index(folder)
+    if entries is None:
+        raise FileNotFoundError(index_path(folder))
+
+    report = compare_index(folder, entries)
+    if check_headers:
+        root = Path(folder)
+        missing = set(report.missing)
+        present = [entry for entry in entries if entry.path not in missing]
+        audio_files = [str(root / entry.path) for entry in present]
+        if workers <= 1:
+            metadata_list = list(map(read_metadata_or_none, audio_files))
+        else:
+            with create_executor(pool, workers) as executor:
+                metadata_list = list(
+                    bounded_map(read_metadata_or_none, audio_files, executor, workers * 4)
+                )
+        for entry, metadata in zip(present, metadata_list):
+            if metadata != entry.metadata:
+                report.mismatched.append(entry.path)
+    return report
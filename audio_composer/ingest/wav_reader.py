@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from audio_composer.ingest.riff_probe import UnsupportedWavError, probe_wav_header
+from audio_composer.models.wav_metadata import WavMetadata
+
+
+def is_wav_name(name: str) -> bool:
+    """文件名是否以 .wav 结尾，不区分大小写（与 Windows 上的 glob 一致）。"""
+    return name.lower().endswith(".wav")
+
+
+def wav_sort_key(relative_path: str | Path) -> tuple[str, ...]:
+    """
+    文件在会话中的排序键：相对路径的各级名称。按它排序与深度优先、
+    每个目录内按名称排序（文件和子目录混合排序）的遍历顺序相同。
+    所有读取文件夹的方式（find_wav_files、流式遍历、索引）都使用这个顺序，
+    开始时间相同的剪辑在编排时的先后顺序因此与读取方式无关。
+    """
+    return Path(relative_path).parts
+
+
+def find_wav_files(folder: str | Path) -> list[Path]:
+    """
+    递归查找文件夹中的所有 wav 文件，后缀不区分大小写，在所有系统上找到的文件相同。
+
+    参数:
+        folder (str | Path): 文件夹路径。
+
+    返回:
+        list[Path]: 文件路径，按 wav_sort_key 排序，与文件系统的返回顺序无关。
+    """
+    root = Path(folder)
+    return sorted(
+        (path for path in root.rglob("*") if is_wav_name(path.name)),
+        key=lambda path: wav_sort_key(path.relative_to(root)),
+    )
+
+
+def read_wav_metadata(audio_file: str) -> WavMetadata | None:
+    """
+    读取 wav 文件中生成 AudioClip 所需的元数据。
+    优先使用只读块头的快速探测，遇到特殊文件时退回到 wavinfo 的完整解析。
+
+    参数:
+        audio_file (str): wav 文件路径。
+
+    返回:
+        WavMetadata | None: 元数据，缺少 fmt 或 data 块时返回 None。
+    """
+    try:
+        return probe_wav_header(audio_file)
+    except UnsupportedWavError:
+        return read_wav_metadata_full(audio_file)
+
+
+def read_wav_metadata_full(audio_file: str) -> WavMetadata | None:
+    """
+    使用 wavinfo 完整解析 wav 文件，读取生成 AudioClip 所需的元数据。
+
+    参数:
+        audio_file (str): wav 文件路径。
+
+    返回:
+        WavMetadata | None: 元数据，缺少 fmt 或 data 块时返回 None。
+    """
+    # wavinfo（连带 lxml）导入较慢，只在快速探测失败时才需要
+    import wavinfo
+
+    info = wavinfo.WavInfoReader(audio_file, info_encoding="utf8", bext_encoding="utf8")
+    if not info or not info.fmt or not info.data:
+        return None
+
+    return WavMetadata(
+        sample_rate=info.fmt.sample_rate,
+        channel_count=info.fmt.channel_count,
+        frame_count=info.data.frame_count,
+        time_reference=info.bext.time_reference if info.bext else None,
+        artist=(info.info.artist or "") if info.info else None,
+    )
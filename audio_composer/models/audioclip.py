@@ -1,74 +1,145 @@
-from opentimelineio.opentime import TimeRange, RationalTime
-from opentimelineio.schema import Clip, ExternalReference, Gap
 from pathlib import Path
-import wavinfo
-
-from davinci_resolve.metadata_manager.fx_generator import add_default_afxs
+from typing import TYPE_CHECKING
+import os
+
+from audio_composer.ingest.wav_reader import read_wav_metadata
+from audio_composer.models.timing import (
+    samples_to_ticks,
+    seconds_to_ticks,
+    ticks_to_rational,
+    ticks_to_seconds,
+)
+from audio_composer.models.wav_metadata import WavMetadata
 from utils.logger import logger
 
+if TYPE_CHECKING:
+    # OTIO 和效果模板只在导出时需要，延迟导入以加快命令行和 GUI 的启动
+    from opentimelineio.schema import Clip, Gap
+    from davinci_resolve.metadata_manager.fx_template import EffectPreset
 
-class AudioClip:
-    audio_path: str
-    character: str = "character A"
-    start_offset: float = 0.0
-    duration: float = 0.0
-    frame_rate: float = 24.0
+# OTIO 剪辑元数据中本工具使用的命名空间
+CLIP_METADATA_KEY = "audio_composer"
 
-    def __init__(self, audio_file: str, rate: float = 24.0):
-        self.audio_range = TimeRange()
-        self.clip: Clip | Gap = Clip()
 
-        audio_path = Path(audio_file)
-        self.audio_path = str(audio_path.absolute())
-        self.clip.name = audio_path.name
+class AudioClip:
+    """
+    轻量的音频剪辑记录，编排轨道时只需要起止时间和角色。
+    时间以整数 tick 保存（见 audio_composer.models.timing），比较和分组都是精确的；
+    start_offset、duration 等秒数只是换算出来的视图。
+    OTIO 对象（Clip、TimeRange、ExternalReference、效果）在导出时由 build_otio 生成。
+    """
+
+    __slots__ = (
+        "audio_path",
+        "name",
+        "character",
+        "start_ticks",
+        "duration_ticks",
+        "frame_rate",
+        "channel_count",
+    )
 
+    audio_path: str
+    name: str
+    character: str
+    start_ticks: int
+    duration_ticks: int
+    frame_rate: float
+    # 为 None 时表示元数据不完整，导出时只生成一个空的 Clip
+    channel_count: int | None
+
+    def __init__(
+        self,
+        audio_file: str,
+        rate: float = 24.0,
+        metadata: WavMetadata | None = None,
+    ):
+        # 绝对路径（get_audio_clips 传入的都是）直接使用，避免大批量构造时 pathlib 的开销
+        if os.path.isabs(audio_file):
+            self.audio_path = audio_file
+        else:
+            self.audio_path = str(Path(audio_file).absolute())
+        self.name = os.path.basename(self.audio_path)
+        self.character = "character A"
+        self.start_ticks = 0
+        self.duration_ticks = 0
         self.frame_rate = rate
+        self.channel_count = None
 
-        # 获取wav元数据
-        info = wavinfo.WavInfoReader(
-            audio_file, info_encoding="utf8", bext_encoding="utf8"
-        )
-        if not info or not info.fmt or not info.data:
+        # 获取wav元数据，已经预先读取（例如并行读取）时直接使用
+        info = metadata if metadata is not None else read_wav_metadata(audio_file)
+        if info is None:
             logger.warn("Warning: please check the wav audio data")
             return
-        if not info.bext or not info.info:
+        if info.time_reference is None or info.artist is None:
             logger.warn("Warning: please check the wav metadata")
             return
 
         # 获取偏移时间
-        sample_rate = info.fmt.sample_rate
-        offset_time_in_sample_count = info.bext.time_reference
-        self.start_offset = offset_time_in_sample_count / sample_rate
+        sample_rate = info.sample_rate
+        offset_time_in_sample_count = info.time_reference
+        self.start_ticks = samples_to_ticks(offset_time_in_sample_count, sample_rate)
 
         # 获取音频时长
-        self.duration = info.data.frame_count / sample_rate
-        self.audio_range = TimeRange(
-            RationalTime(0, self.frame_rate),
-            RationalTime().from_seconds(self.duration, self.frame_rate),
-        )
+        self.duration_ticks = samples_to_ticks(info.frame_count, sample_rate)
 
         # 获取通道数
-        channel_count = info.fmt.channel_count
-        self.clip.metadata["Resolve_OTIO"] = self.generate_davinci_channel_metadata(
-            channel_count
-        )
+        self.channel_count = info.channel_count
 
         # 获取角色名
-        self.character = "character A" if not info.info.artist else info.info.artist
+        self.character = "character A" if not info.artist else info.artist
+
+    def build_otio(
+        self, afx_preset: "EffectPreset | None" = None, record_character: bool = False
+    ) -> "Clip":
+        """
+        生成导出用的 OTIO Clip，包括通道元数据、媒体链接和音频效果。
+
+        参数:
+            afx_preset (EffectPreset | None): 音频效果预设，默认使用达芬奇默认音频效果。
+            record_character (bool): 是否在剪辑元数据中记录角色（共享轨道上的剪辑）。
+
+        返回:
+            Clip: 新建的 OTIO Clip。
+        """
+        from opentimelineio.opentime import TimeRange, RationalTime
+        from opentimelineio.schema import Clip, ExternalReference
+        from davinci_resolve.metadata_manager.fx_generator import (
+            add_default_afxs,
+            add_effect_preset,
+        )
+
+        clip = Clip()
+        clip.name = self.name
+        if record_character:
+            clip.metadata[CLIP_METADATA_KEY] = {"character": self.character}
+        if self.channel_count is None:
+            return clip
+
+        clip.metadata["Resolve_OTIO"] = self.generate_davinci_channel_metadata(
+            self.channel_count
+        )
 
         # 与文件链接
         external_range = TimeRange(
-            RationalTime().from_seconds(self.start_offset, self.frame_rate),
-            RationalTime().from_seconds(self.duration, self.frame_rate),
+            ticks_to_rational(self.start_ticks, self.frame_rate),
+            ticks_to_rational(self.duration_ticks, self.frame_rate),
         )
-        self.clip.media_reference = ExternalReference(
+        clip.media_reference = ExternalReference(
             target_url=self.audio_path, available_range=external_range
         )
-        self.clip.media_reference.name = audio_path.name
-        self.clip.source_range = self.audio_range
+        clip.media_reference.name = self.name
+        clip.source_range = TimeRange(
+            RationalTime(0, self.frame_rate),
+            ticks_to_rational(self.duration_ticks, self.frame_rate),
+        )
 
-        # 添加默认音频效果
-        add_default_afxs(self.clip)
+        # 添加音频效果
+        if afx_preset is None:
+            add_default_afxs(clip)
+        else:
+            add_effect_preset(clip, afx_preset)
+        return clip
 
     @staticmethod
     def generate_davinci_channel_metadata(channel_count: int) -> dict[str, list[dict]]:
@@ -79,35 +150,69 @@ class AudioClip:
 
         return {"Channels": channel_info}
 
+    @property
+    def end_ticks(self) -> int:
+        return self.start_ticks + self.duration_ticks
+
+    @property
+    def start_offset(self) -> float:
+        return ticks_to_seconds(self.start_ticks)
+
+    @start_offset.setter
+    def start_offset(self, seconds: float) -> None:
+        self.start_ticks = seconds_to_ticks(seconds)
+
+    @property
+    def duration(self) -> float:
+        return ticks_to_seconds(self.duration_ticks)
+
+    @duration.setter
+    def duration(self, seconds: float) -> None:
+        self.duration_ticks = seconds_to_ticks(seconds)
+
     @property
     def end_offset(self) -> float:
-        return self.start_offset + self.duration
+        return ticks_to_seconds(self.end_ticks)
 
     def __lt__(self, other):
-        return self.start_offset < other.start_offset
+        return self.start_ticks < other.start_ticks
 
     def __repr__(self):
         return f"""
         AudioClip(
-        audio_path='{self.audio_path}', 
+        audio_path='{self.audio_path}',
         start_offset={self.start_offset}, duration={self.duration}, character='{self.character}'
         )"""
 
 
 class AudioGap(AudioClip):
-    def __init__(self, duration: float, rate: float = 24.0):
-        self.duration = duration
+    __slots__ = ()
 
+    def __init__(
+        self, duration: float = 0.0, rate: float = 24.0, duration_ticks: int | None = None
+    ):
+        self.audio_path = ""
+        self.name = "black"
+        self.character = "gap"
+        self.start_ticks = 0
+        if duration_ticks is None:
+            duration_ticks = seconds_to_ticks(duration)
+        self.duration_ticks = duration_ticks
         self.frame_rate = rate
+        self.channel_count = None
+
+    def build_otio(
+        self, afx_preset: "EffectPreset | None" = None, record_character: bool = False
+    ) -> "Gap":
+        from opentimelineio.opentime import TimeRange
+        from opentimelineio.schema import Gap
 
         gap = Gap()
         gap.source_range = TimeRange(
-            duration=RationalTime().from_seconds(duration, self.frame_rate)
+            duration=ticks_to_rational(self.duration_ticks, self.frame_rate)
         )
-        gap.name = "black"
-        self.clip = gap
-
-        self.character = "gap"
+        gap.name = self.name
+        return gap
 
     def __repr__(self):
         return f"\nGap(duration={self.duration})"
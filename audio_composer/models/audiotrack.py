@@ -1,5 +1,61 @@
-from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audioclip import AudioClip, AudioGap
+from audio_composer.models.timing import TICKS_PER_SECOND, query_ticks
+from utils.instrumentation import span
 from dataclasses import dataclass, field
+from collections.abc import Iterator
+import itertools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # numpy 只在计算时间数组时导入，保持命令行启动轻量
+    import numpy as np
+    from audio_composer.models.interval_index import IntervalIndex
+
+
+# 全局递增的版本号，新建或修改的剪辑列表总会得到一个没有用过的版本号
+_versions = itertools.count()
+
+
+class ClipList(list):
+    """
+    记录修改版本的剪辑列表。轨道的时间数组和区间索引根据 version 判断是否过期，
+    编排器追加剪辑、merge_tracks 合并轨道等通过列表方法做的修改都会被发现。
+    """
+
+    __slots__ = ("version",)
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self.version = next(_versions)
+
+
+def _mutating(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.version = next(_versions)
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(ClipList, _name, _mutating(_name))
+del _name
 
 
 @dataclass
@@ -7,6 +63,29 @@ class AudioTrack:
     character: str
     index: int
     clips: list[AudioClip] = field(default_factory=list)
+    # 多个次要角色合用的共享轨道，导出时在剪辑元数据中记录各自的角色
+    shared: bool = False
+    # 起止时间数组和区间索引的缓存，以 clips_version 判断是否过期
+    _timing_key: int | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _timing: "tuple[np.ndarray, np.ndarray] | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _interval_index: "IntervalIndex | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name, value):
+        # 剪辑列表总是包装成 ClipList，以便发现对列表的修改
+        if name == "clips" and not isinstance(value, ClipList):
+            value = ClipList(value)
+        super().__setattr__(name, value)
+
+    @property
+    def clips_version(self) -> int:
+        """剪辑列表的版本，替换或修改 clips 后都会变化。"""
+        return self.clips.version
 
     @property
     def track_name(self) -> str:
@@ -15,17 +94,102 @@ class AudioTrack:
     def __repr__(self):
         return f"\nAudioTrack(character='{self.character}', index={self.index}, clips=\n{self.clips}\n)"
 
+    def timing_arrays(self) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        剪辑的开始和结束时间数组（tick，int64），顺序与 clips 一致。
+        替换或修改 clips 后会自动重新计算；直接修改剪辑对象的时间后需要调用 invalidate。
+        """
+        import numpy as np
+
+        key = self.clips_version
+        if self._timing is None or self._timing_key != key:
+            count = len(self.clips)
+            starts = np.fromiter(
+                (clip.start_ticks for clip in self.clips), dtype=np.int64, count=count
+            )
+            durations = np.fromiter(
+                (clip.duration_ticks for clip in self.clips), dtype=np.int64, count=count
+            )
+            self._timing = (starts, starts + durations)
+            self._timing_key = key
+            self._interval_index = None
+        return self._timing
+
+    def interval_index(self) -> "IntervalIndex":
+        """轨道剪辑的区间索引，与时间数组一起失效。"""
+        from audio_composer.models.interval_index import IntervalIndex
+
+        starts, ends = self.timing_arrays()
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(starts, ends)
+        return self._interval_index
+
+    def invalidate(self) -> None:
+        """丢弃缓存的时间数组和区间索引。"""
+        self._timing = None
+        self._timing_key = None
+        self._interval_index = None
+
+    @property
+    def starts(self) -> "np.ndarray":
+        return self.timing_arrays()[0]
+
+    @property
+    def ends(self) -> "np.ndarray":
+        return self.timing_arrays()[1]
+
+    def gap_ticks(self) -> "np.ndarray":
+        """
+        每个剪辑之前需要填充的间隙长度（tick），第一个间隙从 0 开始计算。
+        剪辑首尾相接时间隙为 0。
+        """
+        import numpy as np
+
+        starts, ends = self.timing_arrays()
+        previous_ends = np.empty_like(ends)
+        if len(ends):
+            previous_ends[0] = 0
+            previous_ends[1:] = ends[:-1]
+        return starts - previous_ends
+
+    def gap_durations(self) -> "np.ndarray":
+        """每个剪辑之前需要填充的间隙长度（秒）。"""
+        return self.gap_ticks() / TICKS_PER_SECOND
+
+    def has_overlaps(self) -> bool:
+        """轨道上是否有相互重叠的剪辑。"""
+        import numpy as np
+
+        starts, ends = self.timing_arrays()
+        order = np.argsort(starts, kind="stable")
+        return bool(np.any(starts[order][1:] < ends[order][:-1]))
+
+    def clips_with_gaps(self) -> Iterator[AudioClip]:
+        """
+        按时间线顺序产出间隙和剪辑，间隙在这里才生成，只在导出时使用。
+        间隙的帧率与其后的剪辑相同；长度为 0 的间隙（第一条剪辑从 0 开始、
+        首尾相接的剪辑之间）不产出，剪辑本身总是产出。
+        """
+        with span("gap_fill"):
+            gaps = self.gap_ticks().tolist()
+        for clip, gap in zip(self.clips, gaps):
+            if gap > 0:
+                yield AudioGap(duration_ticks=gap, rate=clip.frame_rate)
+            yield clip
+
     def __getitem__(self, key: slice | float) -> list[AudioClip]:
         """Retrieve clips that overlap with the given time range or specific point."""
         if isinstance(key, slice):
             start_offset = key.start or 0
             end_offset = key.stop or float("inf")
-            return [
-                clip
-                for clip in self.clips
-                if clip.end_offset > start_offset and clip.start_offset < end_offset
-            ]
-        raise TypeError(f"Invalid key type: {type(key)}. Expected slice.")
+            positions = self.interval_index().overlapping(
+                query_ticks(start_offset), query_ticks(end_offset)
+            )
+        elif isinstance(key, (int, float)):
+            positions = self.interval_index().at(query_ticks(key))
+        else:
+            raise TypeError(f"Invalid key type: {type(key)}. Expected slice or float.")
+        return [self.clips[i] for i in positions.tolist()]
 
 
 @dataclass
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from audio_composer.models.timing import query_ticks
+
+if TYPE_CHECKING:
+    from audio_composer.models.audioclip import AudioClip
+    from audio_composer.models.audiotrack import AudioTrack
+
+# 区间数不超过这个值的节点直接线性扫描，不再继续划分
+LEAF_SIZE = 32
+
+
+@dataclass
+class _Node:
+    center: float
+    # 跨过 center 的区间：按开始时间升序，以及按结束时间降序
+    by_start: np.ndarray
+    starts_sorted: np.ndarray
+    by_end: np.ndarray
+    # 结束时间取负后升序，便于二分查找
+    neg_ends_sorted: np.ndarray
+    left: "_Node | _Leaf | None"
+    right: "_Node | _Leaf | None"
+
+
+@dataclass
+class _Leaf:
+    positions: np.ndarray
+
+
+class IntervalIndex:
+    """
+    半开区间 [start, end) 的静态索引，查询与 [a, b) 重叠（end > a 且 start < b）的区间。
+    时间可以是整数（tick）或浮点数，查询边界使用与区间相同的单位。
+
+    开始和结束时间都单调不减时（同一轨道上按时间排列、互不重叠的剪辑都满足），
+    结果是一段连续的位置，用两次二分查找得到；否则使用中心区间树。
+    两种情况下查询都是 O(log n + k)。
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray) -> None:
+        self.starts = np.asarray(starts)
+        self.ends = np.asarray(ends)
+        self.monotonic = bool(
+            np.all(self.starts[1:] >= self.starts[:-1])
+            and np.all(self.ends[1:] >= self.ends[:-1])
+        )
+        self.root = None
+        if not self.monotonic:
+            self.root = self._build(np.arange(len(self.starts)))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self, positions: np.ndarray) -> "_Node | _Leaf | None":
+        if len(positions) == 0:
+            return None
+        if len(positions) <= LEAF_SIZE:
+            return _Leaf(positions)
+
+        starts = self.starts[positions]
+        ends = self.ends[positions]
+        center = float(np.median(np.concatenate((starts, ends))))
+        left_mask = ends <= center
+        right_mask = starts > center
+        middle = positions[~(left_mask | right_mask)]
+        if len(middle) == 0 and (left_mask.all() or right_mask.all()):
+            # 所有区间都落在同一侧（例如大量相同的零长度区间），无法继续划分
+            return _Leaf(positions)
+
+        by_start = middle[np.argsort(self.starts[middle], kind="stable")]
+        by_end = middle[np.argsort(-self.ends[middle], kind="stable")]
+        return _Node(
+            center=center,
+            by_start=by_start,
+            starts_sorted=self.starts[by_start],
+            by_end=by_end,
+            neg_ends_sorted=-self.ends[by_end],
+            left=self._build(positions[left_mask]),
+            right=self._build(positions[right_mask]),
+        )
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """
+        与 [start, end) 重叠的区间位置，按位置升序排列。
+
+        参数:
+            start (float): 查询范围的开始时间。
+            end (float): 查询范围的结束时间。
+
+        返回:
+            np.ndarray: 区间在输入数组中的位置。
+        """
+        if self.monotonic:
+            first = np.searchsorted(self.ends, start, side="right")
+            last = np.searchsorted(self.starts, end, side="left")
+            return np.arange(first, max(first, last))
+
+        found: list[np.ndarray] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if isinstance(node, _Leaf):
+                positions = node.positions
+                mask = (self.ends[positions] > start) & (self.starts[positions] < end)
+                found.append(positions[mask])
+                continue
+            # 中心区间都满足 start <= center < end
+            if end <= node.center:
+                count = np.searchsorted(node.starts_sorted, end, side="left")
+                found.append(node.by_start[:count])
+            elif start >= node.center:
+                count = np.searchsorted(node.neg_ends_sorted, -start, side="left")
+                found.append(node.by_end[:count])
+            else:
+                found.append(node.by_start)
+            if start < node.center:
+                stack.append(node.left)
+            if end > node.center:
+                stack.append(node.right)
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(found))
+
+    def at(self, time: float) -> np.ndarray:
+        """包含时间点 time（start <= time < end）的区间位置。"""
+        if np.issubdtype(self.starts.dtype, np.integer):
+            return self.overlapping(time, time + 1)
+        return self.overlapping(time, np.nextafter(time, np.inf))
+
+
+class TimelineIndex:
+    """
+    整条时间线（所有角色、所有轨道）的区间索引，查询某个时间范围或时间点上的全部台词。
+
+    查询使用秒，内部按 tick 索引。每次查询前比较各轨道剪辑列表的修改版本，轨道或剪辑列表被修改过
+    （例如 merge_tracks 合并轨道、编排器追加剪辑）时自动重建索引。
+    """
+
+    def __init__(self, tracks: "list[AudioTrack]") -> None:
+        self.tracks = tracks
+        self._signature: tuple | None = None
+        self._index: IntervalIndex | None = None
+        self._owners: list[tuple["AudioTrack", "AudioClip"]] = []
+
+    def _current_signature(self) -> tuple:
+        return tuple((id(track), track.clips_version) for track in self.tracks)
+
+    def _ensure_index(self) -> IntervalIndex:
+        signature = self._current_signature()
+        if self._index is None or signature != self._signature:
+            owners = []
+            starts, ends = [], []
+            for track in self.tracks:
+                track_starts, track_ends = track.timing_arrays()
+                starts.append(track_starts)
+                ends.append(track_ends)
+                owners += [(track, clip) for clip in track.clips]
+            self._index = IntervalIndex(
+                np.concatenate(starts) if starts else np.empty(0, dtype=np.int64),
+                np.concatenate(ends) if ends else np.empty(0, dtype=np.int64),
+            )
+            self._owners = owners
+            self._signature = signature
+        return self._index
+
+    def overlapping(
+        self, start: float, end: float
+    ) -> "list[tuple[AudioTrack, AudioClip]]":
+        """
+        与 [start, end) 重叠的所有剪辑。
+
+        返回:
+            list[tuple[AudioTrack, AudioClip]]: (所在轨道, 剪辑)，按轨道顺序和轨道内顺序排列。
+        """
+        positions = self._ensure_index().overlapping(
+            query_ticks(start), query_ticks(end)
+        )
+        return [self._owners[position] for position in positions.tolist()]
+
+    def at(self, time: float) -> "list[tuple[AudioTrack, AudioClip]]":
+        """时间点 time 上正在播放的所有剪辑。"""
+        positions = self._ensure_index().at(query_ticks(time))
+        return [self._owners[position] for position in positions.tolist()]
+
+    def __getitem__(
+        self, key: slice | float
+    ) -> "list[tuple[AudioTrack, AudioClip]]":
+        if isinstance(key, slice):
+            return self.overlapping(key.start or 0, key.stop or float("inf"))
+        if isinstance(key, (int, float)):
+            return self.at(key)
+        raise TypeError(f"Invalid key type: {type(key)}. Expected slice or float.")
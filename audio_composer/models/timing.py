@@ -0,0 +1,69 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from opentimelineio.opentime import RationalTime
+
+# 内部时间单位：1 秒 = 705_600_000 tick（flick）。
+# 能被 8k~192k 的常见采样率和 24/25/30/48/50/60 等常见帧率整除，
+# 这些采样率的样本数和这些帧率的帧数都可以无误差地换算成整数 tick。
+TICKS_PER_SECOND = 705_600_000
+INT64_MAX = 2**63 - 1
+
+
+def samples_to_ticks(samples: int, sample_rate: int) -> int:
+    """
+    样本数换算成 tick。采样率能整除 TICKS_PER_SECOND 时结果是精确的，
+    否则四舍五入到最近的 tick。
+
+    参数:
+        samples (int): 样本数。
+        sample_rate (int): 采样率。
+
+    返回:
+        int: tick 数。
+    """
+    ticks_per_sample, remainder = divmod(TICKS_PER_SECOND, sample_rate)
+    if remainder == 0:
+        return samples * ticks_per_sample
+    return (samples * TICKS_PER_SECOND + sample_rate // 2) // sample_rate
+
+
+def seconds_to_ticks(seconds: float) -> int:
+    """秒数换算成最近的 tick。"""
+    return round(seconds * TICKS_PER_SECOND)
+
+
+def query_ticks(seconds: float) -> int:
+    """
+    区间查询的边界（秒）换算成 tick，正负无穷换算成 int64 的边界值，
+    以便与 tick 数组比较。
+    """
+    if seconds == float("inf"):
+        return INT64_MAX
+    if seconds == float("-inf"):
+        return -INT64_MAX
+    return seconds_to_ticks(seconds)
+
+
+def ticks_to_seconds(ticks: int) -> float:
+    """
+    tick 换算成秒。整数除法的结果是正确舍入的，
+    因此与直接用 样本数 / 采样率 算出的秒数完全相同。
+    """
+    return ticks / TICKS_PER_SECOND
+
+
+def ticks_to_rational(ticks: int, rate: float) -> "RationalTime":
+    """
+    导出时把 tick 换算成 OTIO 的 RationalTime。
+
+    参数:
+        ticks (int): tick 数。
+        rate (float): 时间轴帧率。
+
+    返回:
+        RationalTime: 以 rate 为单位的时间。
+    """
+    from opentimelineio.opentime import RationalTime
+
+    return RationalTime().from_seconds(ticks_to_seconds(ticks), rate)
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class WavMetadata:
+    """
+    生成 AudioClip 所需的 wav 元数据，只包含纯数据，可以在进程之间传递。
+
+    time_reference 为 None 表示缺少 bext 块，artist 为 None 表示缺少 LIST-INFO 块。
+    """
+
+    sample_rate: int
+    channel_count: int
+    frame_count: int
+    time_reference: int | None = None
+    artist: str | None = None
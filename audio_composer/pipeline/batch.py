@@ -0,0 +1,319 @@
+import glob
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Literal
+
+from audio_composer.composer.audio_to_timeline import audio_to_tracks, get_audio_clips
+from audio_composer.composer.registry import DEFAULT_COMPOSER
+from audio_composer.ingest.metadata_cache import MetadataCache
+from audio_composer.ingest.parallel_loader import PoolKind, create_executor
+from utils.logger import logger
+
+JobStatus = Literal["done", "failed", "cancelled"]
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """一个导出任务：一个音频文件夹生成一个 OTIO 文件。"""
+
+    folder: str
+    output: str
+    fps: float = 24.0
+    global_start_hour: int = 0
+    composer: str = DEFAULT_COMPOSER
+    afx_preset: str | None = None
+    stream: bool = False
+
+
+@dataclass
+class BatchResult:
+    """一个任务的结果，timings 中是各阶段（scan、compose、export）的耗时秒数。"""
+
+    job: BatchJob
+    status: JobStatus
+    clips: int = 0
+    tracks: int = 0
+    seconds: float = 0.0
+    timings: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchProgress:
+    """每个任务结束（完成、失败或取消）时发送到进度队列的事件。"""
+
+    index: int
+    completed: int
+    total: int
+    result: BatchResult
+
+
+def jobs_from_folders(
+    folders: list[str], output_dir: str, **settings: Any
+) -> list[BatchJob]:
+    """
+    为每个文件夹生成一个任务，输出为 output_dir/文件夹名，重名时追加序号。
+
+    参数:
+        folders (list[str]): 音频文件夹。
+        output_dir (str): 输出目录。
+        settings: BatchJob 的其他字段（fps、composer 等）。
+
+    返回:
+        list[BatchJob]: 导出任务。
+    """
+    jobs = []
+    used: dict[str, int] = {}
+    for folder in folders:
+        name = os.path.basename(os.path.normpath(folder))
+        count = used.get(name, 0)
+        used[name] = count + 1
+        if count:
+            name = f"{name}_{count}"
+        jobs.append(
+            BatchJob(folder=folder, output=os.path.join(output_dir, name), **settings)
+        )
+    return jobs
+
+
+def expand_folder_globs(patterns: list[str]) -> list[str]:
+    """展开文件夹 glob（支持 **），只保留目录，去重并保持顺序。"""
+    folders: dict[str, None] = {}
+    for pattern in patterns:
+        for folder in sorted(glob.glob(pattern, recursive=True)):
+            if os.path.isdir(folder):
+                folders[folder] = None
+    return list(folders)
+
+
+def load_job_manifest(
+    path: str, output_dir: str, **settings: Any
+) -> list[BatchJob]:
+    """
+    读取任务清单。清单可以是任务列表，也可以是 {"defaults": {...}, "jobs": [...]}；
+    每个任务至少包含 folder，其他字段与 BatchJob 相同。
+    优先级：任务字段 > 清单 defaults > settings（命令行参数）。
+    没有 output 的任务输出到 output_dir/文件夹名。
+
+    参数:
+        path (str): 清单 JSON 文件路径。
+        output_dir (str): 默认输出目录。
+        settings: 默认的 BatchJob 字段。
+
+    返回:
+        list[BatchJob]: 导出任务。
+    """
+    with open(path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+
+    allowed = {job_field.name for job_field in fields(BatchJob)}
+    defaults = {**settings, **manifest.get("defaults", {})}
+    entries = []
+    for entry in manifest["jobs"]:
+        entry = {**defaults, **entry}
+        unknown = set(entry) - allowed
+        if unknown:
+            raise ValueError(f"Unknown job fields in {path}: {sorted(unknown)}")
+        if "folder" not in entry:
+            raise ValueError(f"Job without folder in {path}: {entry}")
+        entries.append(entry)
+
+    # 没有指定 output 的任务按文件夹名生成输出路径
+    named = jobs_from_folders(
+        [entry["folder"] for entry in entries if not entry.get("output")], output_dir
+    )
+    outputs = iter(job.output for job in named)
+    return [
+        BatchJob(**{**entry, "output": entry.get("output") or next(outputs)})
+        for entry in entries
+    ]
+
+
+def batch_summary(results: list[BatchResult], seconds: float) -> dict[str, Any]:
+    """
+    生成批处理的 JSON 摘要：每个任务的状态、耗时、剪辑数和轨道数。
+
+    参数:
+        results (list[BatchResult]): run_batch 的结果。
+        seconds (float): 批处理总耗时。
+
+    返回:
+        dict: 可以直接 json.dump 的摘要。
+    """
+    statuses = [result.status for result in results]
+    return {
+        "seconds": round(seconds, 3),
+        "jobs_total": len(results),
+        "done": statuses.count("done"),
+        "failed": statuses.count("failed"),
+        "cancelled": statuses.count("cancelled"),
+        "clips": sum(result.clips for result in results),
+        "tracks": sum(result.tracks for result in results),
+        "jobs": [
+            {
+                **asdict(result.job),
+                "status": result.status,
+                "clips": result.clips,
+                "tracks": result.tracks,
+                "seconds": round(result.seconds, 3),
+                "timings": {
+                    stage: round(value, 3) for stage, value in result.timings.items()
+                },
+                "error": result.error,
+            }
+            for result in results
+        ],
+    }
+
+
+def run_job(
+    job: BatchJob, cache_path: str | None = None, use_cache: bool = True
+) -> BatchResult:
+    """
+    执行一个导出任务，在工作进程（或线程）中运行。异常会记录在结果中而不是抛出，
+    一个任务失败不影响其他任务。
+
+    参数:
+        job (BatchJob): 导出任务。
+        cache_path (str | None): 元数据缓存路径，默认使用用户缓存目录；多个进程可以共用同一个缓存。
+        use_cache (bool): 是否使用元数据缓存。
+
+    返回:
+        BatchResult: 任务结果。
+    """
+    from audio_composer.export.otio_writer import make_otio
+    from davinci_resolve.metadata_manager.fx_template import load_effect_preset
+
+    result = BatchResult(job=job, status="done")
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(job.output) or ".", exist_ok=True)
+        # sqlite 连接不能跨进程传递，每个任务各自打开缓存
+        cache = MetadataCache(cache_path) if use_cache else None
+        try:
+            clips = get_audio_clips(job.folder, fps=job.fps, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+        result.clips = len(clips)
+        lap = time.perf_counter()
+        result.timings["scan"] = lap - start
+
+        tracks = audio_to_tracks(clips, job.fps, job.composer)
+        result.tracks = len(tracks)
+        result.timings["compose"] = time.perf_counter() - lap
+        lap = time.perf_counter()
+
+        preset = load_effect_preset(job.afx_preset) if job.afx_preset else None
+        make_otio(tracks, job.global_start_hour, job.fps, job.output, job.stream, preset)
+        result.timings["export"] = time.perf_counter() - lap
+    except Exception as e:
+        result.status = "failed"
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    workers: int = 1,
+    pool: PoolKind = "process",
+    progress: "queue.Queue[BatchProgress] | None" = None,
+    cancel_event: threading.Event | None = None,
+    cache_path: str | None = None,
+    use_cache: bool = True,
+    max_in_flight: int | None = None,
+) -> list[BatchResult]:
+    """
+    在线程池或进程池中并发执行多个导出任务。
+
+    每个任务结束时向 progress 队列发送一个 BatchProgress，界面线程可以从队列中轮询进度。
+    cancel_event 被设置后，尚未开始的任务会被取消（状态为 "cancelled"），
+    正在执行的任务会执行完毕。
+
+    参数:
+        jobs (list[BatchJob]): 导出任务。
+        workers (int): 并发任务数，小于等于 1 时在当前线程中依次执行。
+        pool (PoolKind): 进程池可以利用多核编排和导出，线程池启动更快。
+        progress (queue.Queue | None): 进度队列。
+        cancel_event (threading.Event | None): 取消信号。
+        cache_path (str | None): 元数据缓存路径。
+        use_cache (bool): 是否使用元数据缓存。
+        max_in_flight (int | None): 同时提交到池中的最大任务数，默认为 workers 的 2 倍，
+            任务很多时避免一次性创建全部 Future。
+
+    返回:
+        list[BatchResult]: 与 jobs 顺序一致的结果。
+    """
+    results: list[BatchResult | None] = [None] * len(jobs)
+    completed = 0
+
+    def finish(index: int, result: BatchResult) -> None:
+        nonlocal completed
+        results[index] = result
+        completed += 1
+        logger.info(
+            f"[{completed}/{len(jobs)}] {result.job.folder}: {result.status} "
+            f"in {result.seconds:.2f}s"
+        )
+        if progress is not None:
+            progress.put(BatchProgress(index, completed, len(jobs), result))
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    if workers <= 1:
+        for index, job in enumerate(jobs):
+            if cancelled():
+                finish(index, BatchResult(job=job, status="cancelled"))
+            else:
+                finish(index, run_job(job, cache_path, use_cache))
+        return results
+
+    in_flight = max_in_flight or workers * 2
+    with create_executor(pool, workers) as executor:
+        # 按需提交任务，排队中的任务不超过 in_flight 个，取消时只需丢弃尚未提交的任务
+        remaining = iter(enumerate(jobs))
+        futures: dict[Future[BatchResult], int] = {}
+
+        def submit(count: int) -> None:
+            for index, job in itertools.islice(remaining, count):
+                futures[executor.submit(run_job, job, cache_path, use_cache)] = index
+
+        submit(in_flight)
+        while futures:
+            # 定时醒来检查取消信号
+            done, _ = wait(futures, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                if future.cancelled():
+                    finish(index, BatchResult(job=jobs[index], status="cancelled"))
+                elif future.exception() is not None:
+                    # 工作进程异常退出等 run_job 自身无法捕获的错误
+                    error = future.exception()
+                    finish(
+                        index,
+                        BatchResult(
+                            job=jobs[index],
+                            status="failed",
+                            error=f"{type(error).__name__}: {error}",
+                        ),
+                    )
+                else:
+                    finish(index, future.result())
+            if cancelled():
+                for future in futures:
+                    future.cancel()
+                for index, job in remaining:
+                    finish(index, BatchResult(job=job, status="cancelled"))
+            else:
+                submit(len(done))
+    return results
@@ -0,0 +1,430 @@
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from audio_composer.composer.audio_to_timeline import (
+    organize_tracks_by_character,
+    read_metadata_cached,
+    scan_wav_files,
+)
+from audio_composer.composer.registry import DEFAULT_COMPOSER
+from audio_composer.ingest.metadata_cache import MetadataCache
+from audio_composer.ingest.parallel_loader import PoolKind, read_metadata_parallel
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audiotrack import AudioTrack
+from audio_composer.models.wav_metadata import WavMetadata
+from utils.logger import logger
+
+if TYPE_CHECKING:
+    from davinci_resolve.metadata_manager.fx_template import EffectPreset
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".otio.manifest.json"
+
+# 清单中每个文件的记录：[文件大小, 修改时间（纳秒）, 角色, 元数据或 None]
+FileEntry = list[Any]
+
+
+@dataclass
+class IncrementalResult:
+    """一次增量导出的结果。"""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    # 重新编排的角色
+    recomposed: list[str] = field(default_factory=list)
+    # 从上一次输出中原样复制的轨道数
+    reused_tracks: int = 0
+    # 重新生成的轨道数
+    written_tracks: int = 0
+    # 没有可用的上一次输出（或导出参数变化），全部重新生成
+    full_rebuild: bool = False
+    # 是否写出了新的 OTIO 文件，没有任何变化时为 False
+    written: bool = False
+
+
+def manifest_path(output: str) -> Path:
+    """输出文件对应的清单路径：{output}.otio.manifest.json。"""
+    return Path(f"{output}{MANIFEST_SUFFIX}")
+
+
+def metadata_to_list(metadata: WavMetadata | None) -> list[Any] | None:
+    if metadata is None:
+        return None
+    return [
+        metadata.sample_rate,
+        metadata.channel_count,
+        metadata.frame_count,
+        metadata.time_reference,
+        metadata.artist,
+    ]
+
+
+def metadata_from_list(values: list[Any] | None) -> WavMetadata | None:
+    if values is None:
+        return None
+    return WavMetadata(*values)
+
+
+def preset_identity(afx_preset: str | None) -> list[Any] | None:
+    """效果预设文件的标识，预设文件改动后所有轨道都需要重新生成。"""
+    if afx_preset is None:
+        return None
+    stat = os.stat(afx_preset)
+    return [os.path.abspath(afx_preset), stat.st_size, stat.st_mtime_ns]
+
+
+def load_manifest(output: str, settings: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    读取上一次导出的清单。清单缺失、损坏、导出参数不同，
+    或者 OTIO 文件在导出后被改动过时返回 None。
+
+    参数:
+        output (str): 输出文件名（不含 .otio 后缀）。
+        settings (dict): 本次导出的参数。
+
+    返回:
+        dict | None: 可以复用的清单。
+    """
+    path = manifest_path(output)
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        otio_stat = os.stat(f"{output}.otio")
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("settings") != settings:
+        return None
+    if manifest.get("otio") != [otio_stat.st_size, otio_stat.st_mtime_ns]:
+        logger.warning(f"{output}.otio has been modified since the last export")
+        return None
+    return manifest
+
+
+def diff_files(
+    previous: dict[str, FileEntry], current: dict[str, tuple[int, int]]
+) -> tuple[list[str], list[str], list[str]]:
+    """
+    比较上一次清单和本次扫描到的文件。
+
+    参数:
+        previous (dict): 清单中的文件记录。
+        current (dict): 本次扫描的 {路径: (文件大小, 修改时间)}。
+
+    返回:
+        tuple: (新增, 删除, 改动) 的文件路径列表。
+    """
+    added, changed = [], []
+    for path, (size, mtime_ns) in current.items():
+        entry = previous.get(path)
+        if entry is None:
+            added.append(path)
+        elif entry[0] != size or entry[1] != mtime_ns:
+            changed.append(path)
+    removed = [path for path in previous if path not in current]
+    return added, removed, changed
+
+
+def snapshot_folder(folder: str) -> dict[str, tuple[int, int]]:
+    """
+    扫描文件夹中的 wav 文件，只做 stat 不解析。
+
+    参数:
+        folder (str): 文件夹路径。
+
+    返回:
+        dict[str, tuple[int, int]]: 按扫描顺序排列的 {路径: (文件大小, 修改时间)}。
+    """
+    current = {}
+    for audio_file in scan_wav_files(folder):
+        try:
+            stat = os.stat(audio_file)
+        except FileNotFoundError:
+            # 扫描和 stat 之间被删除
+            continue
+        current[audio_file] = (stat.st_size, stat.st_mtime_ns)
+    return current
+
+
+class IncrementalExporter:
+    """
+    增量导出：与上一次导出的清单比较，只解析新增和改动的 wav，
+    只重新编排受影响的角色组，其他角色的轨道 JSON 从上一次的 OTIO 文件中原样复制。
+
+    清单（已解析的元数据和每个轨道在文件中的位置）在两次 update 之间保存在内存中，
+    长时间运行时（例如监视文件夹）每次更新不需要重新读取清单。
+    角色顺序沿用上一次导出，新角色追加在最后；第一次导出（没有清单）时与
+    make_otio 的输出完全相同。
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        output: str,
+        fps: float = 24.0,
+        global_start_hour: int = 0,
+        composer: str = DEFAULT_COMPOSER,
+        afx_preset: str | None = None,
+        workers: int = 1,
+        pool: PoolKind = "thread",
+        compose_workers: int = 1,
+        cache: MetadataCache | None = None,
+    ) -> None:
+        self.folder = folder
+        self.output = output
+        self.fps = fps
+        self.global_start_hour = global_start_hour
+        self.composer = composer
+        self.afx_preset = afx_preset
+        self.workers = workers
+        self.pool = pool
+        self.compose_workers = compose_workers
+        self.cache = cache
+        self.settings = {
+            "fps": fps,
+            "global_start_hour": global_start_hour,
+            "composer": composer,
+            "afx_preset": preset_identity(afx_preset),
+        }
+        # 为 None 时下一次 update 从磁盘读取清单
+        self.manifest: dict[str, Any] | None = None
+        self._preset: "EffectPreset | None" = None
+
+    def update(
+        self, current: dict[str, tuple[int, int]] | None = None
+    ) -> IncrementalResult:
+        """
+        将输出更新到文件夹的当前状态。
+
+        参数:
+            current (dict | None): 已经扫描好的 snapshot_folder 结果，默认重新扫描。
+
+        返回:
+            IncrementalResult: 本次导出的变化统计。
+        """
+        if self.manifest is None:
+            self.manifest = load_manifest(self.output, self.settings)
+        result = IncrementalResult(full_rebuild=self.manifest is None)
+        manifest = self.manifest or {"files": {}, "characters": []}
+        if current is None:
+            current = snapshot_folder(self.folder)
+
+        previous_files: dict[str, FileEntry] = manifest["files"]
+        result.added, result.removed, result.changed = diff_files(previous_files, current)
+        if not (result.full_rebuild or result.added or result.removed or result.changed):
+            logger.info("no changes since the last export")
+            return result
+
+        audio_files = list(current)
+        files, groups = self._parse_changes(previous_files, current, result)
+
+        # 保持上一次的角色顺序，删除已经没有剪辑的角色，新角色追加在最后
+        affected = set(groups) | {
+            previous_files[path][2] for path in result.removed + result.changed
+        }
+        order = [
+            entry["character"]
+            for entry in manifest["characters"]
+            if entry["character"] in groups or entry["character"] not in affected
+        ]
+        order += [character for character in groups if character not in order]
+        result.recomposed = [character for character in order if character in groups]
+        new_tracks = self._compose(groups, result.recomposed)
+
+        previous_layout = {
+            entry["character"]: entry["tracks"] for entry in manifest["characters"]
+        }
+        track_counts = [
+            len(new_tracks[character])
+            if character in new_tracks
+            else len(previous_layout[character])
+            for character in order
+        ]
+        result.written_tracks = sum(len(tracks) for tracks in new_tracks.values())
+        result.reused_tracks = sum(track_counts) - result.written_tracks
+
+        layout = self._write(order, new_tracks, previous_layout, result.full_rebuild)
+
+        characters = []
+        start = 0
+        for character, count in zip(order, track_counts):
+            characters.append(
+                {"character": character, "tracks": layout[start : start + count]}
+            )
+            start += count
+        otio_stat = os.stat(f"{self.output}.otio")
+        self.manifest = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "otio": [otio_stat.st_size, otio_stat.st_mtime_ns],
+            "files": {audio_file: files[audio_file] for audio_file in audio_files},
+            "characters": characters,
+        }
+        save_manifest(self.output, self.manifest)
+
+        result.written = True
+        logger.info(
+            f"incremental export: {len(result.added)} added, {len(result.removed)} removed, "
+            f"{len(result.changed)} changed, {result.written_tracks} tracks written, "
+            f"{result.reused_tracks} tracks reused"
+        )
+        return result
+
+    def _parse_changes(
+        self,
+        previous_files: dict[str, FileEntry],
+        current: dict[str, tuple[int, int]],
+        result: IncrementalResult,
+    ) -> tuple[dict[str, FileEntry], dict[str, list[AudioClip]]]:
+        """只解析新增和改动的文件，返回新的文件记录和受影响角色的全部剪辑。"""
+        to_parse = result.added + result.changed
+        if self.cache is None:
+            parsed = read_metadata_parallel(to_parse, self.workers, self.pool)
+        else:
+            parsed = read_metadata_cached(to_parse, self.cache, self.workers, self.pool)
+
+        affected = {previous_files[path][2] for path in result.removed + result.changed}
+        files: dict[str, FileEntry] = {}
+        clips: dict[str, AudioClip] = {}
+        for audio_file, metadata in zip(to_parse, parsed):
+            clip = AudioClip(audio_file=audio_file, rate=self.fps, metadata=metadata)
+            clips[audio_file] = clip
+            affected.add(clip.character)
+            files[audio_file] = [
+                *current[audio_file],
+                clip.character,
+                metadata_to_list(metadata),
+            ]
+
+        # 受影响角色的全部剪辑（按扫描顺序，与完整导出一致），未改动的文件使用清单中的元数据
+        groups: dict[str, list[AudioClip]] = {}
+        for audio_file in current:
+            entry = files.get(audio_file)
+            if entry is None:
+                entry = files[audio_file] = previous_files[audio_file]
+            if entry[2] not in affected:
+                continue
+            clip = clips.get(audio_file)
+            if clip is None:
+                clip = AudioClip(
+                    audio_file=audio_file,
+                    rate=self.fps,
+                    metadata=metadata_from_list(entry[3]),
+                )
+            groups.setdefault(entry[2], []).append(clip)
+        return files, groups
+
+    def _compose(
+        self, groups: dict[str, list[AudioClip]], characters: list[str]
+    ) -> dict[str, list[AudioTrack]]:
+        """重新编排受影响的角色组。"""
+        character_groups = organize_tracks_by_character(
+            [(character, groups[character]) for character in characters],
+            self.composer,
+            self.compose_workers,
+        )
+        new_tracks: dict[str, list[AudioTrack]] = {}
+        for group in character_groups:
+            new_tracks[group.character] = group.tracks
+        return new_tracks
+
+    def _write(
+        self,
+        order: list[str],
+        new_tracks: dict[str, list[AudioTrack]],
+        previous_layout: dict[str, list[list[int]]],
+        full_rebuild: bool,
+    ) -> list[tuple[int, int]]:
+        """写出到临时文件再替换输出，返回每个轨道在新文件中的位置。"""
+        # 延迟导入，只在确实需要写出时加载 OTIO
+        from audio_composer.export.otio_writer import read_track_block, write_otio_stream
+
+        if self.afx_preset and self._preset is None:
+            from davinci_resolve.metadata_manager.fx_template import load_effect_preset
+
+            self._preset = load_effect_preset(self.afx_preset)
+
+        layout: list[tuple[int, int]] = []
+        temp_output = f"{self.output}.partial"
+        previous_otio = (
+            None if full_rebuild else open(f"{self.output}.otio", encoding="utf-8")
+        )
+        try:
+
+            def track_items() -> Iterator[AudioTrack | str]:
+                for character in order:
+                    if character in new_tracks:
+                        yield from new_tracks[character]
+                    else:
+                        for position, length in previous_layout[character]:
+                            yield read_track_block(previous_otio, position, length)
+
+            write_otio_stream(
+                track_items(),
+                self.global_start_hour,
+                self.fps,
+                temp_output,
+                self._preset,
+                layout,
+            )
+        finally:
+            if previous_otio is not None:
+                previous_otio.close()
+        os.replace(f"{temp_output}.otio", f"{self.output}.otio")
+        return layout
+
+
+def save_manifest(output: str, manifest: dict[str, Any]) -> None:
+    """先写临时文件再替换，避免中断时留下损坏的清单。"""
+    path = manifest_path(output)
+    temp_path = Path(f"{path}.partial")
+    temp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def export_incremental(
+    folder: str,
+    output: str,
+    fps: float = 24.0,
+    global_start_hour: int = 0,
+    composer: str = DEFAULT_COMPOSER,
+    afx_preset: str | None = None,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    compose_workers: int = 1,
+    cache: MetadataCache | None = None,
+) -> IncrementalResult:
+    """
+    对文件夹做一次增量导出，见 IncrementalExporter。
+
+    参数:
+        folder (str): 包含音频文件的文件夹路径。
+        output (str): 输出文件名（不含 .otio 后缀），清单保存在 {output}.otio.manifest.json。
+        fps (float): 帧率。
+        global_start_hour (int): 时间轴的全局起始时间（小时）。
+        composer (str): 编排策略名称。
+        afx_preset (str | None): 音频效果预设 JSON 路径。
+        workers (int): 并行读取 wav 元数据的工作者数量。
+        pool (PoolKind): 并行读取使用的池类型。
+        compose_workers (int): 并行编排角色组的进程数。
+        cache (MetadataCache | None): 元数据缓存。
+
+    返回:
+        IncrementalResult: 本次导出的变化统计。
+    """
+    exporter = IncrementalExporter(
+        folder,
+        output,
+        fps,
+        global_start_hour,
+        composer,
+        afx_preset,
+        workers,
+        pool,
+        compose_workers,
+        cache,
+    )
+    return exporter.update()
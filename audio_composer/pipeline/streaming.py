@@ -0,0 +1,277 @@
+import itertools
+import os
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TypeVar
+
+from audio_composer.composer.audio_to_timeline import (
+    PoolLimits,
+    clips_from_index,
+    compose_pooled_tracks,
+    safe_path,
+    split_pooled_groups,
+)
+from audio_composer.composer.registry import DEFAULT_COMPOSER, get_composer
+from audio_composer.ingest.metadata_cache import MetadataCache, file_signature
+from audio_composer.ingest.parallel_loader import PoolKind, bounded_map, create_executor
+from audio_composer.ingest.wav_reader import is_wav_name, read_wav_metadata
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audiotrack import AudioTrack
+from audio_composer.models.wav_metadata import WavMetadata
+from utils.instrumentation import count, span
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# 遍历线程最多领先解析阶段的文件数
+WALK_BUFFER = 4096
+# 使用缓存时每批查询的文件数
+CACHE_CHUNK_SIZE = 512
+
+
+def walk_wav_files(folder: str) -> Iterator[str]:
+    """
+    用 os.scandir 深度优先遍历文件夹，边遍历边产出 wav 文件路径。
+    每个目录内的文件和子目录按名称混合排序，产出的文件和顺序都与 scan_wav_files 相同
+    （见 wav_sort_key），但不需要等整个目录树遍历完。无法读取的子目录会被跳过。
+
+    参数:
+        folder (str): 文件夹路径。
+
+    返回:
+        Iterator[str]: 经过 safe_path 处理的文件路径。
+    """
+    # (路径, 是否为目录)，后进先出，每个目录的条目逆序入栈
+    stack = [(folder, True)]
+    while stack:
+        path, is_directory = stack.pop()
+        if not is_directory:
+            # 只有 Windows 需要 safe_path 的长路径前缀
+            yield safe_path(Path(path)) if os.name == "nt" else path
+            continue
+        try:
+            with span("scan"), os.scandir(path) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"cannot scan {path}: {e}")
+            continue
+
+        children = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                children.append((entry.path, True))
+            elif is_wav_name(entry.name) and entry.is_file():
+                children.append((entry.path, False))
+        stack.extend(reversed(children))
+
+
+def prefetch(items: Iterable[T], size: int) -> Iterator[T]:
+    """
+    在后台线程中消费 items，最多提前缓冲 size 个元素。
+    用于让目录遍历（网络存储上主要是等待 I/O）与后续阶段重叠；
+    items 抛出的异常会在消费端重新抛出，消费端提前退出时后台线程随之停止。
+
+    参数:
+        items: 输入序列，通常是惰性的生成器。
+        size (int): 缓冲区大小。
+
+    返回:
+        Iterator[T]: 与输入顺序一致的元素。
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+    done = object()
+
+    def put(value) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+def read_with_path(audio_file: str) -> tuple[str, WavMetadata | None]:
+    """读取元数据并带上路径，可以在进程池中运行。"""
+    with span("parse"):
+        return audio_file, read_wav_metadata(audio_file)
+
+
+def stream_audio_clips(
+    folder: str,
+    fps: float = 24.0,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    max_in_flight: int | None = None,
+    cache: MetadataCache | None = None,
+    use_index: bool = True,
+) -> Iterator[AudioClip]:
+    """
+    流式版本的 get_audio_clips：后台线程遍历目录，解析阶段同时读取已找到的文件，
+    读到一个剪辑就产出一个剪辑。
+
+    参数:
+        folder (str): 包含音频文件的文件夹路径。
+        fps (float): 帧率。
+        workers (int): 并行读取 wav 元数据的工作者数量，1 表示顺序读取。
+        pool (PoolKind): 线程池或进程池。
+        max_in_flight (int | None): 同时在途的最大读取任务数，默认为 workers 的 4 倍。
+        cache (MetadataCache | None): 元数据缓存，按 CACHE_CHUNK_SIZE 分批查询和写回。
+        use_index (bool): 文件夹中有未过期的索引文件时直接读取索引，不打开 wav 文件。
+
+    返回:
+        Iterator[AudioClip]: 按 wav_sort_key 的顺序产出的剪辑。
+    """
+    if use_index:
+        indexed_clips = clips_from_index(folder, fps)
+        if indexed_clips is not None:
+            yield from indexed_clips
+            return
+
+    audio_files = prefetch(walk_wav_files(folder), WALK_BUFFER)
+    executor = create_executor(pool, workers) if workers > 1 else nullcontext()
+    with executor:
+
+        def parse(paths: Iterable[str]) -> Iterator[tuple[str, WavMetadata | None]]:
+            if workers <= 1:
+                return map(read_with_path, paths)
+            in_flight = max_in_flight or workers * 4
+            return bounded_map(read_with_path, paths, executor, in_flight)
+
+        if cache is None:
+            for audio_file, metadata in parse(audio_files):
+                count("files")
+                yield AudioClip(audio_file=audio_file, rate=fps, metadata=metadata)
+            return
+
+        while chunk := list(itertools.islice(audio_files, CACHE_CHUNK_SIZE)):
+            count("files", len(chunk))
+            keys = [file_signature(audio_file) for audio_file in chunk]
+            metadata_list = cache.lookup_many(keys)
+            misses = [i for i, metadata in enumerate(metadata_list) if metadata is None]
+            count("cache_hits", len(chunk) - len(misses))
+            count("cache_misses", len(misses))
+
+            parsed = dict(parse(chunk[i] for i in misses))
+            new_entries = []
+            for i in misses:
+                metadata_list[i] = parsed[chunk[i]]
+                if metadata_list[i] is not None:
+                    new_entries.append((keys[i], metadata_list[i]))
+            if new_entries:
+                cache.store_many(new_entries)
+
+            for audio_file, metadata in zip(chunk, metadata_list):
+                yield AudioClip(audio_file=audio_file, rate=fps, metadata=metadata)
+
+
+def stream_tracks(
+    clips: Iterable[AudioClip],
+    composer: str = DEFAULT_COMPOSER,
+    pool_limits: PoolLimits | None = None,
+) -> Iterator[AudioTrack]:
+    """
+    把剪辑流按角色缓存，输入结束后逐个角色编排并立即产出该角色的轨道，
+    下游（写出 OTIO）处理前一个角色的轨道时后面的角色还没有开始编排。
+    角色和轨道的顺序与 audio_to_tracks 相同。
+
+    参数:
+        clips: 剪辑流。
+        composer (str): 编排策略名称。
+        pool_limits (PoolLimits | None): 提供时，次要角色合用共享轨道，在最后产出。
+
+    返回:
+        Iterator[AudioTrack]: 音轨，只包含剪辑，间隙在导出时生成。
+    """
+    compose = get_composer(composer).compose
+    buffers: dict[str, list[AudioClip]] = {}
+    for clip in clips:
+        buffers.setdefault(clip.character, []).append(clip)
+    count("clips", sum(map(len, buffers.values())))
+
+    clip_groups = list(buffers.items())
+    pooled_clips: list[AudioClip] = []
+    if pool_limits is not None:
+        clip_groups, pooled_clips = split_pooled_groups(clip_groups, pool_limits)
+
+    for character, character_clips in clip_groups:
+        with span("compose"):
+            tracks = compose(character, character_clips)
+        count("tracks", len(tracks))
+        yield from tracks
+
+    if pooled_clips:
+        with span("compose"):
+            tracks = compose_pooled_tracks(pooled_clips, composer, pool_limits)
+        count("tracks", len(tracks))
+        yield from tracks
+
+
+def export_streaming(
+    folder: str,
+    output: str,
+    fps: float = 24.0,
+    global_start_hour: int = 0,
+    composer: str = DEFAULT_COMPOSER,
+    pool_limits: PoolLimits | None = None,
+    afx_preset: str | None = None,
+    workers: int = 1,
+    pool: PoolKind = "thread",
+    max_in_flight: int | None = None,
+    cache: MetadataCache | None = None,
+    use_index: bool = True,
+) -> None:
+    """
+    流式导出：目录遍历、元数据解析、编排和写出 OTIO 串成一条生成器流水线。
+    遍历在后台线程中进行，解析与遍历重叠；每个角色编排完成后立即写出它的轨道，
+    内存中同时只保留一个轨道的 OTIO 对象。输出与 --stream 的 make_otio 相同。
+
+    参数:
+        folder (str): 包含音频文件的文件夹路径。
+        output (str): 输出文件名（不含 .otio 后缀）。
+        fps (float): 帧率。
+        global_start_hour (int): 时间轴全局起始时间（小时）。
+        composer (str): 编排策略名称。
+        pool_limits (PoolLimits | None): 次要角色共享轨道的限制，None 表示不使用共享轨道。
+        afx_preset (str | None): 音频效果预设 JSON 路径。
+        workers (int): 并行读取 wav 元数据的工作者数量。
+        pool (PoolKind): 线程池或进程池。
+        max_in_flight (int | None): 同时在途的最大读取任务数。
+        cache (MetadataCache | None): 元数据缓存。
+        use_index (bool): 是否使用文件夹中的索引文件。
+    """
+    from audio_composer.export.otio_writer import write_otio_stream
+    from davinci_resolve.metadata_manager.fx_template import load_effect_preset
+
+    preset = load_effect_preset(afx_preset) if afx_preset else None
+    clips = stream_audio_clips(
+        folder, fps, workers, pool, max_in_flight, cache, use_index
+    )
+    tracks = stream_tracks(clips, composer, pool_limits)
+    write_otio_stream(tracks, global_start_hour, fps, output, preset)
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections.abc import Callable
+
+from audio_composer.pipeline.incremental import (
+    IncrementalExporter,
+    IncrementalResult,
+    snapshot_folder,
+)
+from utils.logger import logger
+
+Snapshot = dict[str, tuple[int, int]]
+
+
+class FolderWatcher:
+    """
+    轮询监视文件夹，新的录音落盘后增量更新时间轴。
+
+    每隔 interval 秒扫描一次（只做 stat），文件夹内容连续 debounce 秒没有变化后才更新，
+    这样正在写入的 wav（大小和修改时间还在变化）不会被读到一半，一段时间内落盘的
+    多条录音也会合并成一次更新。已解析的元数据和轨道布局由 IncrementalExporter
+    保存在内存中，每次更新只解析变化的文件、只重新编排受影响的角色。
+    """
+
+    def __init__(
+        self,
+        exporter: IncrementalExporter,
+        interval: float = 1.0,
+        debounce: float = 2.0,
+        on_update: Callable[[IncrementalResult], None] | None = None,
+    ) -> None:
+        self.exporter = exporter
+        self.interval = interval
+        self.debounce = debounce
+        self.on_update = on_update
+        # 上一次导出时的文件夹状态
+        self.exported: Snapshot | None = None
+        # 最近一次扫描到的状态和它第一次出现的时间
+        self.pending: Snapshot | None = None
+        self.pending_since = 0.0
+
+    def poll(self, now: float | None = None) -> IncrementalResult | None:
+        """
+        扫描一次文件夹，需要时更新时间轴。
+
+        参数:
+            now (float | None): 当前时间（time.monotonic），默认取当前时间。
+
+        返回:
+            IncrementalResult | None: 发生了更新时返回更新结果。
+        """
+        now = time.monotonic() if now is None else now
+        snapshot = snapshot_folder(self.exporter.folder)
+        if snapshot != self.pending:
+            self.pending = snapshot
+            self.pending_since = now
+        if snapshot == self.exported or now - self.pending_since < self.debounce:
+            return None
+
+        result = self.exporter.update(snapshot)
+        self.exported = snapshot
+        if self.on_update is not None:
+            self.on_update(result)
+        return result
+
+    def run(self, stop_event: threading.Event | None = None) -> None:
+        """
+        持续监视，直到 stop_event 被设置（或 Ctrl+C）。启动时立即做一次更新。
+
+        参数:
+            stop_event (threading.Event | None): 停止信号。
+        """
+        stop_event = stop_event or threading.Event()
+        logger.info(f"watching {self.exporter.folder} ...")
+        # 启动时不等待防抖，先把输出更新到当前状态
+        self.pending = snapshot_folder(self.exporter.folder)
+        self.pending_since = time.monotonic() - self.debounce
+        try:
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    # 单次更新失败（例如文件被占用）不终止监视，下一轮重试
+                    logger.error(f"watch update failed: {e}")
+                    self.exporter.manifest = None
+                    self.exported = None
+                if stop_event.wait(self.interval):
+                    break
+        except KeyboardInterrupt:
+            pass
+        logger.info("stopped watching")
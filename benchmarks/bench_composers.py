@@ -0,0 +1,222 @@
+"""
+编排器基准测试：用合成会话测量每个编排策略、间隙生成和 OTIO 导出的耗时与峰值内存。
+
+用法:
+    python -m benchmarks.bench_composers --clips 10000 --clips 100000 -o bench.json
+"""
+
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import click
+
+from audio_composer.composer.audio_to_timeline import (
+    flatten_chara_grps,
+    group_clips_by_character,
+    organize_tracks_by_character,
+)
+from audio_composer.composer.min_tracks_composer import group_by_start, max_overlap_depth
+from audio_composer.composer.registry import DEFAULT_COMPOSER, get_composer, composer_names
+from audio_composer.models.audiotrack import AudioTrack
+from benchmarks.synthetic_session import SessionSpec, generate_session
+
+
+def measure(func: Callable[[], Any], memory: bool = True) -> tuple[Any, float, int | None]:
+    """
+    运行函数并测量耗时；需要时再在 tracemalloc 下运行一次测量峰值内存，
+    避免 tracemalloc 的开销影响计时。
+
+    返回:
+        tuple: (结果, 耗时秒数, 峰值内存字节数或 None)
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_session(
+    spec: SessionSpec,
+    composers: list[str],
+    fps: float = 24.0,
+    memory: bool = True,
+    export: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    对一个合成会话运行全部基准测试。
+
+    参数:
+        spec (SessionSpec): 会话参数。
+        composers (list[str]): 要测试的编排策略名称。
+        fps (float): 帧率。
+        memory (bool): 是否测量峰值内存。
+        export (bool): 是否测试 make_otio 导出。
+
+    返回:
+        list[dict]: 每个阶段一条结果记录。
+    """
+    clips, seconds, peak = measure(lambda: generate_session(spec, fps), memory)
+    results = [_record(spec, "generate", "synthetic_session", seconds, peak)]
+
+    def compose(name: str) -> list[AudioTrack]:
+        # 编排器会原地排序，每次都从新的列表开始
+        groups = [
+            (character, list(group)) for character, group in group_clips_by_character(clips)
+        ]
+        return flatten_chara_grps(organize_tracks_by_character(groups, name))
+
+    # 轨道数下界：各角色最大重叠深度之和
+    lower_bound = sum(
+        max_overlap_depth(group_by_start(list(group)))
+        for _, group in group_clips_by_character(clips)
+    )
+    for name in composers:
+        tracks, seconds, peak = measure(lambda: compose(name), memory)
+        results.append(
+            _record(
+                spec,
+                "compose",
+                name,
+                seconds,
+                peak,
+                tracks=len(tracks),
+                lower_bound=lower_bound,
+            )
+        )
+
+    tracks = compose(DEFAULT_COMPOSER)
+
+    def gap_durations() -> list:
+        # 新建轨道对象，避免命中上一次测量缓存的时间数组
+        return [
+            AudioTrack(track.character, track.index, track.clips).gap_durations()
+            for track in tracks
+        ]
+
+    _, seconds, peak = measure(gap_durations, memory)
+    results.append(_record(spec, "gaps", "gap_durations", seconds, peak))
+
+    if export:
+        # 延迟导入，只测编排时不需要加载导出模块
+        from audio_composer.export.otio_writer import make_otio
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = str(Path(tmp_dir) / "bench")
+            _, seconds, peak = measure(
+                lambda: make_otio(tracks, 0, fps, output), memory
+            )
+            size = (Path(tmp_dir) / "bench.otio").stat().st_size
+        results.append(
+            _record(spec, "export", "make_otio", seconds, peak, output_bytes=size)
+        )
+    return results
+
+
+def _record(
+    spec: SessionSpec,
+    stage: str,
+    name: str,
+    seconds: float,
+    peak: int | None,
+    **extra: Any,
+) -> dict[str, Any]:
+    return {
+        "clips": spec.clip_count,
+        "characters": spec.characters,
+        "stage": stage,
+        "name": name,
+        "seconds": round(seconds, 6),
+        "peak_bytes": peak,
+        **extra,
+    }
+
+
+@click.command()
+@click.option(
+    "--clips",
+    "-n",
+    "clip_counts",
+    type=int,
+    multiple=True,
+    default=[10_000],
+    show_default=True,
+    help="剪辑数量，可以多次指定，例如 -n 10000 -n 100000 -n 1000000。",
+)
+@click.option("--characters", type=int, default=8, show_default=True, help="角色数量。")
+@click.option(
+    "--overlap", type=float, default=0.3, show_default=True, help="每个角色平均同时在说的台词数。"
+)
+@click.option(
+    "--burst-probability", type=float, default=0.05, show_default=True, help="同时开始突发的概率。"
+)
+@click.option("--burst-size", type=int, default=4, show_default=True, help="突发时同时开始的剪辑数。")
+@click.option("--seed", type=int, default=0, show_default=True, help="随机种子。")
+@click.option(
+    "--composer",
+    "composers",
+    type=click.Choice(composer_names()),
+    multiple=True,
+    help="要测试的编排策略，默认测试全部已注册的策略。",
+)
+@click.option("--memory/--no-memory", default=True, help="是否测量峰值内存。")
+@click.option("--export/--no-export", default=True, help="是否测试 make_otio 导出。")
+@click.option("--output", "-o", help="结果 JSON 文件路径，不提供时输出到标准输出。")
+def main(
+    clip_counts: tuple[int, ...],
+    characters: int,
+    overlap: float,
+    burst_probability: float,
+    burst_size: int,
+    seed: int,
+    composers: tuple[str, ...],
+    memory: bool,
+    export: bool,
+    output: str | None,
+):
+    """运行编排器基准测试并输出 JSON 结果。"""
+    names = list(composers) or composer_names()
+    for name in names:
+        get_composer(name)
+
+    results = []
+    for clip_count in clip_counts:
+        spec = SessionSpec(
+            clip_count=clip_count,
+            characters=characters,
+            overlap_density=overlap,
+            burst_probability=burst_probability,
+            burst_size=burst_size,
+            seed=seed,
+        )
+        results += bench_session(spec, names, memory=memory, export=export)
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text, encoding="utf-8")
+    else:
+        click.echo(text)
+
+
+if __name__ == "__main__":
+    main()
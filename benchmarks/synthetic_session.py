@@ -0,0 +1,85 @@
+import random
+from dataclasses import dataclass
+
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.wav_metadata import WavMetadata
+
+
+@dataclass(frozen=True)
+class SessionSpec:
+    """
+    合成会话的参数，不需要真实的 wav 文件。
+
+    属性:
+        clip_count: 剪辑总数。
+        characters: 角色数量。
+        overlap_density: 每个角色平均同时在说的台词数（台词时长 / 平均间隔）。
+        burst_probability: 一个开始时间点出现“同时开始”突发的概率。
+        burst_size: 突发时同时开始的剪辑数。
+        mean_duration: 台词平均时长（秒）。
+        character_skew: 角色台词数的 Zipf 指数，0 表示平均分配，越大主角越集中。
+        sample_rate: 采样率。
+        channel_count: 通道数。
+        seed: 随机种子，相同参数生成完全相同的会话。
+    """
+
+    clip_count: int = 10_000
+    characters: int = 8
+    overlap_density: float = 0.3
+    burst_probability: float = 0.05
+    burst_size: int = 4
+    mean_duration: float = 3.0
+    character_skew: float = 1.0
+    sample_rate: int = 48000
+    channel_count: int = 1
+    seed: int = 0
+
+
+def character_weights(spec: SessionSpec) -> list[float]:
+    """按 Zipf 分布计算各角色的台词占比。"""
+    return [1 / (rank**spec.character_skew) for rank in range(1, spec.characters + 1)]
+
+
+def generate_session(spec: SessionSpec, fps: float = 24.0) -> list[AudioClip]:
+    """
+    生成合成会话的剪辑列表，时间均为整数采样点，因此突发剪辑的开始时间完全相同。
+
+    参数:
+        spec (SessionSpec): 会话参数。
+        fps (float): 帧率。
+
+    返回:
+        list[AudioClip]: 按角色交错、未排序的剪辑列表。
+    """
+    rng = random.Random(spec.seed)
+    weights = character_weights(spec)
+    total_weight = sum(weights)
+    counts = [int(spec.clip_count * weight / total_weight) for weight in weights]
+    counts[0] += spec.clip_count - sum(counts)
+
+    mean_spacing = spec.mean_duration / max(spec.overlap_density, 1e-9)
+    clips: list[AudioClip] = []
+    for character_index, count in enumerate(counts):
+        character = f"character_{character_index + 1:03d}"
+        start_seconds = 0.0
+        line = 0
+        while line < count:
+            start_seconds += rng.expovariate(1 / mean_spacing)
+            start_samples = int(start_seconds * spec.sample_rate)
+            burst = spec.burst_size if rng.random() < spec.burst_probability else 1
+            for _ in range(min(burst, count - line)):
+                duration = rng.uniform(0.2, 2 * spec.mean_duration - 0.2)
+                metadata = WavMetadata(
+                    sample_rate=spec.sample_rate,
+                    channel_count=spec.channel_count,
+                    frame_count=int(duration * spec.sample_rate),
+                    time_reference=start_samples,
+                    artist=character,
+                )
+                audio_file = f"/synthetic/{character}/line_{line:06d}.wav"
+                clips.append(AudioClip(audio_file, rate=fps, metadata=metadata))
+                line += 1
+
+    # 打乱顺序，模拟文件遍历顺序与时间顺序无关
+    rng.shuffle(clips)
+    return clips
@@ -1,23 +1,18 @@
 from opentimelineio._otio import Clip
-from opentimelineio.schema import Effect
-from davinci_resolve.models.resolve_fx import default_afxs, default_vfxs
+from davinci_resolve.metadata_manager.fx_template import (
+    EffectPreset,
+    default_afx_preset,
+    default_vfx_preset,
+)
 
 
 def add_default_afxs(clip: Clip) -> None:
-    for effect in default_afxs.effects:
-        fx = Effect()
-        fx.effect_name = effect.effect_name
-        fx.metadata["Resolve_OTIO"] = effect.metadata.resolve_otio.model_dump(
-            by_alias=True
-        )
-        clip.effects.append(fx)
+    default_afx_preset().apply(clip)
 
 
 def add_default_vfxs(clip: Clip) -> None:
-    for effect in default_vfxs.effects:
-        fx = Effect()
-        fx.effect_name = effect.effect_name
-        fx.metadata["Resolve_OTIO"] = effect.metadata.resolve_otio.model_dump(
-            by_alias=True
-        )
-        clip.effects.append(fx)
+    default_vfx_preset().apply(clip)
+
+
+def add_effect_preset(clip: Clip, preset: EffectPreset) -> None:
+    preset.apply(clip)
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from functools import cache, cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from opentimelineio._otio import Clip
+from opentimelineio.schema import Effect
+
+if TYPE_CHECKING:
+    from davinci_resolve.models.resolve_fx import EffectList
+
+
+@dataclass(frozen=True)
+class EffectTemplate:
+    """
+    预先计算好的效果模板。pydantic 的 model_dump 和 OTIO 元数据的转换只在加载时做一次，
+    之后每个剪辑只克隆模板中的 OTIO Effect。
+    """
+
+    effect_name: str
+    resolve_otio: dict[str, Any]
+
+    @cached_property
+    def prototype(self) -> Effect:
+        fx = Effect()
+        fx.effect_name = self.effect_name
+        fx.metadata["Resolve_OTIO"] = self.resolve_otio
+        return fx
+
+    def build(self) -> Effect:
+        """生成一个新的 Effect，修改它不会影响模板。"""
+        return self.prototype.clone()
+
+
+@dataclass(frozen=True)
+class EffectPreset:
+    """一组按顺序添加到剪辑上的效果模板。"""
+
+    templates: tuple[EffectTemplate, ...]
+
+    def apply(self, clip: Clip) -> None:
+        """将预设中的全部效果克隆后添加到剪辑上。"""
+        clip.effects.extend(template.build() for template in self.templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+
+def preset_from_effect_list(effect_list: "EffectList") -> EffectPreset:
+    """
+    将已校验的效果列表转换为效果预设。
+
+    参数:
+        effect_list (EffectList): 效果列表。
+
+    返回:
+        EffectPreset: 效果预设。
+    """
+    return EffectPreset(
+        tuple(
+            EffectTemplate(
+                effect_name=effect.effect_name,
+                resolve_otio=effect.metadata.resolve_otio.model_dump(by_alias=True),
+            )
+            for effect in effect_list.effects
+        )
+    )
+
+
+def load_effect_preset(path: str | Path) -> EffectPreset:
+    """
+    加载用户提供的效果预设，文件格式与 default_data/audio_fxs.json 相同。
+
+    参数:
+        path (str | Path): 预设 JSON 文件路径。
+
+    返回:
+        EffectPreset: 效果预设。
+    """
+    # pydantic 模型只在真正加载效果时导入
+    from davinci_resolve.models.resolve_fx import load_effect_list
+
+    return preset_from_effect_list(load_effect_list(path))
+
+
+@cache
+def default_afx_preset() -> EffectPreset:
+    """默认音频效果预设。"""
+    from davinci_resolve.models.resolve_fx import load_default_audio_fxs
+
+    return preset_from_effect_list(load_default_audio_fxs())
+
+
+@cache
+def default_vfx_preset() -> EffectPreset:
+    """默认视频效果预设。"""
+    from davinci_resolve.models.resolve_fx import load_default_video_fxs
+
+    return preset_from_effect_list(load_default_video_fxs())
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 import json
+from pathlib import Path
 from typing import List, Dict, Union, Optional
 
 
@@ -49,20 +50,26 @@ class EffectList(BaseModel):
     effects: List[Effect]
 
 
+# 默认效果数据位于包内，与当前工作目录无关
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "default_data"
+
 # 模块级变量，用于缓存默认音频效果
 default_audio_fxs = None
 default_video_fxs = None
 
 
+def load_effect_list(path: str | Path) -> EffectList:
+    """读取并校验效果列表 JSON。"""
+    with open(path, "r", encoding="utf-8") as file:
+        json_data = json.load(file)
+    return EffectList.model_validate(json_data)
+
+
 # 加载默认音频效果数据
 def load_default_audio_fxs() -> EffectList:
     global default_audio_fxs
     if default_audio_fxs is None:
-        with open(
-            "davinci_resolve/default_data/audio_fxs.json", "r", encoding="utf-8"
-        ) as file:
-            json_data = json.load(file)
-        default_audio_fxs = EffectList.model_validate(json_data)
+        default_audio_fxs = load_effect_list(DEFAULT_DATA_DIR / "audio_fxs.json")
     return default_audio_fxs
 
 
@@ -70,14 +77,14 @@ def load_default_audio_fxs() -> EffectList:
 def load_default_video_fxs() -> EffectList:
     global default_video_fxs
     if default_video_fxs is None:
-        with open(
-            "davinci_resolve/default_data/video_fxs.json", "r", encoding="utf-8"
-        ) as file:
-            json_data = json.load(file)
-        default_video_fxs = EffectList.model_validate(json_data)
+        default_video_fxs = load_effect_list(DEFAULT_DATA_DIR / "video_fxs.json")
     return default_video_fxs
 
 
-# 初始化并获取默认音频效果
-default_afxs = load_default_audio_fxs()
-default_vfxs = load_default_video_fxs()
+def __getattr__(name: str) -> EffectList:
+    # 兼容原来的模块级变量 default_afxs / default_vfxs，首次访问时才加载
+    if name == "default_afxs":
+        return load_default_audio_fxs()
+    if name == "default_vfxs":
+        return load_default_video_fxs()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,140 +1,545 @@
 import click
 from datetime import datetime
-from audio_composer.composer.audio_to_timeline import audio_to_tracks, get_audio_clips
-from audio_composer.models.audiotrack import AudioTrack
-import opentimelineio as otio
-from opentimelineio._otio import Gap
-from opentimelineio.core import Track
-from opentimelineio.schema import Timeline
-from opentimelineio.opentime import TimeRange, to_frames, RationalTime
+from audio_composer.composer.audio_to_timeline import (
+    PoolLimits,
+    PoolNameConflictError,
+    audio_to_tracks,
+    get_audio_clips,
+)
+from audio_composer.composer.registry import DEFAULT_COMPOSER, composer_names
+from audio_composer.ingest.metadata_cache import MetadataCache
+from utils.instrumentation import instrumentation
+from utils.logger import compose_logger_instance
+from utils.startup_profile import print_startup_report
 
-from utils.logger import logger
+# OTIO 导出相关的函数延迟到首次使用时导入，保证 --help 等命令快速启动；
+# 仍然可以从本模块导入（例如 from otio_generator import make_otio）
+EXPORT_NAMES = (
+    "create_timeline",
+    "create_audio_track",
+    "set_track_source_range",
+    "generate_first_empty_track",
+    "write_otio_stream",
+    "make_otio",
+)
 
 
-def create_timeline(global_start_hour: int, fps: float) -> Timeline:
-    """
-    创建一个新的 OTIO 时间轴并设置元数据和全局起始时间。
+def __getattr__(name: str):
+    if name in EXPORT_NAMES:
+        from audio_composer.export import otio_writer
+
+        return getattr(otio_writer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-    :param global_start_hour: 时间轴的全局起始时间（小时）。
-    :param fps: 时间轴的帧率。
-    :return: 一个 OTIO 时间轴实例。
+@click.group(invoke_without_command=True)
+@click.option(
+    "--path",
+    "-p",
+    default="test_data",
+    help="输入数据路径，通常是包含音频文件的文件夹路径。",
+)
+@click.option("--output", "-o", help="输出文件名，用于生成 OTIO 时间轴文件。")
+@click.option("--fps", "-f", type=float, default=24.0, help="帧率")
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="并行读取 wav 元数据的工作者数量，1 表示顺序读取。",
+)
+@click.option(
+    "--pool",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="并行读取使用的池类型：网络存储用 thread，本地磁盘大批量文件可用 process。",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="是否使用 wav 元数据缓存，未改动的文件只需 stat 不再解析。",
+)
+@click.option("--cache-path", help="元数据缓存文件路径，默认位于用户缓存目录。")
+@click.option(
+    "--index/--no-index",
+    "use_index",
+    default=True,
+    help="输入文件夹中有 audio_index.jsonl 索引时直接读取索引，不再打开 wav 文件"
+    "（见 index 子命令）。索引过期或损坏时给出警告并逐个读取文件。",
+)
+@click.option(
+    "--composer",
+    "-c",
+    type=click.Choice(composer_names()),
+    default=DEFAULT_COMPOSER,
+    show_default=True,
+    help="轨道编排策略。",
+)
+@click.option(
+    "--shared-tracks/--no-shared-tracks",
+    default=False,
+    help="台词很少的次要角色合用共享轨道（pool_1、pool_2 ...），剪辑元数据中记录角色，"
+    "轨道总数不再随角色数增长。不能与 --incremental 同时使用。",
+)
+@click.option(
+    "--minor-clips",
+    type=click.IntRange(min=1),
+    default=PoolLimits.minor_clips,
+    show_default=True,
+    help="台词数不超过该值的角色视为次要角色。",
+)
+@click.option(
+    "--max-shared-tracks",
+    type=click.IntRange(min=1),
+    default=PoolLimits.max_tracks,
+    show_default=True,
+    help="共享轨道数上限，放不下的次要角色保留独立轨道。",
+)
+@click.option(
+    "--shared-track-name",
+    default=PoolLimits.name,
+    show_default=True,
+    help="共享轨道的名称前缀，不能与任何角色同名。",
+)
+@click.option(
+    "--compose-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="并行编排角色组的进程数，1 表示顺序编排。",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=False,
+    help="流式导出：边遍历目录边解析元数据，每个角色编排完成后立即写出它的轨道，"
+    "适合超大时间线和网络存储。",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="增量导出：与上一次输出旁的清单比较，只重新生成受影响角色的轨道。"
+    "输出文件名不再追加时间戳，以便下一次增量导出找到它。",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="持续监视输入文件夹，新的录音落盘后增量更新时间轴（隐含 --incremental）。",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=1.0,
+    show_default=True,
+    help="监视模式下扫描文件夹的间隔（秒）。",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    show_default=True,
+    help="监视模式下文件夹连续多少秒没有变化后才更新，多次落盘合并为一次更新。",
+)
+@click.option(
+    "--afx-preset",
+    type=click.Path(exists=True, dir_okay=False),
+    help="音频效果预设 JSON，格式与 davinci_resolve/default_data/audio_fxs.json 相同。",
+)
+@click.option(
+    "--trace",
+    "trace_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="记录各阶段（scan、parse、compose、gap_fill、otio_build、write）的耗时和计数，"
+    "结束时写入该文件。",
+)
+@click.option(
+    "--trace-format",
+    type=click.Choice(["chrome", "json"]),
+    default="chrome",
+    show_default=True,
+    help="chrome 为 Chrome trace（chrome://tracing、Perfetto 可打开），json 为按阶段汇总。",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    help="日志级别，默认 INFO，也可以用环境变量 AUDIO_COMPOSER_LOG_LEVEL 设置。",
+)
+@click.option(
+    "--log-dir",
+    type=click.Path(file_okay=False),
+    help="同时把日志写入该目录下的日志文件，也可以用环境变量 AUDIO_COMPOSER_LOG_DIR 设置。"
+    "默认不写日志文件。",
+)
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=print_startup_report,
+    help="打印启动及延迟加载模块的耗时报告后退出。",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    path: str,
+    output: str | None = None,
+    fps: float = 24.0,
+    workers: int = 1,
+    pool: str = "thread",
+    cache: bool = True,
+    cache_path: str | None = None,
+    use_index: bool = True,
+    composer: str = DEFAULT_COMPOSER,
+    compose_workers: int = 1,
+    shared_tracks: bool = False,
+    minor_clips: int = PoolLimits.minor_clips,
+    max_shared_tracks: int = PoolLimits.max_tracks,
+    shared_track_name: str = PoolLimits.name,
+    stream: bool = False,
+    incremental: bool = False,
+    watch: bool = False,
+    interval: float = 1.0,
+    debounce: float = 2.0,
+    afx_preset: str | None = None,
+    trace_path: str | None = None,
+    trace_format: str = "chrome",
+    log_level: str | None = None,
+    log_dir: str | None = None,
+):
     """
-    # 创建时间轴实例并设置名称
-    timeline = Timeline()
+    主函数，用于生成具有用户定义参数的随机 OTIO 时间轴。
 
-    # 设置全局起始时间
-    seconds = global_start_hour * 60**2
-    hour_one_frames = to_frames(RationalTime(value=seconds), rate=fps)
-    timeline.global_start_time = RationalTime(hour_one_frames, fps)
+    :param path: 输入数据路径，通常是包含音频文件的文件夹路径。
 
-    # 添加元数据
-    timeline.metadata["Resolve_OTIO"] = {"Resolve OTIO Meta Version": "1.0"}
-    return timeline
+    :param output: 输出文件名，用于生成 OTIO 时间轴文件。没有提供时，默认使用 "test_data"。
 
+    :param workers: 并行读取 wav 元数据的工作者数量。
 
-def create_audio_track(track: AudioTrack) -> Track:
-    """
-    创建指定数量的空 OTIO 轨道。
+    :param pool: 并行读取使用的池类型。
 
-    :param trk_count: 要创建的轨道数量。
-    :return: 一个包含 OTIO 轨道实例的列表。
-    """
-    # 创建指定数量的轨道
-    tr = Track(track.track_name, kind="Audio")
-    tr.metadata["Resolve_OTIO"] = {
-        "Audio Type": "Mono",
-        "Locked": False,
-        "SoloOn": False,
-    }
-    for clip in track.clips:
-        tr.append(clip.clip)
-    return tr
+    :param cache: 是否使用 wav 元数据缓存。
 
+    :param cache_path: 元数据缓存文件路径。
 
-def set_track_source_range(track: Track, start_time: RationalTime):
-    """
-    将轨道的来源范围设置为与全局起始时间匹配。
+    :param use_index: 是否使用输入文件夹中的索引文件。
 
-    :param track: 要更新的 OTIO 轨道。
-    :param start_time: 要设置的起始时间。
-    """
-    track.source_range = TimeRange(start_time, track.duration())
+    :param composer: 轨道编排策略名称。
 
+    :param compose_workers: 并行编排角色组的进程数。
 
-def generate_first_empty_track(duration: float = 576) -> Track:
-    tr = Track(name="Video 1")
-    tr.metadata["Resolve_OTIO"] = {"Locked": False}
+    :param shared_tracks: 次要角色是否合用共享轨道。
 
-    gap = Gap()
-    time_range = TimeRange(duration=RationalTime(rate=24, value=duration))
-    gap.source_range = time_range
+    :param minor_clips: 次要角色的台词数上限。
 
-    tr.append(gap)
+    :param max_shared_tracks: 共享轨道数上限。
 
-    return tr
+    :param shared_track_name: 共享轨道的名称前缀。
 
+    :param stream: 是否使用流式导出流水线。
 
-def make_otio(
-    audio_tracks: list[AudioTrack],
-    global_start_hour: int = 0,
-    fps: float = 24.0,
-    output: str = "",
-):
-    """
-    生成一个包含随机轨道和剪辑的 OTIO 时间轴。
+    :param incremental: 是否增量导出。
 
-    :param trk_count: 要创建的轨道数量。
-    :param clp_count: 每个轨道的剪辑数量。
-    :param global_start_hour: 时间轴的全局起始时间（小时）。
-    :param fps: 时间轴的帧率。
-    """
-    logger.info("start to export otio file ...")
-    timeline = create_timeline(global_start_hour, fps)
-    # 添加一个占位用的视频轨道
-    timeline.tracks.append(Track(name="Video 1"))
-    tracks = [create_audio_track(tr) for tr in audio_tracks]
+    :param watch: 是否持续监视输入文件夹。
 
-    hour_one_frames = to_frames(RationalTime(global_start_hour * 60**2), rate=fps)
-    for track in tracks:
-        set_track_source_range(track, RationalTime(-hour_one_frames, fps))
-        timeline.tracks.append(track)
+    :param interval: 监视模式下扫描文件夹的间隔（秒）。
 
-    # 输出 OTIO 文件
-    otio.adapters.write_to_file(timeline, f"{output}.otio")
-    logger.info("Finished!!")
+    :param debounce: 监视模式下的防抖时间（秒）。
 
+    :param afx_preset: 音频效果预设 JSON 路径。
 
-@click.command()
-@click.option(
-    "--path",
-    "-p",
-    default="test_data",
-    help="输入数据路径，通常是包含音频文件的文件夹路径。",
-)
-@click.option("--output", "-o", help="输出文件名，用于生成 OTIO 时间轴文件。")
-@click.option("--fps", "-f", type=float, default=24.0, help="帧率")
-def main(path: str, output: str | None = None, fps: float = 24.0):
-    """
-    主函数，用于生成具有用户定义参数的随机 OTIO 时间轴。
+    :param trace_path: 计时和计数的输出路径，提供时开启记录。
 
-    :param path: 输入数据路径，通常是包含音频文件的文件夹路径。
+    :param trace_format: 记录的导出格式。
 
-    :param output: 输出文件名，用于生成 OTIO 时间轴文件。没有提供时，默认使用 "test_data"。
+    :param log_level: 日志级别。
+
+    :param log_dir: 日志文件目录，没有提供时不写日志文件。
+
+    子命令 batch 用于无界面批量导出多个文件夹，见 batch --help；
+    子命令 index 用于生成和检查会话的元数据索引，见 index --help。
     """
+    if log_level:
+        compose_logger_instance.set_level(log_level)
+    if log_dir:
+        compose_logger_instance.enable_file_log(log_dir)
+    if trace_path:
+        instrumentation.reset()
+        instrumentation.enable()
+        # 命令（包括子命令）结束或出错时写出记录
+        ctx.call_on_close(lambda: instrumentation.write(trace_path, trace_format))
+
+    if ctx.invoked_subcommand is not None:
+        return
+
+    from audio_composer.export.otio_writer import make_otio
+    from davinci_resolve.metadata_manager.fx_template import load_effect_preset
+
     # 设置参数
+    incremental = incremental or watch
+    if shared_tracks and incremental:
+        # 增量导出按角色重新编排，共享轨道跨越多个角色
+        raise click.UsageError("--shared-tracks 不能与 --incremental/--watch 同时使用。")
+    pool_limits = (
+        PoolLimits(minor_clips, max_shared_tracks, shared_track_name)
+        if shared_tracks
+        else None
+    )
     if output is None:
         # 默认工程名
         output = "test_data"
-    else:
+    elif not incremental:
         now = datetime.now().strftime("%y%m%d_%H%M")
         output = f"{output}_{now}"
 
     global_start_hour = 0  # 时间轴全局起始时间（小时）
 
     # 调用主函数生成时间轴
-    audio_list = get_audio_clips(path, fps=fps)
-    tracks = audio_to_tracks(audio_list)
-    make_otio(tracks, global_start_hour, fps, output)
+    metadata_cache = MetadataCache(cache_path) if cache else None
+    if incremental:
+        from audio_composer.pipeline.incremental import IncrementalExporter
+        from audio_composer.pipeline.watch import FolderWatcher
+
+        exporter = IncrementalExporter(
+            path,
+            output,
+            fps=fps,
+            global_start_hour=global_start_hour,
+            composer=composer,
+            afx_preset=afx_preset,
+            workers=workers,
+            pool=pool,
+            compose_workers=compose_workers,
+            cache=metadata_cache,
+        )
+        try:
+            if watch:
+                FolderWatcher(exporter, interval, debounce).run()
+            else:
+                exporter.update()
+        finally:
+            if metadata_cache is not None:
+                metadata_cache.close()
+        return
+
+    if stream:
+        from audio_composer.pipeline.streaming import export_streaming
+
+        try:
+            export_streaming(
+                path,
+                output,
+                fps=fps,
+                global_start_hour=global_start_hour,
+                composer=composer,
+                pool_limits=pool_limits,
+                afx_preset=afx_preset,
+                workers=workers,
+                pool=pool,
+                cache=metadata_cache,
+                use_index=use_index,
+            )
+        except PoolNameConflictError as error:
+            raise click.UsageError(f"{error}，请用 --shared-track-name 换一个名称。")
+        finally:
+            if metadata_cache is not None:
+                metadata_cache.close()
+        return
+
+    try:
+        audio_list = get_audio_clips(
+            path,
+            fps=fps,
+            workers=workers,
+            pool=pool,
+            cache=metadata_cache,
+            use_index=use_index,
+        )
+    finally:
+        if metadata_cache is not None:
+            metadata_cache.close()
+    try:
+        tracks = audio_to_tracks(audio_list, fps, composer, compose_workers, pool_limits)
+    except PoolNameConflictError as error:
+        raise click.UsageError(f"{error}，请用 --shared-track-name 换一个名称。")
+    preset = load_effect_preset(afx_preset) if afx_preset else None
+    make_otio(tracks, global_start_hour, fps, output, stream, preset)
+
+
+@main.command()
+@click.argument("folders", nargs=-1)
+@click.option(
+    "--manifest",
+    "-m",
+    type=click.Path(exists=True, dir_okay=False),
+    help="任务清单 JSON：任务列表，或 {\"defaults\": {...}, \"jobs\": [...]}；"
+    "每个任务包含 folder，可选 output、fps、composer、global_start_hour、afx_preset、stream。",
+)
+@click.option(
+    "--output-dir",
+    "-d",
+    default="export",
+    show_default=True,
+    help="没有指定 output 的任务输出到 输出目录/文件夹名.otio。",
+)
+@click.option("--fps", "-f", type=float, default=24.0, help="默认帧率。")
+@click.option(
+    "--composer",
+    "-c",
+    type=click.Choice(composer_names()),
+    default=DEFAULT_COMPOSER,
+    show_default=True,
+    help="默认轨道编排策略。",
+)
+@click.option("--stream/--no-stream", default=False, help="默认是否逐轨道流式写出。")
+@click.option(
+    "--afx-preset",
+    type=click.Path(exists=True, dir_okay=False),
+    help="默认音频效果预设 JSON。",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    help="同时执行的任务数，默认为 CPU 核数。",
+)
+@click.option(
+    "--pool",
+    type=click.Choice(["thread", "process"]),
+    default="process",
+    show_default=True,
+    help="任务使用的池类型。",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="是否使用 wav 元数据缓存，所有任务共用同一个缓存文件。",
+)
+@click.option("--cache-path", help="元数据缓存文件路径，默认位于用户缓存目录。")
+@click.option("--summary", "-s", help="JSON 摘要输出路径，不提供时输出到标准输出。")
+def batch(
+    folders: tuple[str, ...],
+    manifest: str | None,
+    output_dir: str,
+    fps: float,
+    composer: str,
+    stream: bool,
+    afx_preset: str | None,
+    workers: int | None,
+    pool: str,
+    cache: bool,
+    cache_path: str | None,
+    summary: str | None,
+):
+    """
+    批量导出：FOLDERS 是文件夹或文件夹 glob（例如 "sessions/*"），也可以用 --manifest 指定任务清单。
+    有任务失败时退出码为 1。
+    """
+    import json
+    import os
+    import time
+
+    from audio_composer.pipeline.batch import (
+        batch_summary,
+        expand_folder_globs,
+        jobs_from_folders,
+        load_job_manifest,
+        run_batch,
+    )
+
+    settings = {
+        "fps": fps,
+        "composer": composer,
+        "stream": stream,
+        "afx_preset": afx_preset,
+    }
+    jobs = []
+    if manifest:
+        jobs += load_job_manifest(manifest, output_dir, **settings)
+    if folders:
+        jobs += jobs_from_folders(expand_folder_globs(list(folders)), output_dir, **settings)
+    if not jobs:
+        raise click.UsageError("没有任务：请提供文件夹、glob 或 --manifest。")
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    start = time.perf_counter()
+    results = run_batch(jobs, workers, pool, cache_path=cache_path, use_cache=cache)
+    report = batch_summary(results, time.perf_counter() - start)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if summary:
+        with open(summary, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        click.echo(text)
+    if report["failed"]:
+        raise SystemExit(1)
+
+
+@main.group("index")
+def index_group():
+    """
+    会话元数据索引：在文件夹根目录保存每个 wav 的开始时间、长度、通道数和角色
+    （audio_index.jsonl），导出时一次顺序读取索引，不再打开每个 wav 文件。
+    录音机或 TTS 生成器也可以直接写出同样格式的索引。
+    """
+
+
+@index_group.command("build")
+@click.argument("folder", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="并行读取块头的工作者数量。",
+)
+@click.option(
+    "--pool",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="并行读取使用的池类型。",
+)
+def index_build(folder: str, workers: int, pool: str):
+    """读取 FOLDER 中所有 wav 的块头，生成（或重新生成）索引。"""
+    from audio_composer.ingest.sidecar import build_index, read_index
+
+    path = build_index(folder, workers, pool)
+    click.echo(f"{path}: {len(read_index(folder))} files")
+
+
+@index_group.command("validate")
+@click.argument("folder", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--headers",
+    is_flag=True,
+    help="同时重新读取每个文件的块头，与索引中的元数据比较。",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="并行读取块头的工作者数量。",
+)
+@click.option(
+    "--pool",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="并行读取使用的池类型。",
+)
+def index_validate(folder: str, headers: bool, workers: int, pool: str):
+    """检查 FOLDER 的索引是否与文件一致，不一致时退出码为 1。"""
+    from audio_composer.ingest.sidecar import IndexFormatError, validate_index
+
+    try:
+        report = validate_index(folder, headers, workers, pool)
+    except (FileNotFoundError, IndexFormatError) as error:
+        raise click.ClickException(f"invalid index: {error}")
+
+    for name in ("missing", "unindexed", "stale", "mismatched"):
+        for path in getattr(report, name):
+            click.echo(f"{name}: {path}")
+    if not report.ok:
+        raise SystemExit(1)
+    click.echo("index is up to date")
 
 
 if __name__ == "__main__":
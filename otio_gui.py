@@ -1,8 +1,28 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
+import queue
+import threading
 from datetime import datetime
-from otio_generator import get_audio_clips, audio_to_tracks, make_otio
+from audio_composer.pipeline.batch import BatchJob, run_batch
+
+# 批量导出结束时放入进度队列的标记：(BATCH_DONE, 错误信息或 None)
+BATCH_DONE = "done"
+
+
+def run_batch_reporting(jobs, workers, progress_queue, cancel_event):
+    """
+    在后台线程中运行 run_batch。run_batch 本身出错（任务配置错误、进程池无法启动等）时
+    线程不会悄悄退出：无论成功还是出错，最后都会向队列放入结束标记，界面据此停止轮询。
+    """
+    error = None
+    try:
+        run_batch(jobs, workers, "process", progress_queue, cancel_event)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        progress_queue.put((BATCH_DONE, error))
+
 
 def launch_gui():
     def browse_path():
@@ -70,40 +90,82 @@ def launch_gui():
         if not os.path.exists(export_dir):
             os.makedirs(export_dir)
         
-        success_count = 0
+        jobs = []
         failed_tasks = []
-        
+        timestamp = datetime.now().strftime("%y%m%d_%H%M%S")
         for task_name in selected_tasks:
-            try:
-                task_path = os.path.join(path, task_name)
-                if not os.path.exists(task_path):
-                    failed_tasks.append(f"{task_name} (文件夹不存在)")
-                    continue
-                
-                # 生成输出文件名
-                timestamp = datetime.now().strftime("%y%m%d_%H%M%S")
-                output_filename = os.path.join(export_dir, f"{task_name}_{timestamp}")
-                
-                # 生成OTIO文件
-                global_start_hour = 0  # 时间轴全局起始时间（小时）
-                fps = 24  # 帧率
-                audio_list = get_audio_clips(task_path)
-                tracks = audio_to_tracks(audio_list)
-                make_otio(tracks, global_start_hour, fps, output_filename)
-                
-                success_count += 1
-                
-            except Exception as e:
-                failed_tasks.append(f"{task_name} ({str(e)})")
+            task_path = os.path.join(path, task_name)
+            if not os.path.exists(task_path):
+                failed_tasks.append(f"{task_name} (文件夹不存在)")
+                continue
+            # 生成输出文件名
+            output_filename = os.path.join(export_dir, f"{task_name}_{timestamp}")
+            jobs.append(BatchJob(folder=task_path, output=output_filename, fps=24))
+        
+        # 在后台线程中并发导出，主线程只轮询进度队列，界面不会卡住
+        progress_queue = queue.Queue()
+        cancel_event = threading.Event()
+        workers = min(len(jobs), os.cpu_count() or 1)
+        reported_folders = set()
+        batch_error = None
+        
+        def worker():
+            run_batch_reporting(jobs, workers, progress_queue, cancel_event)
+        
+        def poll_progress():
+            nonlocal batch_error
+            finished = False
+            while True:
+                try:
+                    event = progress_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(event, tuple) and event[0] == BATCH_DONE:
+                    batch_error = event[1]
+                    finished = True
+                    break
+                result = event.result
+                reported_folders.add(result.job.folder)
+                task_name = os.path.basename(result.job.folder)
+                progress_bar["value"] = event.completed
+                status_label.config(
+                    text=f"{event.completed}/{event.total} {task_name}: {result.status} ({result.seconds:.1f}s)"
+                )
+                if result.status == "failed":
+                    failed_tasks.append(f"{task_name} ({result.error})")
+                elif result.status == "cancelled":
+                    failed_tasks.append(f"{task_name} (已取消)")
+            if finished or not jobs:
+                finish_batch()
+            else:
+                gui.after(100, poll_progress)
         
-        # 显示结果
-        if success_count > 0:
-            message = f"成功导出 {success_count} 个OTIO文件到 {export_dir} 文件夹"
-            if failed_tasks:
-                message += f"\n\n失败的任务：\n" + "\n".join(failed_tasks)
-            messagebox.showinfo("批量导出完成", message)
-        else:
-            messagebox.showerror("导出失败", f"所有任务都失败了：\n" + "\n".join(failed_tasks))
+        def finish_batch():
+            generate_button.config(state=tk.NORMAL)
+            cancel_button.config(state=tk.DISABLED, command="")
+            if batch_error is not None:
+                # 批量导出中途出错：没有结果的任务都算失败
+                for job in jobs:
+                    if job.folder not in reported_folders:
+                        failed_tasks.append(f"{os.path.basename(job.folder)} ({batch_error})")
+                status_label.config(text=f"批量导出出错：{batch_error}")
+            success_count = len(selected_tasks) - len(failed_tasks)
+            # 显示结果
+            if success_count > 0:
+                message = f"成功导出 {success_count} 个OTIO文件到 {export_dir} 文件夹"
+                if failed_tasks:
+                    message += f"\n\n失败的任务：\n" + "\n".join(failed_tasks)
+                messagebox.showinfo("批量导出完成", message)
+            else:
+                messagebox.showerror("导出失败", f"所有任务都失败了：\n" + "\n".join(failed_tasks))
+        
+        progress_bar.config(maximum=max(len(jobs), 1), value=0)
+        status_label.config(text=f"正在导出 {len(jobs)} 个任务 ...")
+        generate_button.config(state=tk.DISABLED)
+        cancel_button.config(state=tk.NORMAL, command=cancel_event.set)
+        if jobs:
+            threading.Thread(target=worker, daemon=True).start()
+        poll_progress()
 
     gui = tk.Tk()
     gui.title("OTIO 批量生成器")
@@ -153,7 +215,17 @@ def launch_gui():
     # 生成按钮
     generate_button = tk.Button(gui, text="批量生成 OTIO", command=generate_otio_gui, 
                                bg="#4CAF50", fg="white", font=("Arial", 12, "bold"))
-    generate_button.pack(pady=20)
+    generate_button.pack(pady=(20, 5))
+
+    # 进度区域
+    progress_frame = tk.Frame(gui)
+    progress_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+    progress_bar = ttk.Progressbar(progress_frame, mode="determinate")
+    progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    cancel_button = tk.Button(progress_frame, text="取消", state=tk.DISABLED)
+    cancel_button.pack(side=tk.RIGHT, padx=(5, 0))
+    status_label = tk.Label(gui, text="", anchor=tk.W)
+    status_label.pack(fill=tk.X, padx=10)
 
     # 初始化时设置默认路径
     default_path = r"C:\TechProjects\About_Voice_Cloning\xtts_gatcha_machine\output"
@@ -164,4 +236,8 @@ def launch_gui():
     gui.mainloop()
 
 if __name__ == "__main__":
+    from utils.logger import compose_logger_instance
+
+    # 图形界面没有控制台，日志写到用户缓存目录下
+    compose_logger_instance.enable_file_log()
     launch_gui() 
\ No newline at end of file
@@ -1,12 +1,23 @@
 import pytest
+from audio_composer.composer.registry import composer_names
+from audio_composer.ingest.metadata_cache import MetadataCache
 from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.wav_metadata import WavMetadata
+from benchmarks.synthetic_session import SessionSpec, generate_session
 from audio_composer.composer.audio_to_timeline import (
     get_audio_clips,
     group_clips_by_character,
     organize_tracks_by_character,
     generate_gap,
+    generate_gaps_between_clips,
     audio_to_tracks,
+    merge_tracks,
+    PoolLimits,
+    PoolNameConflictError,
+    split_pooled_groups,
 )
+from audio_composer.models.audiotrack import AudioTrack
+from audio_composer.composer.min_tracks_composer import group_by_start, max_overlap_depth
 
 
 @pytest.fixture
@@ -89,15 +100,36 @@ def test_generate_gap():
 
 
 def test_generate_gaps_between_clips(clips):
-    clips_with_gaps = audio_to_tracks(clips)[0].clips
-    # 应包含间隙和原始剪辑
-    assert len(clips_with_gaps) == 4
-    assert clips_with_gaps[0].character == "gap"
-    assert clips_with_gaps[0].duration == 0
-    assert clips_with_gaps[1].character == "Alice"
-    assert clips_with_gaps[2].character == "gap"
-    assert clips_with_gaps[2].duration == 2.0
-    assert clips_with_gaps[3].character == "Alice"
+    clips_with_gaps = list(audio_to_tracks(clips)[0].clips_with_gaps())
+    # 第一轨是 audio1（0~4 秒）和 audio6（5 秒开始）；audio1 从 0 开始，前面没有间隙
+    assert [clip.character for clip in clips_with_gaps] == ["Alice", "gap", "Alice"]
+    assert clips_with_gaps[0].start_ticks == 0
+    assert clips_with_gaps[1].duration == 1.0
+
+
+def test_back_to_back_clips_are_kept():
+    # 首尾相接的剪辑之间是长度为 0 的间隙，不产出间隙，但剪辑本身不能被丢掉
+    back_to_back = [
+        AudioClip(
+            f"/session/line{index}.wav",
+            metadata=WavMetadata(48000, 1, 96000, index * 96000, "Alice"),
+        )
+        for index in range(3)
+    ]
+    track = AudioTrack("Alice", 1, back_to_back)
+    assert track.gap_durations().tolist() == [0.0, 0.0, 0.0]
+    assert list(track.clips_with_gaps()) == back_to_back
+    assert generate_gaps_between_clips(back_to_back) == back_to_back
+
+    # 6 秒结束后间隔 1 秒的剪辑之前才有间隙
+    later = AudioClip(
+        "/session/late.wav", metadata=WavMetadata(48000, 1, 48000, 48000 * 7, "Alice")
+    )
+    items = list(AudioTrack("Alice", 1, [*back_to_back, later]).clips_with_gaps())
+    assert [item.character for item in items] == ["Alice"] * 3 + ["gap", "Alice"]
+    assert items[3].duration == 1.0
+    assert not track.has_overlaps()
+    assert track[1.0:3.0] == back_to_back[:2]
 
 
 def test_audio_to_timeline(clips):
@@ -108,3 +140,250 @@ def test_audio_to_timeline(clips):
     bob_tracks = [track for track in audio_tracks if track.character == "Bob"]
     assert len(alice_tracks) == 3
     assert len(bob_tracks) == 1
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_get_audio_clips_parallel(pool):
+    serial = get_audio_clips("test_data")
+    parallel = get_audio_clips("test_data", workers=3, pool=pool, max_in_flight=2)
+    assert [clip.audio_path for clip in parallel] == [
+        clip.audio_path for clip in serial
+    ]
+    assert [(clip.start_offset, clip.duration, clip.character) for clip in parallel] == [
+        (clip.start_offset, clip.duration, clip.character) for clip in serial
+    ]
+
+
+def test_get_audio_clips_cached(tmp_path):
+    with MetadataCache(tmp_path / "cache.sqlite3") as cache:
+        cold = get_audio_clips("test_data", cache=cache)
+        assert len(cache) == 9
+        warm = get_audio_clips("test_data", cache=cache)
+    assert [(clip.start_offset, clip.duration, clip.character) for clip in warm] == [
+        (clip.start_offset, clip.duration, clip.character) for clip in cold
+    ]
+
+
+def test_metadata_cache_invalidation_and_eviction(tmp_path):
+    metadata = WavMetadata(48000, 1, 96000, 0, "Alice")
+    with MetadataCache(tmp_path / "cache.sqlite3", max_entries=2) as cache:
+        cache.store_many([(("/a.wav", 10, 1), metadata)])
+        assert cache.lookup_many([("/a.wav", 10, 1)]) == [metadata]
+        # 修改时间或大小变化即视为失效
+        assert cache.lookup_many([("/a.wav", 10, 2), ("/a.wav", 11, 1)]) == [None, None]
+
+        cache.store_many([(("/b.wav", 10, 1), metadata)])
+        cache.store_many([(("/c.wav", 10, 1), metadata)])
+        assert len(cache) == 2
+
+
+def test_metadata_cache_evicts_only_past_the_limit(tmp_path, monkeypatch):
+    metadata = WavMetadata(48000, 1, 96000, 0, "Alice")
+    with MetadataCache(tmp_path / "cache.sqlite3", max_entries=3) as cache:
+        evictions = []
+        original_evict = cache.evict
+        monkeypatch.setattr(cache, "evict", lambda: evictions.append(original_evict()))
+        cache.store_many([((f"/{name}.wav", 10, 1), metadata) for name in "ab"])
+        cache.store_many([(("/c.wav", 10, 1), metadata)])
+        assert not evictions
+        cache.store_many([(("/d.wav", 10, 1), metadata)])
+        assert len(evictions) == 1 and len(cache) == 3
+
+
+def test_metadata_cache_discards_entries_from_other_versions(tmp_path):
+    import sqlite3
+
+    metadata = WavMetadata(48000, 1, 96000, 0, "Alice")
+    path = tmp_path / "cache.sqlite3"
+    with MetadataCache(path) as cache:
+        cache.store_many([(("/a.wav", 10, 1), metadata)])
+    # 模拟旧版本解析器写入的缓存
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA user_version = 1")
+    connection.commit()
+    connection.close()
+
+    with MetadataCache(path) as cache:
+        assert len(cache) == 0
+        assert cache.lookup_many([("/a.wav", 10, 1)]) == [None]
+        cache.store_many([(("/a.wav", 10, 1), metadata)])
+    # 同一版本重新打开时条目保留
+    with MetadataCache(path) as cache:
+        assert cache.lookup_many([("/a.wav", 10, 1)]) == [metadata]
+
+
+@pytest.mark.parametrize("composer", composer_names())
+def test_registered_composers(clips, composer):
+    groups = group_clips_by_character(clips)
+    character_groups = organize_tracks_by_character(groups, composer)
+    assert [len(group.tracks) for group in character_groups] == [3, 1]
+    for group in character_groups:
+        for track in group.tracks:
+            start_end_list = [(clip.start_offset, clip.end_offset) for clip in track.clips]
+            assert not is_any_clip_overlap(start_end_list)
+
+
+def test_unknown_composer(clips):
+    with pytest.raises(ValueError):
+        audio_to_tracks(clips, composer="no_such_composer")
+
+
+def test_organize_tracks_in_parallel_matches_serial():
+    session = generate_session(SessionSpec(clip_count=2000, characters=12))
+    serial = organize_tracks_by_character(group_clips_by_character(session))
+    parallel = organize_tracks_by_character(group_clips_by_character(session), workers=3)
+    assert [group.character for group in parallel] == [
+        group.character for group in serial
+    ]
+    assert [
+        [(track.index, track.clips) for track in group.tracks] for group in parallel
+    ] == [[(track.index, track.clips) for track in group.tracks] for group in serial]
+
+
+def make_clip(name: str, start: float, duration: float, character: str = "Alice"):
+    return AudioClip(
+        f"/session/{name}.wav",
+        metadata=WavMetadata(1000, 1, int(duration * 1000), int(start * 1000), character),
+    )
+
+
+def test_merge_tracks_packs_sparse_tracks_without_overlaps():
+    sparse = [
+        AudioTrack("Alice", 1, [make_clip("a1", 0, 1), make_clip("a2", 10, 1)]),
+        AudioTrack("Alice", 2, [make_clip("b1", 2, 1), make_clip("b2", 12, 1)]),
+        AudioTrack("Alice", 3, [make_clip("c1", 20, 5)]),
+        AudioTrack("Bob", 1, [make_clip("d1", 0, 30, "Bob")]),
+        AudioTrack("Alice", 4, [make_clip("e1", 0.5, 3)]),
+    ]
+    merged = merge_tracks(sparse)
+    assert [(track.character, track.index) for track in merged] == [
+        ("Alice", 1),
+        ("Alice", 2),
+        ("Bob", 1),
+    ]
+    names = [[clip.name for clip in track.clips] for track in merged]
+    # 逐条剪辑放到编号最小的空闲轨道：b、c 插入 a 所在轨道的空隙
+    assert names[0] == ["a1.wav", "b1.wav", "a2.wav", "b2.wav", "c1.wav"]
+    assert names[1] == ["e1.wav"]
+    assert all(not track.has_overlaps() for track in merged)
+    # 输入的轨道不被修改
+    assert [clip.name for clip in sparse[0].clips] == ["a1.wav", "a2.wav"]
+
+    # 要求至少 1.5 秒的间隔时 b1 不能接在 a1 或 e1 之后
+    spaced = merge_tracks(sparse, threshold=1.5)
+    assert len([track for track in spaced if track.character == "Alice"]) == 3
+
+
+def test_merge_tracks_reaches_the_overlap_depth_for_any_input():
+    clips = generate_session(SessionSpec(clip_count=3000, characters=3, seed=11))
+    # 每条剪辑单独一条轨道，整条轨道互相放不进对方的空隙
+    single = [
+        AudioTrack(clip.character, number, [clip]) for number, clip in enumerate(clips)
+    ]
+    merged = merge_tracks(single)
+    groups = group_clips_by_character(list(clips))
+    assert len(merged) == sum(
+        max_overlap_depth(group_by_start(list(character_clips)))
+        for _, character_clips in groups
+    )
+    assert sorted(id(clip) for track in merged for clip in track.clips) == sorted(
+        id(clip) for clip in clips
+    )
+    assert all(not track.has_overlaps() for track in merged)
+
+
+def test_clip_timing_is_exact_at_large_offsets():
+    # 96 kHz 录音在 10 小时左右的位置：浮点秒累加会有误差，tick 是精确的整数
+    base = 10 * 3600 * 96000 + 2
+    first = AudioClip(
+        "/session/x1.wav", metadata=WavMetadata(96000, 1, 48000, base, "Alice")
+    )
+    second = AudioClip(
+        "/session/x2.wav", metadata=WavMetadata(96000, 1, 9600, base + 48000, "Alice")
+    )
+    same_start = AudioClip(
+        "/session/x3.wav", metadata=WavMetadata(48000, 1, 4800, (base + 48000) // 2, "Alice")
+    )
+    # 上一条的结束与下一条的开始精确相等，不会因为误差产生重叠或极短的间隙
+    assert first.end_ticks == second.start_ticks
+    assert first.start_offset == base / 96000
+    assert first.duration == 0.5
+
+    track = AudioTrack("Alice", 1, [first, second])
+    assert track.gap_ticks().tolist()[1] == 0
+    assert not track.has_overlaps()
+
+    # 96 kHz 与 48 kHz 样本数换算出的相同时刻可以被扫描线精确地分到同一组
+    tracks = audio_to_tracks([first, second, same_start], fps=24.0)
+    assert [len(track.clips) for track in tracks] == [2, 1]
+    assert second.start_ticks == same_start.start_ticks
+
+
+def test_minor_characters_share_a_bounded_number_of_tracks():
+    # 一个主要角色加 30 个各说 3 句的次要角色，次要角色的台词彼此重叠
+    clips = [make_clip(f"lead{i}", i * 2, 1.5, "Lead") for i in range(40)]
+    for number in range(30):
+        character = f"Extra{number}"
+        clips += [
+            make_clip(f"{character}_{i}", number * 0.5 + i * 3, 2, character)
+            for i in range(3)
+        ]
+    limits = PoolLimits(minor_clips=5, max_tracks=3)
+
+    groups = group_clips_by_character(list(clips))
+    dedicated, pooled = split_pooled_groups(groups, limits)
+    assert "Lead" in [character for character, _ in dedicated]
+    # 放不下的次要角色保留独立轨道，每个角色的剪辑不会被拆开
+    pooled_characters = {clip.character for clip in pooled}
+    assert pooled_characters and len(dedicated) > 1
+    assert not pooled_characters & {character for character, _ in dedicated}
+
+    tracks = audio_to_tracks(list(clips), pool_limits=limits)
+    shared = [track for track in tracks if track.shared]
+    assert 0 < len(shared) <= limits.max_tracks
+    assert tracks[-len(shared):] == shared
+    assert {track.track_name for track in shared} == {
+        f"{limits.name}_{number}" for number in range(1, len(shared) + 1)
+    }
+    assert sorted(id(clip) for track in tracks for clip in track.clips) == sorted(
+        id(clip) for clip in clips
+    )
+    assert all(not track.has_overlaps() for track in tracks)
+    assert len(tracks) < len(audio_to_tracks(list(clips)))
+
+
+def test_shared_track_name_must_not_be_a_character():
+    clips = [make_clip("pool1", 0, 1, "pool"), make_clip("extra", 0, 1, "Extra")]
+    with pytest.raises(PoolNameConflictError):
+        audio_to_tracks(clips, pool_limits=PoolLimits())
+    tracks = audio_to_tracks(clips, pool_limits=PoolLimits(name="shared"))
+    assert [(track.track_name, track.shared) for track in tracks] == [
+        ("shared_1", True),
+        ("shared_2", True),
+    ]
+
+
+def test_shared_track_clips_record_their_character():
+    from opentimelineio.schema import Clip
+
+    from audio_composer.export.otio_writer import create_audio_track
+
+    clips = [make_clip("lead1", 0, 5, "Lead"), make_clip("lead2", 6, 5, "Lead")]
+    clips += [make_clip(f"extra{i}", i * 2, 1, f"Extra{i}") for i in range(3)]
+    tracks = audio_to_tracks(clips, pool_limits=PoolLimits(minor_clips=1, max_tracks=1))
+    assert [(track.track_name, track.shared) for track in tracks] == [
+        ("Lead_1", False),
+        ("pool_1", True),
+    ]
+
+    def characters(track):
+        otio_track = create_audio_track(track)
+        return [
+            clip.metadata.get("audio_composer", {}).get("character")
+            for clip in otio_track
+            if isinstance(clip, Clip)
+        ]
+
+    # 共享轨道上的剪辑记录角色，独立轨道不变
+    assert characters(tracks[1]) == ["Extra0", "Extra1", "Extra2"]
+    assert characters(tracks[0]) == [None, None]
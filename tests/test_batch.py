@@ -0,0 +1,111 @@
+import json
+import os
+import queue
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from audio_composer.pipeline.batch import BatchJob, load_job_manifest, run_batch
+from otio_generator import main
+
+
+@pytest.mark.parametrize("workers, pool", [(1, "thread"), (2, "thread"), (2, "process")])
+def test_run_batch_reports_progress_in_job_order(tmp_path, workers, pool):
+    jobs = [
+        BatchJob(folder="test_data", output=str(tmp_path / "first")),
+        BatchJob(folder="test_data", output=str(tmp_path / "second"), fps=25.0),
+        BatchJob(folder="test_data", output=str(tmp_path / "bad"), composer="nope"),
+    ]
+    progress = queue.Queue()
+    results = run_batch(jobs, workers, pool, progress, use_cache=False)
+
+    assert [result.job for result in results] == jobs
+    assert [result.status for result in results] == ["done", "done", "failed"]
+    assert results[0].clips == 9 and results[0].tracks > 0
+    assert set(results[0].timings) == {"scan", "compose", "export"}
+    assert "nope" in results[2].error
+    assert (tmp_path / "first.otio").exists() and (tmp_path / "second.otio").exists()
+
+    events = [progress.get_nowait() for _ in jobs]
+    assert [event.completed for event in events] == [1, 2, 3]
+    assert sorted(event.index for event in events) == [0, 1, 2]
+
+
+def test_run_batch_cancel_skips_remaining_jobs(tmp_path):
+    cancel_event = threading.Event()
+    cancel_event.set()
+    jobs = [BatchJob(folder="test_data", output=str(tmp_path / "job"))]
+    results = run_batch(jobs, cancel_event=cancel_event, use_cache=False)
+    assert results[0].status == "cancelled"
+    assert not (tmp_path / "job.otio").exists()
+
+
+def test_load_job_manifest_applies_defaults_and_outputs(tmp_path):
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "defaults": {"fps": 25.0},
+                "jobs": [
+                    {"folder": "sessions/a"},
+                    {"folder": "other/a", "composer": "greedy_heap"},
+                    {"folder": "sessions/b", "output": "custom/b", "fps": 30.0},
+                ],
+            }
+        )
+    )
+    jobs = load_job_manifest(str(manifest), "export", fps=24.0, stream=True)
+    assert [job.output for job in jobs] == [
+        os.path.join("export", "a"),
+        os.path.join("export", "a_1"),
+        "custom/b",
+    ]
+    assert [job.fps for job in jobs] == [25.0, 25.0, 30.0]
+    assert jobs[1].composer == "greedy_heap" and all(job.stream for job in jobs)
+
+    manifest.write_text(json.dumps([{"folder": "a", "frame_rate": 24}]))
+    with pytest.raises(ValueError, match="frame_rate"):
+        load_job_manifest(str(manifest), "export")
+
+
+def test_batch_cli_writes_summary(tmp_path):
+    summary = tmp_path / "summary.json"
+    result = CliRunner().invoke(
+        main,
+        [
+            "batch",
+            "test_dat*",
+            "-d",
+            str(tmp_path / "export"),
+            "-s",
+            str(summary),
+            "--no-cache",
+            "--pool",
+            "thread",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(summary.read_text(encoding="utf-8"))
+    assert report["done"] == 1 and report["clips"] == 9
+    assert report["jobs"][0]["tracks"] == report["tracks"] > 0
+    assert (tmp_path / "export" / "test_data.otio").exists()
+
+
+def test_gui_batch_worker_always_reports_the_end(tmp_path, monkeypatch):
+    import otio_gui
+
+    def broken_run_batch(*args):
+        raise ValueError("bad job spec")
+
+    progress_queue = queue.Queue()
+    monkeypatch.setattr(otio_gui, "run_batch", broken_run_batch)
+    otio_gui.run_batch_reporting([], 1, progress_queue, threading.Event())
+    assert progress_queue.get_nowait() == (otio_gui.BATCH_DONE, "ValueError: bad job spec")
+
+    monkeypatch.undo()
+    jobs = [BatchJob(folder="test_data", output=str(tmp_path / "ok"))]
+    otio_gui.run_batch_reporting(jobs, 1, progress_queue, threading.Event())
+    events = [progress_queue.get_nowait() for _ in range(progress_queue.qsize())]
+    assert events[-1] == (otio_gui.BATCH_DONE, None)
+    assert [event.result.status for event in events[:-1]] == ["done"]
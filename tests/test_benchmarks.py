@@ -0,0 +1,31 @@
+from audio_composer.composer.registry import composer_names
+from benchmarks.bench_composers import bench_session
+from benchmarks.synthetic_session import SessionSpec, generate_session
+
+
+def test_generate_session_is_deterministic():
+    spec = SessionSpec(clip_count=500, characters=5, burst_probability=0.5)
+    first = generate_session(spec)
+    second = generate_session(spec)
+    assert len(first) == 500
+    assert len({clip.character for clip in first}) == 5
+    assert [(clip.audio_path, clip.start_offset) for clip in first] == [
+        (clip.audio_path, clip.start_offset) for clip in second
+    ]
+
+
+def test_bench_session_covers_every_stage():
+    spec = SessionSpec(clip_count=50, characters=3)
+    results = bench_session(spec, composer_names(), memory=True, export=True)
+    names = [result["name"] for result in results]
+    assert names == [
+        "synthetic_session",
+        *composer_names(),
+        "gap_durations",
+        "make_otio",
+    ]
+    assert all(result["peak_bytes"] is not None for result in results)
+    track_counts = {result["tracks"] for result in results if result["stage"] == "compose"}
+    assert len(track_counts) == 1
+    # 所有策略都达到了轨道数下界
+    assert track_counts == {results[1]["lower_bound"]}
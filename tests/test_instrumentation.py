@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from otio_generator import main
+from utils.instrumentation import Instrumentation, instrumentation
+
+
+@pytest.fixture(autouse=True)
+def reset_global_instrumentation():
+    yield
+    instrumentation.enable(False)
+    instrumentation.reset()
+
+
+def test_disabled_instrumentation_records_nothing():
+    recorder = Instrumentation()
+    # 关闭时所有 span 共用同一个空上下文
+    assert recorder.span("a") is recorder.span("b")
+    with recorder.span("a"):
+        recorder.count("clips", 3)
+    assert recorder.summary() == {"timers": {}, "counters": {}}
+    assert recorder.chrome_trace()["traceEvents"] == []
+
+
+def test_enabled_instrumentation_exports_summary_and_chrome_trace(tmp_path):
+    recorder = Instrumentation()
+    recorder.enable()
+    for _ in range(2):
+        with recorder.span("compose"):
+            with recorder.span("gap_fill"):
+                pass
+    recorder.count("clips", 3)
+    recorder.count("clips", 2)
+
+    summary = recorder.summary()
+    assert summary["timers"]["compose"]["count"] == 2
+    assert summary["timers"]["gap_fill"]["count"] == 2
+    assert summary["counters"] == {"clips": 5}
+
+    recorder.write(str(tmp_path / "trace.json"))
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert [event["name"] for event in spans] == ["gap_fill", "compose"] * 2
+    assert all(event["dur"] >= 0 for event in spans)
+    assert [event["args"] for event in events if event["ph"] == "C"] == [{"clips": 5}]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_cli_trace_covers_every_stage(tmp_path, stream):
+    trace = tmp_path / "trace.json"
+    args = [
+        "-p", "test_data", "-o", str(tmp_path / "out"), "--no-cache",
+        "--trace", str(trace), "--trace-format", "json",
+    ]
+    if stream:
+        args.append("--stream")
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    summary = json.loads(trace.read_text())
+    assert set(summary["timers"]) >= {
+        "scan", "parse", "compose", "gap_fill", "otio_build", "write"
+    }
+    assert summary["counters"]["files"] == summary["counters"]["clips"] == 9
+    assert summary["counters"]["clips_exported"] == 9
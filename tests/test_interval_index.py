@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from audio_composer.composer.audio_to_timeline import audio_to_tracks, merge_tracks
+from audio_composer.models.audioclip import AudioClip
+from audio_composer.models.audiotrack import AudioTrack
+from audio_composer.models.interval_index import IntervalIndex, TimelineIndex
+from audio_composer.models.wav_metadata import WavMetadata
+from benchmarks.synthetic_session import SessionSpec, generate_session
+
+
+def brute_force(starts, ends, start, end):
+    return [i for i, (s, e) in enumerate(zip(starts, ends)) if e > start and s < end]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interval_tree_matches_brute_force(seed):
+    rng = random.Random(seed)
+    starts = [float(rng.randrange(0, 500)) for _ in range(2000)]
+    ends = [start + rng.choice([0.0, 0.5, 2.0, 30.0, 200.0]) for start in starts]
+    index = IntervalIndex(np.array(starts), np.array(ends))
+    assert not index.monotonic
+    for _ in range(200):
+        start = rng.uniform(-10, 510)
+        end = start + rng.choice([0.0, 1.0, 10.0, 100.0])
+        assert index.overlapping(start, end).tolist() == brute_force(starts, ends, start, end)
+        point = float(rng.randrange(0, 500))
+        expected = [i for i, (s, e) in enumerate(zip(starts, ends)) if s <= point < e]
+        assert index.at(point).tolist() == expected
+
+
+def test_track_index_uses_bisect_for_sorted_clips():
+    clips = [
+        AudioClip(f"/s/{i}.wav", metadata=WavMetadata(48000, 1, 48000, i * 96000, "A"))
+        for i in range(10)
+    ]
+    track = AudioTrack("A", 1, clips)
+    assert track.interval_index().monotonic
+    assert track[3.5:6.5] == clips[2:4]
+    assert track[4.0] == [clips[2]]
+    assert track[5.5] == []
+
+
+def test_timeline_index_follows_track_mutations():
+    clips = generate_session(SessionSpec(clip_count=300, characters=4, seed=3))
+    tracks = audio_to_tracks(clips)
+    index = TimelineIndex(tracks)
+
+    def expected(start, end):
+        return sorted(
+            (id(track), id(clip))
+            for track in tracks
+            for clip in track.clips
+            if clip.end_offset > start and clip.start_offset < end
+        )
+
+    found = index[10.0:20.0]
+    assert sorted((id(track), id(clip)) for track, clip in found) == expected(10.0, 20.0)
+
+    # 编排器和 merge_tracks 通过列表方法修改轨道后，索引自动重建
+    extra = AudioClip("/s/extra.wav", metadata=WavMetadata(48000, 1, 48000, 48000 * 15, "X"))
+    tracks[0].clips.append(extra)
+    assert any(clip is extra for _, clip in index[15.5])
+
+    merged = merge_tracks(tracks[:3])
+    tracks[:] = merged
+    found = index[0:float("inf")]
+    assert len(found) == sum(len(track.clips) for track in tracks)
+    assert sorted((id(track), id(clip)) for track, clip in found) == expected(0, float("inf"))
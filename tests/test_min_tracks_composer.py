@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from audio_composer.composer.min_tracks_composer import (
+    _FreeSlots,
+    compose_min_tracks,
+    group_by_start,
+    max_overlap_depth,
+)
+from audio_composer.composer.registry import get_composer
+from benchmarks.synthetic_session import SessionSpec, generate_session
+
+
+def segment(start: int, end: int) -> SimpleNamespace:
+    return SimpleNamespace(start_ticks=start, end_ticks=end)
+
+
+def track_numbers(tracks, group) -> list[int]:
+    ids = {id(clip) for clip in group}
+    return sorted(
+        track.index for track in tracks for clip in track.clips if id(clip) in ids
+    )
+
+
+def is_contiguous(tracks, group) -> bool:
+    numbers = track_numbers(tracks, group)
+    return numbers == list(range(numbers[0], numbers[0] + len(numbers)))
+
+
+def test_free_slots_finds_leftmost_run():
+    slots = _FreeSlots(7)
+    for slot in (1, 4):
+        slots.set(slot, False)
+    # 空闲：0, 2, 3, 5, 6
+    assert slots.leftmost_run(1) == 0
+    assert slots.leftmost_run(2) == 2
+    slots.set(2, False)
+    assert slots.leftmost_run(2) == 5
+    assert slots.leftmost_run(3) == -1
+
+
+def test_burst_goes_to_a_contiguous_run():
+    # 轨道 1、4、5 空出后，两条同时开始的剪辑放在 4、5，而不是编号最小的 1、4
+    segments = [
+        segment(0, 10), segment(0, 30), segment(0, 30), segment(0, 10), segment(0, 10),
+        segment(20, 40), segment(20, 40),
+    ]
+    tracks, report = compose_min_tracks("Alice", list(segments))
+    assert report.lower_bound == report.achieved == 5
+    assert report.burst_groups == report.contiguous_groups == 2
+    assert track_numbers(tracks, segments[5:]) == [4, 5]
+    assert is_contiguous(tracks, segments[5:])
+
+    default = get_composer("scanline_optimized").compose("Alice", list(segments))
+    assert not is_contiguous(default, segments[5:])
+
+
+def test_zero_length_and_back_to_back_clips():
+    segments = [segment(0, 5), segment(5, 5), segment(5, 9), segment(9, 9)]
+    groups = group_by_start(list(segments))
+    assert max_overlap_depth(groups) == 2
+    tracks, report = compose_min_tracks("Alice", list(segments))
+    assert report.optimal and report.achieved == 2
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_min_tracks_reaches_the_lower_bound_on_dense_sessions(seed):
+    spec = SessionSpec(
+        clip_count=3000, characters=3, overlap_density=2.0, burst_probability=0.3, seed=seed
+    )
+    clips = generate_session(spec)
+    for character in {clip.character for clip in clips}:
+        character_clips = [clip for clip in clips if clip.character == character]
+        tracks, report = compose_min_tracks(character, list(character_clips))
+        assert report.optimal
+        assert [track.index for track in tracks] == list(range(1, report.achieved + 1))
+        assert sum(len(track.clips) for track in tracks) == len(character_clips)
+        assert not any(track.has_overlaps() for track in tracks)
+        # 与默认策略的轨道数相同，同时开始的剪辑连续的比例不低于默认策略
+        default = get_composer("scanline_optimized").compose(
+            character, list(character_clips)
+        )
+        assert len(default) == report.achieved
+        bursts = [group for group in group_by_start(list(character_clips)) if len(group) > 1]
+        assert report.contiguous_groups >= sum(
+            is_contiguous(default, group) for group in bursts
+        )
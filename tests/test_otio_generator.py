@@ -0,0 +1,261 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import opentimelineio as otio
+import pytest
+from opentimelineio.schema import Clip
+from audio_composer.composer.audio_to_timeline import audio_to_tracks, get_audio_clips
+from davinci_resolve.metadata_manager.fx_template import (
+    default_afx_preset,
+    load_effect_preset,
+)
+from otio_generator import make_otio
+
+
+@pytest.fixture
+def audio_tracks():
+    return audio_to_tracks(get_audio_clips("test_data"))
+
+
+@pytest.mark.parametrize("global_start_hour, fps", [(0, 24.0), (1, 25.0)])
+def test_stream_writer_matches_make_otio(tmp_path, audio_tracks, global_start_hour, fps):
+    make_otio(audio_tracks, global_start_hour, fps, str(tmp_path / "full"))
+    make_otio(
+        iter(audio_tracks), global_start_hour, fps, str(tmp_path / "stream"), stream=True
+    )
+    assert (tmp_path / "stream.otio").read_bytes() == (tmp_path / "full.otio").read_bytes()
+
+
+def test_stream_writer_without_audio_tracks(tmp_path):
+    make_otio([], output=str(tmp_path / "full"))
+    make_otio([], output=str(tmp_path / "stream"), stream=True)
+    assert (tmp_path / "stream.otio").read_bytes() == (tmp_path / "full.otio").read_bytes()
+
+
+def test_stream_writer_leaves_no_file_when_tracks_fail(tmp_path, audio_tracks):
+    from audio_composer.export.otio_writer import write_otio_stream
+
+    def tracks():
+        yield audio_tracks[0]
+        raise UnicodeDecodeError("utf-8", b"\xe9", 0, 1, "invalid continuation byte")
+
+    with pytest.raises(UnicodeDecodeError):
+        write_otio_stream(tracks(), output=str(tmp_path / "broken"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_effect_preset_clones_are_independent():
+    preset = default_afx_preset()
+    first, second = Clip(), Clip()
+    preset.apply(first)
+    preset.apply(second)
+    assert len(first.effects) == len(preset) == 8
+    first.effects[0].metadata["Resolve_OTIO"]["Enabled"] = False
+    assert second.effects[0].metadata["Resolve_OTIO"]["Enabled"] is True
+    rebuilt = preset.templates[0].build()
+    assert rebuilt.metadata["Resolve_OTIO"]["Enabled"] is True
+
+
+def test_make_otio_with_user_preset(tmp_path, audio_tracks):
+    preset_file = tmp_path / "preset.json"
+    effects = json.loads(Path("davinci_resolve/default_data/audio_fxs.json").read_text())
+    effects["effects"] = effects["effects"][:2]
+    preset_file.write_text(json.dumps(effects))
+
+    preset = load_effect_preset(preset_file)
+    make_otio(audio_tracks, output=str(tmp_path / "preset"), afx_preset=preset)
+    timeline = otio.adapters.read_from_file(str(tmp_path / "preset.otio"))
+    clips = list(timeline.find_clips())
+    assert clips and all(len(clip.effects) == 2 for clip in clips)
+
+
+def test_cli_import_is_light_and_cwd_independent(tmp_path):
+    repo_root = Path(__file__).resolve().parent.parent
+    code = (
+        "import sys, otio_generator\n"
+        "heavy = {'opentimelineio', 'pydantic', 'wavinfo'} & set(sys.modules)\n"
+        "assert not heavy, heavy\n"
+        "from davinci_resolve.models.resolve_fx import default_afxs\n"
+        "assert default_afxs.effects\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(repo_root)}
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+    # 仅导入和读取资源不应创建日志目录
+    assert not (tmp_path / "logs").exists()
+
+
+def test_incremental_export_reuses_unaffected_tracks(tmp_path):
+    from audio_composer.pipeline.incremental import export_incremental, manifest_path
+
+    folder = tmp_path / "session"
+    shutil.copytree("test_data", folder)
+    output = str(tmp_path / "incremental")
+
+    first = export_incremental(str(folder), output)
+    assert first.full_rebuild and first.written and len(first.added) == 9
+    assert manifest_path(output).exists()
+    make_otio(audio_to_tracks(get_audio_clips(str(folder))), output=str(tmp_path / "full"))
+    assert (tmp_path / "incremental.otio").read_bytes() == (tmp_path / "full.otio").read_bytes()
+
+    unchanged = export_incremental(str(folder), output)
+    assert not unchanged.written and not unchanged.full_rebuild
+
+    # 删除 Bob 的一条台词，只有 Bob 的轨道需要重新生成
+    bob_files = [
+        clip.audio_path for clip in get_audio_clips(str(folder)) if clip.character == "Bob"
+    ]
+    os.remove(bob_files[0])
+    second = export_incremental(str(folder), output)
+    assert second.removed == [bob_files[0]]
+    assert second.recomposed == ["Bob"]
+    assert second.reused_tracks > 0 and not second.full_rebuild
+
+    make_otio(audio_to_tracks(get_audio_clips(str(folder))), output=str(tmp_path / "full"))
+    assert (tmp_path / "incremental.otio").read_bytes() == (tmp_path / "full.otio").read_bytes()
+
+
+def test_incremental_export_rebuilds_when_settings_change(tmp_path):
+    from audio_composer.pipeline.incremental import export_incremental
+
+    output = str(tmp_path / "incremental")
+    export_incremental("test_data", output)
+    result = export_incremental("test_data", output, fps=25.0)
+    assert result.full_rebuild and result.written
+
+
+def test_folder_watcher_debounces_and_coalesces(tmp_path):
+    from audio_composer.pipeline.incremental import IncrementalExporter
+    from audio_composer.pipeline.watch import FolderWatcher
+
+    folder = tmp_path / "session"
+    folder.mkdir()
+    wavs = sorted(Path("test_data").glob("*.wav"))[1:4]
+    shutil.copy(wavs[0], folder)
+    output = str(tmp_path / "live")
+    updates = []
+    watcher = FolderWatcher(
+        IncrementalExporter(str(folder), output), debounce=2.0, on_update=updates.append
+    )
+
+    assert watcher.poll(now=0.0) is None  # 刚出现的变化先等待防抖
+    assert watcher.poll(now=2.0).added == [(folder / wavs[0].name).as_posix()]
+    assert watcher.poll(now=3.0) is None  # 没有变化
+
+    # 两次落盘在防抖时间内合并为一次更新
+    shutil.copy(wavs[1], folder)
+    assert watcher.poll(now=4.0) is None
+    shutil.copy(wavs[2], folder)
+    assert watcher.poll(now=5.0) is None
+    result = watcher.poll(now=7.0)
+    assert len(result.added) == 2 and not result.full_rebuild
+    assert len(updates) == 2
+
+    timeline = otio.adapters.read_from_file(f"{output}.otio")
+    assert sorted(clip.name for clip in timeline.find_clips()) == [
+        wav.name for wav in wavs[:3]
+    ]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_cli_shared_tracks(tmp_path, stream):
+    from click.testing import CliRunner
+    from otio_generator import main
+
+    args = [
+        "-p", "test_data", "-o", str(tmp_path / "shared"), "--no-cache",
+        "--shared-tracks", "--minor-clips", "10", "--max-shared-tracks", "2",
+    ]
+    if stream:
+        args.append("--stream")
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    (output,) = tmp_path.glob("shared_*.otio")
+    tracks = list(otio.adapters.read_from_file(str(output)).audio_tracks())
+    # Alice 的重叠深度为 3，超过上限，保留独立轨道；Bob 放到共享轨道上
+    assert [track.name for track in tracks] == ["Alice_1", "Alice_2", "Alice_3", "pool_1"]
+    assert [
+        clip.metadata["audio_composer"]["character"] for clip in tracks[-1].find_clips()
+    ] == ["Bob"] * 3
+    assert sum(len(track.find_clips()) for track in tracks) == 9
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_cli_shared_track_name_must_not_be_a_character(tmp_path, stream):
+    from click.testing import CliRunner
+    from otio_generator import main
+
+    args = [
+        "-p", "test_data", "-o", str(tmp_path / "shared"), "--no-cache",
+        "--shared-tracks", "--shared-track-name", "Bob",
+    ]
+    if stream:
+        args.append("--stream")
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 2
+    assert "--shared-track-name" in result.output
+    assert list(tmp_path.iterdir()) == []
+
+    args[args.index("Bob")] = "extras"
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    (output,) = tmp_path.glob("shared_*.otio")
+    tracks = list(otio.adapters.read_from_file(str(output)).audio_tracks())
+    # 默认上限下两个角色都是次要角色，全部放到共享轨道上
+    assert [track.name for track in tracks] == [
+        f"extras_{number}" for number in range(1, len(tracks) + 1)
+    ]
+
+
+def test_cli_shared_tracks_rejects_incremental(tmp_path):
+    from click.testing import CliRunner
+    from otio_generator import main
+
+    result = CliRunner().invoke(
+        main, ["-p", "test_data", "-o", str(tmp_path / "out"), "--shared-tracks", "--incremental"]
+    )
+    assert result.exit_code == 2
+    assert "--shared-tracks" in result.output
+
+
+def test_cli_writes_log_files_only_when_asked(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from otio_generator import main
+    from utils.logger import compose_logger_instance
+
+    repo_root = Path(__file__).resolve().parent.parent
+    monkeypatch.chdir(tmp_path)
+    args = ["-p", str(repo_root / "test_data"), "-o", str(tmp_path / "out"), "--no-cache"]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / "logs").exists()
+
+    try:
+        result = CliRunner().invoke(main, [*args, "--log-dir", str(tmp_path / "log_files")])
+        assert result.exit_code == 0, result.output
+    finally:
+        compose_logger_instance.disable_file_log()
+    assert list((tmp_path / "log_files").glob("composer*.log"))
+
+
+def test_invalid_log_level_env_falls_back_to_info(tmp_path):
+    repo_root = Path(__file__).resolve().parent.parent
+    code = (
+        "import logging\n"
+        "from utils.logger import logger\n"
+        "assert logger.level == logging.INFO, logger.level\n"
+    )
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(repo_root),
+        "AUDIO_COMPOSER_LOG_LEVEL": "verbose",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert "AUDIO_COMPOSER_LOG_LEVEL='verbose'" in result.stdout
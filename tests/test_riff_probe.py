@@ -0,0 +1,116 @@
+import struct
+from pathlib import Path
+
+import pytest
+from audio_composer.ingest.riff_probe import UnsupportedWavError, probe_wav_header
+from audio_composer.ingest.wav_reader import read_wav_metadata, read_wav_metadata_full
+
+
+def build_wav(
+    path: Path,
+    data_size: int = 9600,
+    time_reference: int = 48000,
+    artist: bytes = b"Alice\0",
+    riff_id: bytes = b"RIFF",
+) -> Path:
+    """构造一个最小的 BWF 文件：fmt、bext、data、LIST-INFO。"""
+    fmt = struct.pack("<HHIIHH", 1, 2, 48000, 48000 * 4, 4, 16)
+    bext = bytearray(602)
+    struct.pack_into("<Q", bext, 338, time_reference)
+    iart = b"IART" + struct.pack("<I", len(artist)) + artist
+    info = b"INFO" + iart + (b"\0" if len(artist) & 1 else b"")
+
+    chunks = b""
+    if riff_id != b"RIFF":
+        ds64 = struct.pack("<QQQI", 0, data_size, data_size // 4, 0)
+        chunks += b"ds64" + struct.pack("<I", len(ds64)) + ds64
+    chunks += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    chunks += b"bext" + struct.pack("<I", len(bext)) + bytes(bext)
+    declared = 0xFFFFFFFF if riff_id != b"RIFF" else data_size
+    chunks += b"data" + struct.pack("<I", declared) + bytes(data_size)
+    chunks += b"LIST" + struct.pack("<I", len(info)) + info
+
+    path.write_bytes(riff_id + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+    return path
+
+
+@pytest.mark.parametrize("index", range(1, 10))
+def test_probe_matches_wavinfo(index):
+    audio_file = f"test_data/audio{index}.wav"
+    assert probe_wav_header(audio_file) == read_wav_metadata_full(audio_file)
+
+
+def test_probe_rf64_uses_ds64_data_size(tmp_path):
+    audio_file = build_wav(tmp_path / "long.wav", riff_id=b"RF64")
+    metadata = probe_wav_header(str(audio_file))
+    assert metadata.frame_count == 2400
+    assert metadata.time_reference == 48000
+    assert metadata.artist == "Alice"
+
+
+def test_probe_rejects_non_wave_file(tmp_path):
+    not_wav = tmp_path / "not.wav"
+    not_wav.write_bytes(b"OggS" + bytes(64))
+    with pytest.raises(UnsupportedWavError):
+        probe_wav_header(str(not_wav))
+
+
+def test_read_wav_metadata_falls_back_to_wavinfo(tmp_path):
+    # 非 utf8 的角色名无法走快速路径，交给 wavinfo 处理（并保持原有的报错行为）
+    audio_file = build_wav(tmp_path / "latin1.wav", artist=b"\xe9t\xe9\0")
+    with pytest.raises(UnicodeDecodeError):
+        read_wav_metadata(str(audio_file))
+
+
+def test_probe_bw64_uses_ds64_table_for_large_chunks(tmp_path):
+    # 大小写在 ds64 表中的 JUNK 块（在 fmt、bext 之前）需要按 64 位大小跳过
+    fmt = struct.pack("<HHIIHH", 1, 8, 96000, 96000 * 24, 24, 24)
+    bext = bytearray(602)
+    struct.pack_into("<Q", bext, 338, 123456789)
+    junk = bytes(1000)
+    ds64 = struct.pack("<QQQI", 0, 24 * 10, 10, 1) + struct.pack("<4sQ", b"JUNK", len(junk))
+    chunks = b"ds64" + struct.pack("<I", len(ds64)) + ds64
+    chunks += b"JUNK" + struct.pack("<I", 0xFFFFFFFF) + junk
+    chunks += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    chunks += b"bext" + struct.pack("<I", len(bext)) + bytes(bext)
+    chunks += b"data" + struct.pack("<I", 0xFFFFFFFF) + bytes(24 * 10)
+    audio_file = tmp_path / "adm.wav"
+    audio_file.write_bytes(b"BW64" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE" + chunks)
+
+    metadata = probe_wav_header(str(audio_file))
+    assert (metadata.sample_rate, metadata.channel_count) == (96000, 8)
+    assert metadata.frame_count == 10
+    assert metadata.time_reference == 123456789
+    assert metadata.artist is None
+
+
+def test_probe_rf64_long_take_beyond_4gb(tmp_path):
+    # 稀疏文件：5GB 的 data 块之后才是 LIST-INFO，长度必须用 64 位大小计算
+    data_size = 5 * 1024**3
+    fmt = struct.pack("<HHIIHH", 1, 2, 48000, 48000 * 4, 4, 16)
+    bext = bytearray(602)
+    struct.pack_into("<Q", bext, 338, 48000)
+    ds64 = struct.pack("<QQQI", 0, data_size, data_size // 4, 0)
+    head = b"ds64" + struct.pack("<I", len(ds64)) + ds64
+    head += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    head += b"bext" + struct.pack("<I", len(bext)) + bytes(bext)
+    head += b"data" + struct.pack("<I", 0xFFFFFFFF)
+    info = b"INFO" + b"IART" + struct.pack("<I", 4) + b"Bob\0"
+    audio_file = tmp_path / "long_take.wav"
+    with open(audio_file, "wb") as file:
+        file.write(b"RF64" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE" + head)
+        file.seek(data_size, 1)
+        file.write(b"LIST" + struct.pack("<I", len(info)) + info)
+
+    metadata = probe_wav_header(str(audio_file))
+    assert metadata.frame_count == data_size // 4
+    assert metadata.artist == "Bob"
+
+
+def test_probe_rf64_without_ds64_is_unsupported(tmp_path):
+    audio_file = build_wav(tmp_path / "broken.wav", riff_id=b"RF64")
+    data = bytearray(audio_file.read_bytes())
+    data[12:16] = b"JUNK"
+    audio_file.write_bytes(bytes(data))
+    with pytest.raises(UnsupportedWavError):
+        probe_wav_header(str(audio_file))
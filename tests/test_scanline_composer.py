@@ -0,0 +1,40 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+from audio_composer.composer.scanline_composer import (
+    scanline_composer,
+    scanline_composer_optimized,
+)
+
+
+def make_segments(seed: int, count: int = 300) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    segments = []
+    for _ in range(count):
+        # 取整的开始时间，制造大量开始时间相同的片段
+        start = rng.randrange(0, 200) * 1000
+        end = start + rng.choice([500, 1000, 3000, 10000])
+        segments.append(SimpleNamespace(start_ticks=start, end_ticks=end))
+    segments.sort(key=lambda clip: clip.start_ticks)
+    return segments
+
+
+def test_optimized_does_not_reuse_a_track_twice_in_one_group():
+    segments = [
+        SimpleNamespace(start_ticks=0, end_ticks=1000),
+        SimpleNamespace(start_ticks=2000, end_ticks=3000),
+        SimpleNamespace(start_ticks=2000, end_ticks=3000),
+    ]
+    tracks = scanline_composer_optimized(segments)
+    assert tracks == {1: segments[:2], 2: segments[2:]}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimized_matches_scanline_assignment(seed):
+    segments = make_segments(seed)
+    optimized = scanline_composer_optimized(segments)
+    assert optimized == scanline_composer(segments)
+    for clips in optimized.values():
+        for previous, current in zip(clips, clips[1:]):
+            assert previous.end_ticks <= current.start_ticks
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from audio_composer.composer.audio_to_timeline import get_audio_clips
+from audio_composer.ingest.sidecar import (
+    INDEX_FILE_NAME,
+    IndexFormatError,
+    build_index,
+    read_index,
+    validate_index,
+)
+from otio_generator import main
+
+
+@pytest.fixture
+def session(tmp_path):
+    folder = tmp_path / "session"
+    shutil.copytree("test_data", folder, ignore=shutil.ignore_patterns("*.png"))
+    (folder / "day2").mkdir()
+    shutil.move(folder / "audio9.wav", folder / "day2" / "audio9.wav")
+    return folder
+
+
+def clip_summary(clips):
+    return sorted(
+        (clip.audio_path, clip.character, clip.start_ticks, clip.duration_ticks)
+        for clip in clips
+    )
+
+
+def test_index_round_trip_matches_probing(session):
+    build_index(str(session), workers=2)
+    entries = read_index(str(session))
+    assert [entry.path for entry in entries][-1] == "day2/audio9.wav"
+    assert all(entry.metadata is not None for entry in entries)
+
+    indexed = get_audio_clips(str(session))
+    probed = get_audio_clips(str(session), use_index=False)
+    assert clip_summary(indexed) == clip_summary(probed)
+    assert validate_index(str(session)).ok
+
+
+def test_index_is_used_without_opening_wavs(session):
+    build_index(str(session))
+    # 索引存在时不读取 wav：清空音频数据（保持大小和修改时间）后仍然得到同样的剪辑
+    expected = clip_summary(get_audio_clips(str(session)))
+    for wav in session.glob("**/*.wav"):
+        stat = wav.stat()
+        wav.write_bytes(bytes(stat.st_size))
+        os.utime(wav, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert clip_summary(get_audio_clips(str(session))) == expected
+
+    report = validate_index(str(session), check_headers=True)
+    assert not report.stale
+    assert len(report.mismatched) == 9
+
+
+def test_out_of_date_index_falls_back_to_probing(session):
+    build_index(str(session))
+    (session / "audio1.wav").unlink()
+    shutil.copy(session / "audio2.wav", session / "day2" / "audio10.wav")
+    # 新录制的文件不会被丢掉，删除的文件也不会产生剪辑
+    expected = clip_summary(get_audio_clips(str(session), use_index=False))
+    assert clip_summary(get_audio_clips(str(session))) == expected
+    assert len(expected) == 9
+
+
+def test_validate_reports_missing_and_unindexed_files(session):
+    build_index(str(session))
+    (session / "audio1.wav").unlink()
+    shutil.copy(session / "audio2.wav", session / "day2" / "audio10.wav")
+    report = validate_index(str(session))
+    assert report.missing == ["audio1.wav"]
+    assert report.unindexed == ["day2/audio10.wav"]
+    assert not report.ok
+
+
+def test_read_index_rejects_other_formats(session):
+    (session / INDEX_FILE_NAME).write_text(json.dumps({"format": "other"}) + "\n")
+    with pytest.raises(IndexFormatError):
+        read_index(str(session))
+
+
+@pytest.mark.parametrize("row", ['["audio1.wav", 1, 2, 48000, 1]', "not json", "{}"])
+def test_malformed_index_rows_fall_back_to_probing(tmp_path, session, row):
+    build_index(str(session))
+    with open(session / INDEX_FILE_NAME, "a", encoding="utf-8") as file:
+        file.write(row + "\n")
+    with pytest.raises(IndexFormatError, match="line 11"):
+        read_index(str(session))
+
+    expected = clip_summary(get_audio_clips(str(session), use_index=False))
+    assert clip_summary(get_audio_clips(str(session))) == expected
+    result = CliRunner().invoke(
+        main, ["-p", str(session), "-o", str(tmp_path / "out"), "--no-cache"]
+    )
+    assert result.exit_code == 0, result.output
+
+
+def test_index_cli_build_and_validate(session):
+    runner = CliRunner()
+    result = runner.invoke(main, ["index", "build", str(session)])
+    assert result.exit_code == 0, result.output
+    assert "9 files" in result.output
+
+    result = runner.invoke(main, ["index", "validate", str(session), "--headers"])
+    assert result.exit_code == 0, result.output
+
+    (session / "audio3.wav").unlink()
+    result = runner.invoke(main, ["index", "validate", str(session)])
+    assert result.exit_code == 1
+    assert "missing: audio3.wav" in result.output
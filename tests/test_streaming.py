@@ -0,0 +1,101 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from audio_composer.composer.audio_to_timeline import (
+    audio_to_tracks,
+    get_audio_clips,
+    scan_wav_files,
+)
+from audio_composer.export.otio_writer import make_otio
+from audio_composer.ingest.metadata_cache import MetadataCache
+from audio_composer.ingest.sidecar import build_index, read_index
+from audio_composer.pipeline.streaming import (
+    export_streaming,
+    prefetch,
+    stream_audio_clips,
+    walk_wav_files,
+)
+
+
+@pytest.fixture
+def nested_folder(tmp_path):
+    folder = tmp_path / "session"
+    wavs = sorted(Path("test_data").glob("*.wav"))
+    for number, wav in enumerate(wavs):
+        target = folder / f"day{number % 3}" / ("b" if number % 2 else "a")
+        target.mkdir(parents=True, exist_ok=True)
+        shutil.copy(wav, target / wav.name)
+    # 大写后缀在 Windows 上也能被 glob 找到，所有系统上都应该被找到
+    copied = target / wav.name
+    copied.rename(copied.with_suffix(".WAV"))
+    # 根目录下的文件排在 day0/ 和 day1/ 之间；按整条路径的字符串排序时 "day0-" 会排在 "day0/" 之前
+    shutil.copy(wavs[0], folder / "day0-extra.wav")
+    (folder / "notes.txt").write_text("not audio")
+    return folder
+
+
+def test_walk_finds_the_same_files_as_glob(nested_folder):
+    walked = list(walk_wav_files(str(nested_folder)))
+    # 文件和顺序都与 scan_wav_files、索引相同
+    assert walked == scan_wav_files(str(nested_folder))
+    assert len(walked) == len(list(Path("test_data").glob("*.wav"))) + 1
+    assert any(path.endswith(".WAV") for path in walked)
+    relative = [Path(path).relative_to(nested_folder).as_posix() for path in walked]
+    extra = relative.index("day0-extra.wav")
+    assert all(path.startswith("day0/") for path in relative[:extra])
+    assert all(path.startswith(("day1/", "day2/")) for path in relative[extra + 1 :])
+    build_index(str(nested_folder))
+    assert [entry.path for entry in read_index(str(nested_folder))] == relative
+
+
+def test_prefetch_reraises_producer_errors():
+    def items():
+        yield 1
+        yield 2
+        raise OSError("share went away")
+
+    iterator = prefetch(items(), 1)
+    assert next(iterator) == 1
+    with pytest.raises(OSError, match="share went away"):
+        list(iterator)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_stream_audio_clips_matches_get_audio_clips(
+    tmp_path, nested_folder, workers, use_cache
+):
+    cache = MetadataCache(tmp_path / "cache.sqlite3") if use_cache else None
+    try:
+        # 第二遍全部命中缓存
+        for _ in range(2 if use_cache else 1):
+            streamed = list(
+                stream_audio_clips(str(nested_folder), workers=workers, cache=cache)
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+    expected = get_audio_clips(str(nested_folder))
+
+    def summary(clips):
+        return [
+            (clip.audio_path, clip.character, clip.start_ticks, clip.duration_ticks)
+            for clip in clips
+        ]
+
+    assert summary(streamed) == summary(expected)
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_export_streaming_matches_make_otio(tmp_path, nested_folder, use_index):
+    folder = str(nested_folder)
+    clips = get_audio_clips(folder, use_index=False)
+    make_otio(audio_to_tracks(clips), output=str(tmp_path / "full"), stream=True)
+    if use_index:
+        build_index(folder)
+    export_streaming(folder, str(tmp_path / "streamed"), use_index=use_index)
+    assert (tmp_path / "streamed.otio").read_bytes() == (
+        tmp_path / "full.otio"
+    ).read_bytes()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from typing import Any, Literal
+
+TraceFormat = Literal["json", "chrome"]
+
+# 关闭时所有 span 共用的空上下文，不分配任何对象
+_NULL_SPAN = nullcontext()
+
+
+class Instrumentation:
+    """
+    热路径上的计时器和计数器，替代逐条剪辑的调试日志。
+
+    默认关闭：关闭时 span 直接返回一个共用的空上下文，count 立即返回，
+    开销只有一次属性检查。开启后记录每个 span 的起止时间（可导出为 Chrome trace，
+    在 chrome://tracing 或 Perfetto 中查看）以及按名称汇总的次数和总耗时（JSON）。
+    只记录当前进程内的数据，进程池工作进程中的 span 不会汇总回来。
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空已记录的数据，以当前时间作为 trace 的起点。"""
+        with self._lock:
+            # 名称 -> [次数, 总秒数]
+            self.timers: dict[str, list[float]] = {}
+            self.counters: dict[str, int] = {}
+            # (名称, 开始秒数, 持续秒数, 线程编号)
+            self.events: list[tuple[str, float, float, int]] = []
+            self._origin = time.perf_counter()
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+
+    def span(self, name: str):
+        """
+        计时上下文：with span("compose"): ...
+
+        参数:
+            name (str): 阶段名称，同名的 span 汇总到同一个计时器。
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                timer = self.timers.setdefault(name, [0, 0.0])
+                timer[0] += 1
+                timer[1] += seconds
+                self.events.append(
+                    (name, start - self._origin, seconds, threading.get_ident())
+                )
+
+    def count(self, name: str, value: int = 1) -> None:
+        """计数器加 value。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> dict[str, Any]:
+        """按名称汇总的计时器（次数、总秒数）和计数器。"""
+        with self._lock:
+            return {
+                "timers": {
+                    name: {"count": int(count), "seconds": round(seconds, 6)}
+                    for name, (count, seconds) in self.timers.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Chrome trace event 格式（JSON 对象形式），时间单位为微秒。"""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": name,
+                    "cat": "audio_composer",
+                    "ph": "X",
+                    "ts": round(start * 1e6, 3),
+                    "dur": round(seconds * 1e6, 3),
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, seconds, tid in self.events
+            ]
+            end = max((start + seconds for _, start, seconds, _ in self.events), default=0.0)
+            events += [
+                {
+                    "name": name,
+                    "ph": "C",
+                    "ts": round(end * 1e6, 3),
+                    "pid": pid,
+                    "args": {name: value},
+                }
+                for name, value in self.counters.items()
+            ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str, trace_format: TraceFormat = "chrome") -> None:
+        """
+        导出记录的数据。
+
+        参数:
+            path (str): 输出文件路径。
+            trace_format (TraceFormat): "chrome" 导出 Chrome trace，"json" 导出汇总。
+        """
+        data = self.chrome_trace() if trace_format == "chrome" else self.summary()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+
+# 全局实例，各模块直接使用 span / count
+instrumentation = Instrumentation()
+span = instrumentation.span
+count = instrumentation.count
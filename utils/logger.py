@@ -1,27 +1,95 @@
 import logging
+import os
 import sys
 from datetime import datetime
 from logging import Logger
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+from utils.paths import default_cache_dir
+
+
+class DeferredFileHandler(logging.Handler):
+    """
+    第一次写日志时才创建日志目录和带时间戳的日志文件，
+    仅导入模块（例如 --help、测试收集）不会产生任何文件。
+    """
+
+    def __init__(self, log_dir: Path, level: int = logging.DEBUG) -> None:
+        super().__init__(level)
+        self.log_dir = log_dir
+        self.log_file: Path | None = None
+        self._handler: RotatingFileHandler | None = None
+
+    def _open(self) -> RotatingFileHandler:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_file = self.log_dir / f"composer{current_time}.log"
+        handler = RotatingFileHandler(
+            self.log_file,
+            maxBytes=10 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8",  # 10MB
+        )
+        handler.setLevel(self.level)
+        handler.setFormatter(self.formatter)
+        return handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            self._handler = self._open()
+        self._handler.emit(record)
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._handler.close()
+        super().close()
+
+
+# 日志级别的环境变量，命令行的 --log-level 优先
+LOG_LEVEL_ENV = "AUDIO_COMPOSER_LOG_LEVEL"
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# 日志目录的环境变量，设置后写日志文件，命令行的 --log-dir 优先
+LOG_DIR_ENV = "AUDIO_COMPOSER_LOG_DIR"
+
+
+def default_log_dir() -> Path:
+    """用户级日志目录：与元数据缓存相同的用户缓存目录下的 logs。"""
+    return default_cache_dir() / "logs"
+
 
 class ComposeLogger:
+    """
+    全局日志。默认只输出到控制台；调用 enable_file_log 后才写日志文件，
+    测试和作为库使用时不会在当前目录下产生文件。
+    """
 
-    def __init__(self, log_dir: str = "logs") -> None:
-        self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+    def __init__(self) -> None:
+        self.file_handler: DeferredFileHandler | None = None
 
         # 创建logger
         self.logger = logging.getLogger("TTS")
         # 避免日志重复
         self.logger.propagate = False
-        self.logger.setLevel(logging.DEBUG)
 
         # 避免重复添加handler
         if not self.logger.handlers:
             self._setup_handlers()
 
+        # 默认 INFO：DEBUG 级别的消息不会被格式化，也不会写入文件。
+        # 导入时就会读取环境变量，无效的值只给出警告，不能让所有入口在启动时报错
+        level = os.environ.get(LOG_LEVEL_ENV, "INFO").strip().upper()
+        if level not in LOG_LEVELS:
+            self.set_level("INFO")
+            self.logger.warning(
+                f"ignoring {LOG_LEVEL_ENV}={os.environ[LOG_LEVEL_ENV]!r}, "
+                f"expected one of {', '.join(LOG_LEVELS)}; using INFO"
+            )
+        else:
+            self.set_level(level)
+        if os.environ.get(LOG_DIR_ENV):
+            self.enable_file_log(os.environ[LOG_DIR_ENV])
+
     def _setup_handlers(self) -> None:
         """设置日志处理器"""
         # 清除现有的handlers
@@ -34,26 +102,47 @@ class ComposeLogger:
             "%(asctime)s - %(levelname)s: %(message)s", datefmt="%H:%M:%S"
         )
         console_handler.setFormatter(console_format)
+        self.logger.addHandler(console_handler)
 
-        # 文件处理器
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = self.log_dir / f"composer{current_time}.log"
-        file_handler = RotatingFileHandler(
-            self.log_file,
-            maxBytes=10 * 1024 * 1024,
-            backupCount=5,
-            encoding="utf-8",  # 10MB
-        )
-        file_handler.setLevel(logging.DEBUG)
+    def enable_file_log(self, log_dir: str | Path | None = None) -> Path:
+        """
+        开启日志文件（延迟到第一条日志时创建文件），重复调用时只保留最后一个目录。
+
+        参数:
+            log_dir (str | Path | None): 日志目录，默认为 default_log_dir()。
+
+        返回:
+            Path: 日志目录。
+        """
+        log_dir = Path(log_dir) if log_dir else default_log_dir()
+        if self.file_handler is not None:
+            if self.file_handler.log_dir == log_dir:
+                return log_dir
+            self.logger.removeHandler(self.file_handler)
+            self.file_handler.close()
+
+        file_handler = DeferredFileHandler(log_dir, logging.DEBUG)
         file_format = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - "
             "%(filename)s:%(lineno)d - %(message)s"
         )
         file_handler.setFormatter(file_format)
-
-        # 添加处理器
-        self.logger.addHandler(console_handler)
         self.logger.addHandler(file_handler)
+        self.file_handler = file_handler
+        return log_dir
+
+    def disable_file_log(self) -> None:
+        """关闭日志文件。"""
+        if self.file_handler is not None:
+            self.logger.removeHandler(self.file_handler)
+            self.file_handler.close()
+            self.file_handler = None
+
+    def set_level(self, level: str | int) -> None:
+        """设置日志级别，例如 "DEBUG"、"WARNING"。"""
+        if isinstance(level, str):
+            level = level.upper()
+        self.logger.setLevel(level)
 
     def get_logger(self) -> Logger:
         """获取logger实例"""
@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """用户缓存目录：Windows 下为 %LOCALAPPDATA%，其他系统为 $XDG_CACHE_HOME 或 ~/.cache。"""
+    if os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "audio_otio_composer"
@@ -0,0 +1,62 @@
+import importlib
+import sys
+import time
+from collections.abc import Callable
+
+# 启动后按需加载的重量级模块，按实际使用顺序排列
+DEFERRED_MODULES = (
+    "numpy",
+    "opentimelineio",
+    "pydantic",
+    "wavinfo",
+    "davinci_resolve.models.resolve_fx",
+    "davinci_resolve.metadata_manager.fx_template",
+    "audio_composer.export.otio_writer",
+)
+
+
+def _time_call(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def profile_startup() -> list[tuple[str, float, bool]]:
+    """
+    测量延迟加载的模块和资源的加载耗时。
+
+    返回:
+        list[tuple[str, float, bool]]: (名称, 耗时秒数, 是否在测量前已经加载)。
+    """
+    report = []
+    for module in DEFERRED_MODULES:
+        loaded = module in sys.modules
+        seconds = _time_call(lambda: importlib.import_module(module))
+        report.append((module, seconds, loaded))
+
+    from davinci_resolve.metadata_manager.fx_template import (
+        default_afx_preset,
+        default_vfx_preset,
+    )
+
+    for preset in (default_afx_preset, default_vfx_preset):
+        loaded = preset.cache_info().currsize > 0
+        report.append((f"{preset.__name__}()", _time_call(preset), loaded))
+    return report
+
+
+def print_startup_report(ctx, param, value) -> None:
+    """click 的 --profile-startup 回调：打印启动耗时报告后退出。"""
+    if not value or ctx.resilient_parsing:
+        return
+
+    import click
+
+    # 从进程启动到解析命令行参数所用的 CPU 时间（解释器启动和已导入的模块）
+    elapsed = time.process_time()
+    lines = [f"{'cli ready (cpu time)':<48}{elapsed * 1000:9.1f} ms"]
+    for name, seconds, loaded in profile_startup():
+        note = " (already loaded)" if loaded else ""
+        lines.append(f"{name:<48}{seconds * 1000:9.1f} ms{note}")
+    click.echo("\n".join(lines))
+    ctx.exit()